@@ -0,0 +1,179 @@
+"""
+Concurrent-client benchmark: WSGI (gunicorn sync workers) vs ASGI (uvicorn).
+
+Starts each deployment on a local port with the same number of worker
+processes, then runs ``--clients`` concurrent clients against a public read
+endpoint for ``--seconds`` and reports throughput and latency. Meanwhile
+``--slow-clients`` connections trickle their request headers one byte at a
+time, like clients on a bad mobile link; each of them pins a sync worker,
+while the event loop keeps serving everyone else.
+
+Runs:
+
+* ``wsgi``        - the current deployment: gunicorn, ``portfolio.wsgi``;
+* ``asgi-sync``   - the same DRF endpoint under uvicorn;
+* ``asgi-async``  - the ``/api/async/`` endpoint under uvicorn.
+
+Usage (from ``backend/``, against a migrated database with some published
+content; needs ``gunicorn`` and ``uvicorn``)::
+
+    python benchmarks/async_reads.py --clients 50 --slow-clients 3 --seconds 10
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNS = {
+    'wsgi': ('wsgi', '/api/{endpoint}/published/'),
+    'asgi-sync': ('asgi', '/api/{endpoint}/published/'),
+    'asgi-async': ('asgi', '/api/async/{endpoint}/published/'),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port, workers, cache):
+    env = dict(
+        os.environ,
+        RESPONSE_CACHE_ENABLED=str(cache),
+        DJANGO_ALLOWED_HOSTS='127.0.0.1,localhost',
+        # WhiteNoise is sync-only; ASGI deployments leave /static/ to nginx.
+        DJANGO_SERVE_STATIC=str(kind == 'wsgi'),
+    )
+    if kind == 'wsgi':
+        command = [
+            sys.executable, '-m', 'gunicorn', 'portfolio.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--log-level', 'warning',
+        ]
+    else:
+        command = [
+            sys.executable, '-m', 'uvicorn', 'portfolio.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+            '--log-level', 'warning', '--no-access-log',
+        ]
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f'{kind} server did not start')
+
+
+async def fetch(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def slow_client(port, path, stop):
+    """Send a request one byte per second until told to stop."""
+    request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\nX-Padding: {"x" * 200}\r\n\r\n'.encode()
+    while not stop.is_set():
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError:
+            await asyncio.sleep(1)
+            continue
+        try:
+            for byte in request:
+                if stop.is_set():
+                    break
+                writer.write(bytes([byte]))
+                await writer.drain()
+                await asyncio.sleep(1)
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+
+async def client(port, path, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            status = await asyncio.wait_for(fetch(port, path), timeout=deadline - start + 5)
+        except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+            errors.append(None)
+            continue
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(status)
+
+
+async def load(port, path, clients, slow_clients, seconds):
+    stop = asyncio.Event()
+    slow = [asyncio.create_task(slow_client(port, path, stop)) for _ in range(slow_clients)]
+    await asyncio.sleep(1)  # let the slow clients grab their connections
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(client(port, path, deadline, latencies, errors) for _ in range(clients)))
+    stop.set()
+    for task in slow:
+        task.cancel()
+    await asyncio.gather(*slow, return_exceptions=True)
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--slow-clients', type=int, default=3)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=3, help='processes per server (production runs 3)')
+    parser.add_argument('--endpoint', default='projects', choices=['projects', 'journal-entries', 'services'])
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache so every request hits the database')
+    parser.add_argument('--runs', nargs='+', default=list(RUNS), choices=list(RUNS))
+    args = parser.parse_args()
+
+    for run in args.runs:
+        kind, path = RUNS[run]
+        path = path.format(endpoint=args.endpoint)
+        port = free_port()
+        server = start_server(kind, port, args.workers, cache=not args.no_cache)
+        try:
+            asyncio.run(fetch(port, path))  # warm up
+            latencies, errors = asyncio.run(
+                load(port, path, args.clients, args.slow_clients, args.seconds)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+        if latencies:
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        else:
+            p50 = p99 = float('nan')
+        print(
+            f'{run:>10}: {len(latencies) / args.seconds:8.1f} req/s, '
+            f'p50 {p50:7.1f} ms, p99 {p99:7.1f} ms, {len(errors)} errors'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Database connection mode benchmark: per-request vs persistent vs pooled.
+
+Runs the WSGI application in a fresh interpreter per mode (see
+``portfolio/database.py``) and drives it from ``--threads`` threads, as a
+threaded worker would, each sending ``--requests`` anonymous reads through
+the full request cycle, so connections are opened and released exactly as in
+production. Reports throughput, latency percentiles and how many PostgreSQL
+connections each mode opened. The response cache is off so every request
+queries the database.
+
+Runs:
+
+* ``per-request``  - connect and disconnect around every request;
+* ``persistent``   - one health-checked connection per thread;
+* ``pool``         - a psycopg 3 pool shared by the threads;
+* ``pool-prepared`` - the pool with server-side prepared statements.
+
+Usage (from ``backend/``, against a migrated PostgreSQL database with some
+published content; ``pool`` modes need ``psycopg[pool]``)::
+
+    python benchmarks/db_connections.py --threads 8 --requests 200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNS = {
+    'per-request': {'DATABASE_CONNECTIONS': 'per-request'},
+    'persistent': {'DATABASE_CONNECTIONS': 'persistent'},
+    'pool': {'DATABASE_CONNECTIONS': 'pool'},
+    'pool-prepared': {'DATABASE_CONNECTIONS': 'pool', 'DATABASE_PREPARE_THRESHOLD': '2'},
+}
+
+PATHS = (
+    '/api/projects/published/?page=1',
+    '/api/journal-entries/published/?page=1',
+    '/api/services/published/',
+)
+
+CHILD = r'''
+import json, os, sys, threading, time
+from wsgiref.util import setup_testing_defaults
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio.settings')
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+threads, requests, paths = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3:]
+if connection.vendor != 'postgresql':
+    sys.exit('This benchmark needs a PostgreSQL DATABASE_URL')
+application = get_wsgi_application()
+opened = []
+connection_created.connect(lambda sender, connection, **kwargs: opened.append(1), weak=False)
+
+def get(path):
+    environ = {'REQUEST_METHOD': 'GET', 'HTTP_HOST': 'localhost', 'HTTP_ACCEPT': 'application/json'}
+    environ['PATH_INFO'], _, environ['QUERY_STRING'] = path.partition('?')
+    setup_testing_defaults(environ)
+    statuses = []
+    body = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(body)
+    finally:
+        body.close()
+    if not statuses[0].startswith('200'):
+        raise RuntimeError(f'{path}: {statuses[0]}')
+
+latencies = []
+def client(index):
+    for number in range(requests):
+        start = time.perf_counter()
+        get(paths[(index + number) % len(paths)])
+        latencies.append(time.perf_counter() - start)
+
+for path in paths:
+    get(path)  # warm imports, URL resolving and the pool
+opened.clear()
+start = time.perf_counter()
+workers = [threading.Thread(target=client, args=(index,)) for index in range(threads)]
+for worker in workers:
+    worker.start()
+for worker in workers:
+    worker.join()
+print(json.dumps({'seconds': time.perf_counter() - start, 'latencies': latencies, 'connections': len(opened)}))
+'''
+
+
+def run(mode, threads, requests):
+    env = dict(os.environ, RESPONSE_CACHE_ENABLED='False', PERFORMANCE_METRICS_ENABLED='False', **RUNS[mode])
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD, str(threads), str(requests), *PATHS],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        return {'error': (result.stderr.strip().splitlines() or ['failed'])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per thread')
+    parser.add_argument('--mode', action='append', choices=RUNS, help='Only run this mode (repeatable)')
+    args = parser.parse_args()
+
+    for mode in args.mode or RUNS:
+        result = run(mode, args.threads, args.requests)
+        if 'error' in result:
+            print(f'{mode:>14}: {result["error"]}')
+            continue
+        latencies = [seconds * 1000 for seconds in result['latencies']]
+        print(
+            f'{mode:>14}: {len(latencies) / result["seconds"]:7.1f} req/s, '
+            f'p50 {percentile(latencies, 0.5):6.1f} ms, p95 {percentile(latencies, 0.95):6.1f} ms, '
+            f'p99 {percentile(latencies, 0.99):6.1f} ms, {result["connections"]} connections opened'
+        )
+
+
+if __name__ == '__main__':
+    main()
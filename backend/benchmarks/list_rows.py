@@ -0,0 +1,123 @@
+"""
+List endpoint benchmark: list serializers vs ``values()`` rows (core/rows.py).
+
+Inserts ``--rows`` published projects and journal entries with nested files
+and image variants (rolled back afterwards), then times fetching and
+serializing them both ways -- model instances through
+``ProjectListSerializer``/``JournalEntryListSerializer``, and one
+``values()`` query through ``RowSerializer`` -- for each page size. Outputs
+are checked to be identical before timing.
+
+Usage (from ``backend/``, against a migrated database)::
+
+    python benchmarks/list_rows.py --rows 500 --page-sizes 12 100 500
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Rollback(Exception):
+    pass
+
+
+def make_file(number):
+    from portfolio.core.models import File
+
+    name = f'uploads/2024/05/01/bench-{number}.jpg'
+    return File(
+        title=f'Image {number}', file=name, filename_disk=f'bench-{number}.jpg', mime_type='image/jpeg',
+        filesize=245_000 + number, width=1920, height=1080, description='Cover image, shot on location.',
+        variants={
+            'source': name,
+            **{
+                kind: {str(width): f'variants/bench-{number}/{width}.{ext}' for width in (320, 640, 960, 1280, 1920)}
+                for kind, ext in (('avif', 'avif'), ('webp', 'webp'), ('jpeg', 'jpg'))
+            },
+        },
+    )
+
+
+def insert(count):
+    from portfolio.core.models import File, JournalEntry, Project
+
+    files = File.objects.bulk_create([make_file(number) for number in range(2 * count)])
+    now = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    Project.objects.bulk_create([
+        Project(
+            title=f'Bench project {number}', slug=f'bench-project-{number}', status='published',
+            description='A short summary of the project and what it does. ' * 3, main_image=files[number],
+            category='Web', year='2024', tech_stack=['Django', 'React', 'PostgreSQL'], tags=['web', 'api'],
+        )
+        for number in range(count)
+    ])
+    JournalEntry.objects.bulk_create([
+        JournalEntry(
+            title=f'Bench entry {number}', title_ar=f'تدوينة {number}', slug=f'bench-entry-{number}',
+            excerpt='What I learned this week. ' * 4, status='published', publication_date=now,
+            featured_image=files[count + number], tags=['notes'], tags_ar=['ملاحظات'], language='both',
+        )
+        for number in range(count)
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[12, 100, 500])
+    parser.add_argument('--number', type=int, default=20, help='renders per measurement')
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio.settings')
+    import django
+
+    django.setup()
+    from django.db import transaction
+
+    from portfolio.core.models import JournalEntry, Project
+    from portfolio.core.renderers import ORJSONRenderer
+    from portfolio.core.rows import RowSerializer
+    from portfolio.core.serializers import JournalEntryListSerializer, ProjectListSerializer
+
+    cases = {
+        'projects': (ProjectListSerializer, Project.objects.filter(slug__startswith='bench-').select_related('main_image').order_by('-created_at')),
+        'journal': (JournalEntryListSerializer, JournalEntry.objects.filter(slug__startswith='bench-').select_related('featured_image')),
+    }
+    renderer = ORJSONRenderer()
+    try:
+        with transaction.atomic():
+            insert(args.rows)
+            for name, (serializer_class, queryset) in cases.items():
+                for page_size in args.page_sizes:
+                    def serializer():
+                        page = list(queryset[:page_size])
+                        return renderer.render(serializer_class(page, many=True).data)
+
+                    def rows():
+                        row_serializer = RowSerializer.for_serializer(serializer_class)
+                        page = list(row_serializer.values(queryset)[:page_size])
+                        return renderer.render(row_serializer.data(page))
+
+                    if serializer() != rows():
+                        raise SystemExit(f'{name}: outputs differ')
+                    timings = {
+                        label: min(timeit.repeat(function, number=args.number, repeat=5)) / args.number * 1e3
+                        for label, function in (('serializer', serializer), ('rows', rows))
+                    }
+                    print(
+                        f'{name:>8} x {page_size:4}: serializer {timings["serializer"]:7.2f} ms, '
+                        f'rows {timings["rows"]:6.2f} ms ({timings["serializer"] / timings["rows"]:.1f}x)'
+                    )
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
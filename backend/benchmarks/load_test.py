@@ -0,0 +1,281 @@
+"""
+API load test with latency-regression checks.
+
+Starts the production WSGI server (gunicorn, ``--workers`` processes) on a
+local port, or targets ``--url``, and runs ``--clients`` concurrent clients
+for ``--seconds``. Each client picks requests from the public endpoint mix
+the site generates:
+
+* ``projects-published`` / ``journal-published`` - list pages, spread over
+  the pages that exist;
+* ``journal-search``   - ``?search=`` with words from published titles;
+* ``project-by-slug`` / ``journal-by-slug`` - detail reads of published slugs;
+* ``services``         - the services list;
+* ``home``             - the homepage bundle.
+
+Reports p50/p95/p99 latency and throughput per endpoint and overall, then
+compares them with the baseline file: a run fails (exit status 1) when any
+endpoint's p95 or p99 is more than ``--tolerance`` slower, its throughput
+more than ``--tolerance`` lower, or any request errors. Baselines depend on
+the machine and dataset, so record them on the machine that checks them
+(``--update-baseline``). Without a baseline file the run only reports, or
+fails with ``--require-baseline``.
+
+Usage (from ``backend/``, against a migrated database filled by
+``generate_dataset``; ``run-load-tests.sh`` in the repository root does
+both)::
+
+    python benchmarks/load_test.py --clients 20 --seconds 30 --update-baseline
+    python benchmarks/load_test.py --clients 20 --seconds 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import quote, urlsplit
+
+from async_reads import free_port, start_server
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, 'benchmarks', 'baselines', 'load_test.json')
+
+# (name, weight, path template)
+MIX = (
+    ('projects-published', 4, '/api/projects/published/?page={page}'),
+    ('journal-published', 4, '/api/journal-entries/published/?page={page}'),
+    ('journal-search', 2, '/api/journal-entries/?search={term}'),
+    ('project-by-slug', 2, '/api/projects/by_slug/?slug={slug}'),
+    ('journal-by-slug', 2, '/api/journal-entries/by_slug/?slug={slug}'),
+    ('services', 1, '/api/services/published/'),
+    ('home', 1, '/api/home/'),
+)
+
+# Latencies within this many milliseconds of the baseline never count as a
+# regression, so fast endpoints do not fail on scheduler noise.
+SLACK_MS = 2.0
+
+
+async def fetch(host, port, path):
+    """Return the status and body of ``GET path``."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n'
+            f'Accept-Encoding: identity\r\nConnection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    if b'transfer-encoding: chunked' in head.lower():
+        body = dechunk(body)
+    return status, body
+
+
+def dechunk(body):
+    chunks = []
+    while body:
+        size, _, body = body.partition(b'\r\n')
+        size = int(size.split(b';')[0], 16)
+        if not size:
+            break
+        chunks.append(body[:size])
+        body = body[size + 2:]
+    return b''.join(chunks)
+
+
+async def get_json(host, port, path):
+    status, body = await fetch(host, port, path)
+    if status != 200:
+        raise RuntimeError(f'{path}: {status}')
+    return json.loads(body)
+
+
+async def discover(host, port):
+    """Return the parameters each endpoint draws from: pages, slugs and search terms."""
+    params = {}
+    for name, section, detail in (('projects', 'projects', 'project'), ('journal', 'journal-entries', 'journal')):
+        first = await get_json(host, port, f'/api/{section}/published/?page=1')
+        rows = list(first['results'])
+        pages = 1
+        if first.get('next'):
+            # Page sizes differ per section; the first page tells us this one's.
+            pages = max(1, -(-first['count'] // len(rows)))
+            last = await get_json(host, port, f'/api/{section}/published/?page={pages}')
+            rows += last['results']
+        params[f'{name}-published'] = [{'page': page} for page in range(1, pages + 1)]
+        params[f'{detail}-by-slug'] = [{'slug': quote(row['slug'])} for row in rows]
+        if name == 'journal':
+            words = {word.strip('.,:;!?').lower() for row in rows for word in row['title'].split()}
+            params['journal-search'] = [{'term': quote(word)} for word in sorted(words) if len(word) > 3]
+    return params
+
+
+async def client(host, port, mix, params, rng, deadline, results):
+    names = [name for name, _, _ in mix]
+    weights = [weight for _, weight, _ in mix]
+    paths = dict((name, path) for name, _, path in mix)
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        path = paths[name].format(**rng.choice(params.get(name, [{}])))
+        start = time.perf_counter()
+        try:
+            status, _ = await asyncio.wait_for(fetch(host, port, path), timeout=30)
+        except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+            status = None
+        elapsed = time.perf_counter() - start
+        if status == 200:
+            results[name]['latencies'].append(elapsed)
+        else:
+            results[name]['errors'] += 1
+
+
+async def load(host, port, clients, seconds, seed):
+    params = await discover(host, port)
+    # Endpoints without slugs or search terms (an empty section) are left out.
+    mix = [(name, weight, path) for name, weight, path in MIX if params.get(name, [{}])]
+    results = {name: {'latencies': [], 'errors': 0} for name, _, _ in mix}
+    # Warm every endpoint once (imports, caches, prepared statements).
+    for name, _, path in mix:
+        await fetch(host, port, path.format(**params.get(name, [{}])[0]))
+    start = time.perf_counter()
+    deadline = start + seconds
+    await asyncio.gather(*(
+        client(host, port, mix, params, random.Random(seed + index), deadline, results)
+        for index in range(clients)
+    ))
+    return results, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(latencies, errors, seconds):
+    latencies = [latency * 1000 for latency in latencies]
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0, 'p50': None, 'p95': None, 'p99': None}
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / seconds, 1),
+        'p50': round(percentile(latencies, 0.5), 2),
+        'p95': round(percentile(latencies, 0.95), 2),
+        'p99': round(percentile(latencies, 0.99), 2),
+    }
+
+
+def report(results, seconds):
+    endpoints = {
+        name: summarize(result['latencies'], result['errors'], seconds) for name, result in results.items()
+    }
+    endpoints['total'] = summarize(
+        [latency for result in results.values() for latency in result['latencies']],
+        sum(result['errors'] for result in results.values()),
+        seconds,
+    )
+    return endpoints
+
+
+def regressions(endpoints, baseline, tolerance):
+    """Return a message for every metric that is worse than the baseline allows."""
+    problems = []
+    for name, current in endpoints.items():
+        if current['errors'] and name != 'total':
+            problems.append(f'{name}: {current["errors"]} failed requests')
+        previous = baseline.get(name)
+        if not previous or not previous['requests'] or not current['requests']:
+            continue
+        for metric in ('p95', 'p99'):
+            limit = previous[metric] * (1 + tolerance) + SLACK_MS
+            if current[metric] > limit:
+                problems.append(f'{name}: {metric} {current[metric]:.1f} ms > {limit:.1f} ms (baseline {previous[metric]:.1f} ms)')
+        floor = previous['rps'] * (1 - tolerance)
+        if current['rps'] < floor:
+            problems.append(f'{name}: {current["rps"]:.1f} req/s < {floor:.1f} req/s (baseline {previous["rps"]:.1f} req/s)')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--workers', type=int, default=3, help='gunicorn processes (production runs 3)')
+    parser.add_argument('--url', help='run against this already running server instead of starting one')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache so every request hits the database')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the request sequence')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument(
+        '--require-baseline', action='store_true', help='fail instead of only reporting when there is no baseline',
+    )
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression as a fraction (default 0.2)')
+    parser.add_argument('--output', help='also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', free_port()
+        server = start_server('wsgi', port, args.workers, cache=not args.no_cache)
+    try:
+        results, seconds = asyncio.run(load(host, port, args.clients, args.seconds, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    endpoints = report(results, seconds)
+    for name, result in endpoints.items():
+        if not result['requests']:
+            print(f'{name:>18}: no successful requests, {result["errors"]} errors')
+            continue
+        print(
+            f'{name:>18}: {result["rps"]:8.1f} req/s, p50 {result["p50"]:7.1f} ms, '
+            f'p95 {result["p95"]:7.1f} ms, p99 {result["p99"]:7.1f} ms, {result["errors"]} errors'
+        )
+
+    run = {
+        'config': {'clients': args.clients, 'seconds': args.seconds, 'workers': args.workers, 'cache': not args.no_cache},
+        'endpoints': endpoints,
+    }
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(run, output, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as output:
+            json.dump(run, output, indent=2)
+        print(f'Baseline written to {args.baseline}')
+        return
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; record one with --update-baseline')
+        if args.require_baseline:
+            sys.exit(1)
+        return
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline['config'] != run['config']:
+        print(f'Warning: baseline was recorded with {baseline["config"]}, this run used {run["config"]}')
+    problems = regressions(endpoints, baseline['endpoints'], args.tolerance)
+    if problems:
+        print('Latency regressions:')
+        for problem in problems:
+            print(f'  {problem}')
+        sys.exit(1)
+    print(f'No regressions against {args.baseline} (tolerance {args.tolerance:.0%})')
+
+
+if __name__ == '__main__':
+    main()
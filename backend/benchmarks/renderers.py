@@ -0,0 +1,114 @@
+"""
+JSON renderer benchmark: DRF's ``JSONRenderer`` vs ``ORJSONRenderer``.
+
+Renders realistic payloads -- a page of ``published`` projects and journal
+entries with nested files and image variants, and a project detail with a
+long HTML body and a gallery -- built by the real serializers from unsaved
+model instances, so no database is needed. Outputs are checked to be
+identical before timing.
+
+Usage (from ``backend/``)::
+
+    python benchmarks/renderers.py --page-size 12 --number 2000
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_file(number):
+    from portfolio.core.models import File
+
+    return File(
+        id=number, title=f'Image {number}', file=f'uploads/2024/05/01/image-{number}.jpg',
+        filename_disk=f'image-{number}.jpg', mime_type='image/jpeg', filesize=245_000 + number,
+        width=1920, height=1080, description='Cover image, shot on location.',
+        variants={
+            'source': f'uploads/2024/05/01/image-{number}.jpg',
+            **{
+                name: {str(width): f'variants/{number}/{width}.{ext}' for width in (320, 640, 960, 1280, 1920)}
+                for name, ext in (('avif', 'avif'), ('webp', 'webp'), ('jpeg', 'jpg'))
+            },
+        },
+    )
+
+
+def payloads(page_size):
+    from portfolio.core.models import JournalEntry, Project
+    from portfolio.core.serializers import (
+        FileSerializer, JournalEntryListSerializer, ProjectListSerializer,
+    )
+
+    now = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    projects = [
+        Project(
+            id=number, title=f'Project {number}', slug=f'project-{number}', status='published',
+            description='A short summary of the project and what it does. ' * 3,
+            main_image=make_file(number), category='Web', year='2024',
+            tech_stack=['Django', 'React', 'PostgreSQL', 'Redis'], tags=['web', 'api', 'تطوير'],
+            created_at=now, updated_at=now,
+        )
+        for number in range(page_size)
+    ]
+    entries = [
+        JournalEntry(
+            id=number, title=f'Entry {number}', title_ar=f'تدوينة {number}', slug=f'entry-{number}',
+            excerpt='What I learned this week. ' * 4, excerpt_ar='ما تعلمته هذا الأسبوع. ' * 4,
+            status='published', publication_date=now, featured_image=make_file(100 + number),
+            tags=['notes', 'django'], tags_ar=['ملاحظات'], language='both',
+        )
+        for number in range(page_size)
+    ]
+
+    def page(results):
+        return {'count': 240, 'next': 'http://localhost/api/projects/published/?page=2', 'previous': None, 'results': results}
+
+    detail = dict(ProjectListSerializer(projects[0]).data)
+    detail['long_description_html'] = '<p>' + 'Paragraph with <strong>markup</strong> and details. ' * 200 + '</p>'
+    detail['gallery_images'] = [FileSerializer(make_file(200 + number)).data for number in range(8)]
+    return {
+        'projects page': page(ProjectListSerializer(projects, many=True).data),
+        'journal page': page(JournalEntryListSerializer(entries, many=True).data),
+        'project detail': detail,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--page-size', type=int, default=12)
+    parser.add_argument('--number', type=int, default=2000, help='renders per measurement')
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio.settings')
+    import django
+
+    django.setup()
+    from rest_framework.renderers import JSONRenderer
+
+    from portfolio.core.renderers import ORJSONRenderer
+
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+    for name, data in payloads(args.page_size).items():
+        content = stdlib.render(data)
+        if fast.render(data) != content:
+            raise SystemExit(f'{name}: renderers disagree')
+        timings = {}
+        for label, renderer in (('JSONRenderer', stdlib), ('ORJSONRenderer', fast)):
+            seconds = min(timeit.repeat(lambda: renderer.render(data), number=args.number, repeat=5))
+            timings[label] = seconds / args.number * 1e6
+        print(
+            f'{name:>15} ({len(content) / 1024:6.1f} KiB): '
+            f'JSONRenderer {timings["JSONRenderer"]:8.1f} us, '
+            f'ORJSONRenderer {timings["ORJSONRenderer"]:7.1f} us '
+            f'({timings["JSONRenderer"] / timings["ORJSONRenderer"]:.1f}x)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Worker start-up benchmark.
+
+Boots the WSGI application in fresh interpreters, the way every gunicorn
+worker does, and reports the wall time and the number of SQL queries run
+before the first request. ``legacy`` additionally runs the admin-user and
+placeholder checks that used to live in ``CoreConfig.ready()``.
+
+Usage (from ``backend/``, against a migrated and bootstrapped database)::
+
+    python benchmarks/startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio.settings')
+from django.db.backends import utils
+queries = 0
+execute = utils.CursorWrapper.execute
+def counting_execute(self, *args, **kwargs):
+    global queries
+    queries += 1
+    return execute(self, *args, **kwargs)
+utils.CursorWrapper.execute = counting_execute
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+if sys.argv[1] == 'legacy':
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from portfolio.core import create_placeholder_data
+    create_placeholder_data()
+    with transaction.atomic():
+        User.objects.filter(username='admin').exists()
+print(json.dumps({'seconds': time.perf_counter() - start, 'queries': queries}))
+'''
+
+
+def boot(mode):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, mode],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    for mode in ('legacy', 'current'):
+        boot(mode)  # warm the bytecode cache
+        results = [boot(mode) for _ in range(args.runs)]
+        seconds = [result['seconds'] * 1000 for result in results]
+        print(
+            f'{mode:>8}: median {statistics.median(seconds):7.1f} ms, '
+            f'max {max(seconds):7.1f} ms, {results[0]["queries"]} queries per worker'
+        )
+
+
+if __name__ == '__main__':
+    main()
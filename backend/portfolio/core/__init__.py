@@ -4,6 +4,7 @@ def create_placeholder_data():
     """
     Check if there are any projects, blog posts, or services already.
     If not, create 12 placeholder blog posts, 6 projects, and 3 services.
+    Returns True if anything was created.
     """
     from django.db import transaction
     from .models import Project, JournalEntry, Service
@@ -15,7 +16,7 @@ def create_placeholder_data():
 
     # If there are already records, don't create placeholders
     if has_projects and has_journal_entries and has_services:
-        return
+        return False
 
     with transaction.atomic():
         # Create placeholder projects if needed
@@ -75,33 +76,4 @@ def create_placeholder_data():
                     sort=i+1
                 )
 
-# Import Django's AppConfig to use ready() method
-from django.apps import AppConfig
-
-class CoreConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'portfolio.core'
-
-    def ready(self):
-        """
-        Method called when the app is ready.
-        This is where we call our placeholder data creation function and create admin user.
-        """
-        # Call the function to create placeholder data
-        # Avoid circular import by calling the function directly
-        create_placeholder_data()
-
-        # Create admin user if it doesn't exist
-        try:
-            from django.contrib.auth.models import User
-            from django.db import transaction
-            with transaction.atomic():
-                if not User.objects.filter(username='admin').exists():
-                    User.objects.create_superuser('admin', 'admin@test.com', 'admin')
-                    print('Admin user created successfully')
-        except Exception as e:
-            # Log the error but don't crash the application
-            print(f"Error creating admin user: {e}")
-
-# Configure the default app config
-default_app_config = 'portfolio.core.CoreConfig'
+    return True
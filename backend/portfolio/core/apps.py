@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'portfolio.core'
+
+    def ready(self):
+        """
+        Connect the signal receivers; nothing here may touch the database.
+
+        Seeding the admin user and placeholder content is done once per
+        deploy by the ``bootstrap`` management command.
+        """
+        from . import signals  # noqa: F401
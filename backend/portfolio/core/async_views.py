@@ -0,0 +1,233 @@
+"""
+Async read endpoints for the public site, under ``/api/async/``.
+
+DRF views are synchronous, so every request to them holds a worker (or, under
+ASGI, a thread) from the first byte read to the last byte written. These
+views serve the same ``published``, ``retrieve`` and ``by_slug`` responses
+natively on the event loop:
+
+* querysets are still built by the viewsets (filters, tags, search and
+  ordering stay in one place) and evaluated with the async ORM;
+* pagination, conditional GET and the response cache are the ones the sync
+  endpoints use, so bodies and ETags are identical. Cache entries are kept
+  apart from the sync ones only because pagination links differ.
+
+Run them under an ASGI server (see the README); under WSGI they still work,
+one event loop per request.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.urls import path
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+
+from .cache import cache_enabled, compression_enabled, entry_response, response_cache, response_validators
+from .compression import compress_response
+from .conditional import acompute_validators
+from .models import File, JournalEntry, Project
+from .renderers import ORJSONRenderer, RawJSON
+from .rows import RowSerializer
+from .snapshots import collect_snapshots, snapshot_values
+from .serializers import (
+    JournalEntryListSerializer, JournalEntrySerializer,
+    ProjectListSerializer, ProjectSerializer,
+    ServiceListSerializer, ServiceSerializer,
+)
+from .views import JournalEntryViewSet, ProjectViewSet, ServiceViewSet
+
+
+def render(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+class AsyncReadEndpoints:
+    """The async ``published``, ``retrieve`` and ``by_slug`` views of one viewset."""
+
+    def __init__(self, viewset_class, list_serializer_class, serializer_class, paginate, cached_models=None):
+        self.viewset_class = viewset_class
+        self.list_serializer_class = list_serializer_class
+        self.serializer_class = serializer_class
+        self.paginate = paginate
+        # Models whose changes invalidate the cached ``published`` response;
+        # None when the sync endpoint is not cached either.
+        self.cached_models = cached_models
+        self.basename = viewset_class.queryset.model._meta.model_name
+
+    def get_viewset(self, request, action, **kwargs):
+        """Return a viewset instance set up as DRF would for ``action``."""
+        viewset = self.viewset_class(action=action, args=(), kwargs=kwargs, format_kwarg=None)
+        viewset.request = Request(request)
+        viewset.basename = self.basename
+        return viewset
+
+    async def build(self, viewset, method):
+        """Call a queryset builder of ``viewset``; full-text search queries SQLite's index while building."""
+        if 'search' in viewset.request.query_params:
+            return await sync_to_async(method)()
+        return method()
+
+    async def conditional(self, viewset, queryset, respond):
+        """Answer ``If-None-Match``/``If-Modified-Since`` like ``conditional.conditional_get``."""
+        etag, last_modified = await acompute_validators(
+            queryset, viewset.request.query_params, viewset.conditional_models,
+        )
+        if etag is None:
+            return await respond()
+        response = get_conditional_response(viewset.request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = await respond()
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    async def published(self, request):
+        viewset = self.get_viewset(request, 'published')
+
+        async def respond():
+            queryset = await self.build(viewset, viewset.get_published_queryset)
+
+            async def respond_data():
+                return render(await self.published_data(viewset, queryset))
+
+            return await self.conditional(viewset, queryset, respond_data)
+
+        try:
+            return await self.cached(viewset, respond)
+        except APIException as exc:
+            return render({'detail': exc.detail}, status=exc.status_code)
+
+    async def cached(self, viewset, respond):
+        """Serve ``published`` through the response cache, like ``cached_response``."""
+        if self.cached_models is None or not cache_enabled():
+            return await respond()
+
+        request = viewset.request
+        namespace = f'async.{viewset.basename}.published'
+        digest = response_cache.build_key(namespace, request)
+        # One thread hop for the generations and the entry.
+        entry, state, generations = await sync_to_async(response_cache.lookup)(
+            namespace, digest, self.cached_models,
+        )
+        if state in ('hit', 'stale'):
+            response_cache.record(state)
+            return entry_response(entry, state, request)
+
+        response_cache.record('miss')
+        response = await respond()
+        if response.status_code != 200:
+            return response
+        entry = await sync_to_async(response_cache.store)(
+            namespace, digest, generations, response.content, response['Content-Type'], self.cached_models,
+            response_validators(response),
+        )
+        response['X-Cache'] = 'MISS'
+        if compression_enabled():
+            compress_response(request, response, entry['encoded'])
+        return response
+
+    async def published_data(self, viewset, queryset):
+        if viewset.snapshots_apply(viewset.get_fieldset_context()):
+            data = await self.snapshot_data(viewset, queryset)
+            if data is not None:
+                return data
+        # Built from values() rows, like the sync endpoints (see rows.py).
+        rows = RowSerializer.for_serializer(self.list_serializer_class, viewset.get_fieldset_context())
+        queryset = rows.values(queryset)
+        if self.paginate:
+            paginator = viewset.paginator
+            page = await paginator.apaginate_queryset(queryset, viewset.request, view=viewset)
+            if page is not None:
+                return paginator.get_paginated_response(rows.data(page)).data
+        return rows.data([row async for row in queryset])
+
+    async def snapshot_data(self, viewset, queryset):
+        """``published`` data from the stored list snapshots, like ``RowListMixin.list_snapshots``."""
+        rows = snapshot_values(queryset, 'list_snapshot')
+        if self.paginate:
+            paginator = viewset.paginator
+            page = await paginator.apaginate_queryset(rows, viewset.request, view=viewset)
+            if page is not None:
+                data = collect_snapshots(page, 'list_snapshot')
+                return None if data is None else paginator.get_paginated_response(data).data
+        return collect_snapshots([row async for row in rows], 'list_snapshot')
+
+    async def retrieve(self, request, slug):
+        viewset = self.get_viewset(request, 'retrieve', slug=slug)
+        queryset = await self.build(viewset, viewset.get_queryset)
+
+        async def respond():
+            try:
+                instance = await queryset.aget(slug=slug)
+            except queryset.model.DoesNotExist:
+                return not_found(queryset.model)
+            context = viewset.get_serializer_context()
+            return render(self.serializer_class(instance, context=context).data)
+
+        return await self.conditional(viewset, queryset.filter(slug=slug), respond)
+
+    async def by_slug(self, request):
+        viewset = self.get_viewset(request, 'by_slug')
+        slug = request.GET.get('slug')
+        if not slug:
+            return render({'error': 'Slug parameter is required'}, status=400)
+        queryset = await self.build(viewset, viewset.get_queryset)
+
+        async def respond():
+            if viewset.snapshots_apply(viewset.get_fieldset_context()):
+                snapshot = await (
+                    queryset.filter(slug=slug, status='published').prefetch_related(None)
+                    .values_list('detail_snapshot', flat=True).afirst()
+                )
+                if snapshot is not None:
+                    return render(RawJSON(snapshot))
+            try:
+                instance = await queryset.aget(slug=slug, status='published')
+            except queryset.model.DoesNotExist:
+                return not_found(queryset.model)
+            return render(self.serializer_class(instance, context=viewset.get_fieldset_context()).data)
+
+        return await self.conditional(viewset, viewset.get_conditional_queryset(), respond)
+
+    def as_view(self, action):
+        view = require_safe(getattr(self, action))
+        # Labels for the request metrics (see middleware.resolve_view_name).
+        view.__name__ = f'Async{self.viewset_class.__name__}'
+        view.actions = {'get': action, 'head': action}
+        # Reads may be served by a replica (see replicas.py).
+        view.replica_reads = True
+        return view
+
+    def urls(self, prefix):
+        name = f'async-{self.basename}'
+        return [
+            path(f'{prefix}/published/', self.as_view('published'), name=f'{name}-published'),
+            path(f'{prefix}/by_slug/', self.as_view('by_slug'), name=f'{name}-by-slug'),
+            path(f'{prefix}/<slug:slug>/', self.as_view('retrieve'), name=f'{name}-detail'),
+        ]
+
+
+def not_found(model):
+    # Same body DRF builds from get_object_or_404's Http404.
+    return render({'detail': f'No {model._meta.object_name} matches the given query.'}, status=404)
+
+
+projects = AsyncReadEndpoints(
+    ProjectViewSet, ProjectListSerializer, ProjectSerializer, paginate=True, cached_models=(Project, File),
+)
+journal_entries = AsyncReadEndpoints(
+    JournalEntryViewSet, JournalEntryListSerializer, JournalEntrySerializer,
+    paginate=True, cached_models=(JournalEntry, File),
+)
+services = AsyncReadEndpoints(ServiceViewSet, ServiceListSerializer, ServiceSerializer, paginate=False)
+
+urlpatterns = [
+    *projects.urls('projects'),
+    *journal_entries.urls('journal-entries'),
+    *services.urls('services'),
+]
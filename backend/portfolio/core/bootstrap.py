@@ -0,0 +1,51 @@
+"""
+One-shot, idempotent bootstrap of a fresh database.
+
+Creating the admin user and the placeholder content used to run in
+``CoreConfig.ready()``, i.e. in every worker, every ``manage.py`` call and
+every test process. It now runs once per deploy through ``manage.py
+bootstrap``, after ``migrate``. Concurrent runs (several containers starting
+at once) are serialized with a PostgreSQL advisory lock and then find the
+work already done.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# Arbitrary application-wide key for pg_advisory_xact_lock().
+BOOTSTRAP_LOCK_ID = 7_302_010
+
+ADMIN_USERNAME = 'admin'
+ADMIN_EMAIL = 'admin@test.com'
+ADMIN_PASSWORD = 'admin'
+
+
+def acquire_bootstrap_lock(using=DEFAULT_DB_ALIAS):
+    """Block until no other bootstrap holds the lock; released on commit."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [BOOTSTRAP_LOCK_ID])
+
+
+def ensure_admin_user():
+    """Create the default admin user unless it exists; returns True if created."""
+    from django.contrib.auth.models import User
+
+    if User.objects.filter(username=ADMIN_USERNAME).exists():
+        return False
+    User.objects.create_superuser(ADMIN_USERNAME, ADMIN_EMAIL, ADMIN_PASSWORD)
+    return True
+
+
+def bootstrap(admin=True, placeholders=True):
+    """Run every bootstrap step in one locked transaction; returns the steps that did work."""
+    from . import create_placeholder_data
+
+    done = []
+    with transaction.atomic():
+        acquire_bootstrap_lock()
+        if admin and ensure_admin_user():
+            done.append('admin user')
+        if placeholders and create_placeholder_data():
+            done.append('placeholder data')
+    return done
@@ -0,0 +1,330 @@
+"""
+Versioned response cache for the public list endpoints.
+
+Every cached model has a generation counter stored in the cache. Writes to a
+model bump its counter (see ``signals.py``), which makes every entry built from
+the old generation stale without having to enumerate and delete keys.
+
+Entries are stored under a key derived from the endpoint and the normalized
+query string only, and carry the generations they were built from. That lets a
+stale entry keep being served for a short grace period while a single request
+rebuilds it (stale-while-revalidate), instead of every worker stampeding the
+database at once right after an editor hits save.
+
+Entries also keep the ``ETag``/``Last-Modified`` the view sent (see
+``conditional.py``), so hits and the 304s they answer run no queries.
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from .compression import compress_all, compress_response
+from .replicas import current_replica, max_lag
+
+# Query parameters that can change the response of a cached endpoint. Anything
+# else (cache busters, tracking params) is ignored when building the key.
+CACHE_QUERY_PARAMS = (
+    'status', 'tag', 'tech_stack', 'category', 'search', 'ordering',
+    'page', 'page_size', 'cursor', 'count', 'fields', 'omit', 'expand',
+    'projects', 'journal_entries', 'services',
+)
+
+# Parameters whose mere presence changes the response: an empty ``?cursor=``
+# asks for the first keyset page rather than the page-number format, an empty
+# ``?expand=`` collapses every nested object.
+PRESENCE_QUERY_PARAMS = ('cursor', 'expand')
+
+GENERATION_KEY = 'core:gen:{label}'
+BUMPED_KEY = 'core:bumped:{label}'
+ENTRY_KEY = 'core:resp:{namespace}:{digest}'
+LOCK_KEY = 'core:lock:{namespace}:{digest}'
+
+_bypassed = ContextVar('response_cache_bypassed', default=False)
+
+
+def get_cache():
+    """Return the cache backend used for API responses."""
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def normalize_query(query_params, allowed=CACHE_QUERY_PARAMS):
+    """
+    Return a canonical query string for the given parameters.
+
+    Unknown parameters are dropped, empty values are ignored and the remaining
+    pairs are sorted so that ``?tag=a&page=2`` and ``?page=2&tag=a`` share a key.
+    """
+    pairs = []
+    for name in allowed:
+        for value in query_params.getlist(name):
+            value = value.strip()
+            if value or name in PRESENCE_QUERY_PARAMS:
+                pairs.append((name, value))
+    pairs.sort()
+    return '&'.join(f'{name}={value}' for name, value in pairs)
+
+
+class ResponseCache:
+    """Generation-versioned cache of rendered API responses."""
+
+    def __init__(self):
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+    @property
+    def stale_timeout(self):
+        return getattr(settings, 'RESPONSE_CACHE_STALE_TIMEOUT', 30)
+
+    def record(self, event):
+        with self._lock:
+            self._stats[event] += 1
+
+    def stats(self):
+        """Return a snapshot of the hit/miss/stale/evict counters of this process."""
+        with self._lock:
+            return {event: self._stats[event] for event in ('hit', 'miss', 'stale', 'evict')}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    def get_generations(self, models):
+        """Return the current generation of each model, initialising missing counters."""
+        cache = get_cache()
+        keys = [GENERATION_KEY.format(label=model_label(model)) for model in models]
+        found = cache.get_many(keys)
+        generations = []
+        for key in keys:
+            if key not in found:
+                # add() keeps a concurrent bump from being overwritten.
+                cache.add(key, 1, timeout=None)
+                found[key] = cache.get(key, 1)
+            generations.append(found[key])
+        return tuple(generations)
+
+    def bump(self, model):
+        """Invalidate every entry built from ``model`` by bumping its generation."""
+        cache = get_cache()
+        key = GENERATION_KEY.format(label=model_label(model))
+        try:
+            cache.incr(key)
+        except ValueError:
+            # The counter expired or was never created; any new value works as
+            # long as it differs from what existing entries were stamped with.
+            cache.set(key, int(time.time() * 1000), timeout=None)
+        # Read by last_bumped() (Last-Modified) and fresh_for().
+        cache.set(BUMPED_KEY.format(label=model_label(model)), time.time(), timeout=None)
+
+    def last_bumped(self, models):
+        """
+        Return when any of ``models`` last changed, as a Unix timestamp.
+
+        Unlike ``max(updated_at)`` this also moves on deletes and unpublishes.
+        A time lost with the cache counts as now, so it never goes backwards.
+        """
+        cache = get_cache()
+        keys = [BUMPED_KEY.format(label=model_label(model)) for model in models]
+        found = cache.get_many(keys)
+        for key in keys:
+            if key not in found:
+                cache.add(key, time.time(), timeout=None)
+                found[key] = cache.get(key, time.time())
+        return max(found.values(), default=0)
+
+    def fresh_for(self, models):
+        """
+        Seconds a new entry stays fresh.
+
+        An entry read from a replica within ``REPLICA_MAX_LAG`` seconds of a
+        bump may predate the write, so it only lives that long.
+        """
+        if models and current_replica() is not None:
+            keys = [BUMPED_KEY.format(label=model_label(model)) for model in models]
+            bumped = get_cache().get_many(keys).values()
+            if any(time.time() - value < max_lag() for value in bumped):
+                return min(max_lag(), self.timeout)
+        return self.timeout
+
+    def build_key(self, namespace, request):
+        query = normalize_query(request.query_params)
+        # Pagination links are absolute, so responses differ per host.
+        raw = f'{request.get_host()}?{query}'
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def fetch(self, namespace, digest, generations):
+        """
+        Look up an entry and classify it.
+
+        Returns ``(entry, state)`` where state is ``'hit'``, ``'stale'`` (serve
+        it, another request is rebuilding) or ``'miss'`` (caller must rebuild).
+        """
+        cache = get_cache()
+        entry = cache.get(ENTRY_KEY.format(namespace=namespace, digest=digest))
+        if entry is None:
+            return None, 'miss'
+
+        if entry['generations'] == generations and time.time() < entry['fresh_until']:
+            return entry, 'hit'
+
+        # Outdated. Let exactly one request rebuild it; the lock expires after
+        # the stale window so a crashed rebuild cannot pin the stale copy.
+        lock_key = LOCK_KEY.format(namespace=namespace, digest=digest)
+        if self.stale_timeout > 0 and not cache.add(lock_key, 1, timeout=self.stale_timeout):
+            return entry, 'stale'
+
+        self.record('evict')
+        return None, 'miss'
+
+    def lookup(self, namespace, digest, models):
+        """``fetch`` against the current generations; returns ``(entry, state, generations)``."""
+        generations = self.get_generations(models)
+        entry, state = self.fetch(namespace, digest, generations)
+        return entry, state, generations
+
+    def store(self, namespace, digest, generations, content, content_type, models=(), validators=(None, None)):
+        cache = get_cache()
+        now = time.time()
+        entry = {
+            'generations': generations,
+            'fresh_until': now + self.fresh_for(models),
+            'content': content,
+            'content_type': content_type,
+            'encoded': compress_all(content) if compression_enabled() else {},
+            'etag': validators[0],
+            'last_modified': validators[1],
+        }
+        # Keep the entry around past its freshness so it can be served stale.
+        cache.set(
+            ENTRY_KEY.format(namespace=namespace, digest=digest),
+            entry,
+            timeout=self.timeout + self.stale_timeout,
+        )
+        cache.delete(LOCK_KEY.format(namespace=namespace, digest=digest))
+        return entry
+
+
+response_cache = ResponseCache()
+
+
+def cache_enabled():
+    return getattr(settings, 'RESPONSE_CACHE_ENABLED', True) and not _bypassed.get()
+
+
+@contextmanager
+def bypass_cache():
+    """
+    Run the cached views inside the block straight against the database.
+
+    For callers that must see the current rows, never a stale entry served
+    while another request rebuilds it (the static API export).
+    """
+    token = _bypassed.set(True)
+    try:
+        yield
+    finally:
+        _bypassed.reset(token)
+
+
+def compression_enabled():
+    return getattr(settings, 'RESPONSE_COMPRESSION_ENABLED', True)
+
+
+def response_validators(response):
+    """Return the ``(etag, last_modified)`` a response was sent with, to store in its entry."""
+    return response.get('ETag'), parse_http_date_safe(response.get('Last-Modified', ''))
+
+
+def set_validators(response, etag, last_modified):
+    if etag is not None:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+
+
+def entry_response(entry, state, request):
+    """Answer from a cache entry: a 304 if the client holds it, the (compressed) body otherwise."""
+    etag, last_modified = entry.get('etag'), entry.get('last_modified')
+    response = None
+    if etag is not None or last_modified is not None:
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        set_validators(response, etag, last_modified)
+        if compression_enabled():
+            # After the ETag is set, so encoded bodies get a weak one.
+            compress_response(request, response, entry.get('encoded', {}))
+    else:
+        set_validators(response, etag, last_modified)
+    response['X-Cache'] = state.upper()
+    return response
+
+
+def cached_response(*models):
+    """
+    Cache the rendered output of a read-only viewset action.
+
+    ``models`` are every model whose changes can alter the response, including
+    nested ones (a project list embeds ``File`` rows). Only successful JSON
+    responses are cached; other renderers (e.g. the browsable API) fall
+    through to the view. Apply it outside ``conditional_get`` so that hits
+    are answered before validators are computed.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not cache_enabled():
+                return view_method(self, request, *args, **kwargs)
+
+            renderer, media_type = self.perform_content_negotiation(request)
+            if renderer.format != 'json':
+                return view_method(self, request, *args, **kwargs)
+
+            namespace = f'{self.basename}.{self.action}'
+            digest = response_cache.build_key(namespace, request)
+            generations = response_cache.get_generations(models)
+            entry, state = response_cache.fetch(namespace, digest, generations)
+            if state in ('hit', 'stale'):
+                response_cache.record(state)
+                return entry_response(entry, state, request)
+
+            response_cache.record('miss')
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            content = renderer.render(
+                response.data, media_type, self.get_renderer_context()
+            )
+            content_type = f'{media_type}; charset={renderer.charset}' if renderer.charset else media_type
+            entry = response_cache.store(
+                namespace, digest, generations, content, content_type, models, response_validators(response),
+            )
+
+            # Hand back the already rendered body so DRF does not render twice.
+            response.content = content
+            response['Content-Type'] = content_type
+            response['X-Cache'] = 'MISS'
+            if compression_enabled():
+                compress_response(request, response, entry['encoded'])
+            return response
+        return wrapper
+    return decorator
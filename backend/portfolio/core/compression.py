@@ -0,0 +1,130 @@
+"""
+Content-Encoding negotiation for API responses.
+
+Brotli is used when the ``brotli`` package is installed and the client accepts
+it, gzip otherwise. Cached responses are compressed once, when the entry is
+stored (see ``cache.py``); everything else is compressed per request by
+``CompressionMiddleware``, at a cheaper Brotli level.
+"""
+
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Bodies smaller than this gain nothing from compression.
+MIN_SIZE = 200
+
+# Cached entries are compressed once, so they can afford denser settings.
+CACHED_LEVELS = {'br': 9, 'gzip': 9}
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+
+# Only JSON: HTML pages (the admin) carry CSRF tokens and are left alone.
+COMPRESSIBLE_TYPES = re.compile(r'^application/([^;]+\+)?json\b')
+
+
+def available_encodings():
+    """Return the supported encodings, most preferred first."""
+    encodings = ['br', 'gzip'] if brotli is not None else ['gzip']
+    allowed = getattr(settings, 'RESPONSE_COMPRESSION_ENCODINGS', None)
+    if allowed is not None:
+        encodings = [encoding for encoding in encodings if encoding in allowed]
+    return encodings
+
+
+def parse_accept_encoding(header):
+    """Return ``{coding: q}`` for an ``Accept-Encoding`` header."""
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def choose_encoding(header, encodings=None):
+    """Return the best encoding the client accepts, or None for identity."""
+    accepted = parse_accept_encoding(header)
+    for encoding in encodings if encodings is not None else available_encodings():
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(content, quality=level)
+    # mtime=0 keeps the output deterministic, so ETags stay stable.
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def compress_all(content):
+    """Return ``{encoding: body}`` for every supported encoding worth using."""
+    if len(content) < MIN_SIZE:
+        return {}
+    encoded = {}
+    for encoding in available_encodings():
+        body = compress(content, encoding, CACHED_LEVELS[encoding])
+        if len(body) < len(content):
+            encoded[encoding] = body
+    return encoded
+
+
+def is_compressible(response):
+    return (
+        not response.streaming
+        and not response.has_header('Content-Encoding')
+        and len(response.content) >= MIN_SIZE
+        and bool(COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')))
+    )
+
+
+def set_encoded_content(response, content, encoding):
+    """Replace the body of ``response`` with ``content`` encoded as ``encoding``."""
+    response.content = content
+    response['Content-Length'] = str(len(content))
+    response['Content-Encoding'] = encoding
+    # Like GZipMiddleware: the entity changed, so a strong ETag becomes weak.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+def compress_response(request, response, encoded=None):
+    """
+    Compress ``response`` for ``request`` in place.
+
+    ``encoded`` holds bodies compressed earlier (from a cache entry); without
+    one the body is compressed now.
+    """
+    if not is_compressible(response):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    header = request.META.get('HTTP_ACCEPT_ENCODING')
+    if encoded is not None:
+        encoding = choose_encoding(header, [name for name in available_encodings() if name in encoded])
+        if encoding is not None:
+            set_encoded_content(response, encoded[encoding], encoding)
+        return response
+    encoding = choose_encoding(header)
+    if encoding is None:
+        return response
+    body = compress(response.content, encoding, DYNAMIC_LEVELS[encoding])
+    if len(body) < len(response.content):
+        set_encoded_content(response, body, encoding)
+    return response
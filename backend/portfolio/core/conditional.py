@@ -0,0 +1,130 @@
+"""
+Conditional GET (ETag / Last-Modified) support for the core viewsets.
+
+Validators are computed from a single aggregate over the queryset an action
+would serialize -- ``max(updated_at)`` and ``count`` -- combined with the query
+string and the response cache generations of every model the payload embeds.
+``Last-Modified`` is also never older than the last change to those models
+(see ``ResponseCache.last_bumped``): deleting or unpublishing a row does not
+advance ``max(updated_at)``. When the client already holds the current
+representation we answer 304 before any serialization happens.
+"""
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import response_cache
+
+
+def compute_validators(queryset, query_params, models):
+    """
+    Return ``(etag, last_modified)`` for ``queryset``.
+
+    ``last_modified`` is a Unix timestamp. Both are ``None`` when the queryset
+    is empty so the view can answer as it normally would (404, empty list).
+    """
+    summary = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    if not summary['count']:
+        return None, None
+    return build_validators(
+        queryset, query_params, summary, response_cache.get_generations(models), response_cache.last_bumped(models),
+    )
+
+
+async def acompute_validators(queryset, query_params, models):
+    """Like ``compute_validators`` but evaluated with the async ORM."""
+    summary = await queryset.order_by().aaggregate(last_modified=Max('updated_at'), count=Count('pk'))
+    if not summary['count']:
+        return None, None
+    generations, bumped = await sync_to_async(cache_state)(models)
+    return build_validators(queryset, query_params, summary, generations, bumped)
+
+
+def cache_state(models):
+    return response_cache.get_generations(models), response_cache.last_bumped(models)
+
+
+def compute_combined_validators(label, querysets, query_params, models):
+    """
+    ``compute_validators`` for a response assembled from several querysets.
+
+    The querysets may be sliced (top N rows); each is summarized on its own
+    and ``label`` names the response in the ETag.
+    """
+    summaries = [queryset.aggregate(last_modified=Max('updated_at'), count=Count('pk')) for queryset in querysets]
+    if not any(summary['count'] for summary in summaries):
+        return None, None
+    last_modified = max(summary['last_modified'] for summary in summaries if summary['count'])
+    generations, bumped = cache_state(models)
+    parts = [(summary['count'], summary['last_modified'] and summary['last_modified'].isoformat()) for summary in summaries]
+    params = sorted((name, values) for name, values in query_params.lists())
+    raw = f"{label}|{params}|{parts}|{generations}"
+    return quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest()), int(max(last_modified.timestamp(), bumped))
+
+
+def build_validators(queryset, query_params, summary, generations, bumped):
+    last_modified = summary['last_modified']
+    params = sorted((name, values) for name, values in query_params.lists())
+    raw = f"{queryset.model._meta.label_lower}|{params}|{summary['count']}|{last_modified.isoformat()}|{generations}"
+    etag = quote_etag(hashlib.sha1(raw.encode('utf-8')).hexdigest())
+    return etag, int(max(last_modified.timestamp(), bumped))
+
+
+def conditional_get(view_method):
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` for a viewset action.
+
+    The view provides ``get_validators(request)``; ``ConditionalGetMixin``
+    computes them from ``get_conditional_queryset()`` (the rows the action
+    would serialize) and ``conditional_models`` (every model embedded in the
+    payload, so that e.g. an edited ``File`` changes a project list's ETag).
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_method(self, request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return view_method(self, request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+    return wrapper
+
+
+class ConditionalGetMixin:
+    """Add conditional GET handling to ``list`` and ``retrieve``."""
+    conditional_models = ()
+
+    def get_conditional_queryset(self):
+        """Return the rows the current action serializes, for validator computation."""
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return self.get_queryset().filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validators(self, request):
+        return compute_validators(self.get_conditional_queryset(), request.query_params, self.conditional_models)
+
+    @conditional_get
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
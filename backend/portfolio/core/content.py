@@ -0,0 +1,265 @@
+"""
+Streaming NDJSON export and import of the portfolio content.
+
+Every line is one row: ``{"model": "core.project", "fields": {...}}``. Rows
+are identified by a natural key (``slug``; the stored file name for files)
+so a dump can be loaded into a database with different primary keys, and
+foreign keys / the project gallery are written as those keys too. Files are
+exported first so that imports resolve every reference in order.
+
+Both directions work in batches: exports read ``pk``-ordered slices with
+``values()``, imports write each batch with ``bulk_create``/``bulk_update``
+in its own transaction. Memory use depends on the batch size only.
+"""
+
+import json
+from itertools import groupby
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .cache import response_cache
+from .search import update_search_index
+from .slugs import allocate_slugs
+from .snapshots import refresh_snapshots
+from .tags import sync_tags
+
+# Export order: referenced models first.
+CONTENT_MODELS = ('core.file', 'core.service', 'core.project', 'core.journalentry')
+
+NATURAL_KEYS = {
+    'core.file': 'file',
+    'core.service': 'slug',
+    'core.project': 'slug',
+    'core.journalentry': 'slug',
+}
+
+# Derived columns, rebuilt after import.
+EXCLUDED_FIELDS = ('search_vector', 'list_snapshot', 'detail_snapshot')
+
+
+def content_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in EXCLUDED_FIELDS
+    ]
+
+
+def natural_key(model):
+    return NATURAL_KEYS[model._meta.label_lower]
+
+
+def export_records(labels=CONTENT_MODELS, batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """Yield one record dict per row of every model in ``labels``."""
+    for label in labels:
+        model = apps.get_model(label)
+        fields = content_fields(model)
+        columns = [
+            f'{field.name}__{natural_key(field.related_model)}' if field.is_relation else field.name
+            for field in fields
+        ]
+        last_pk = 0
+        while True:
+            rows = list(
+                model.objects.using(using).filter(pk__gt=last_pk).order_by('pk')
+                .values('pk', *columns)[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1]['pk']
+            related = {
+                field.name: related_keys(field, [row['pk'] for row in rows], using)
+                for field in model._meta.many_to_many
+            }
+            for row in rows:
+                data = {field.name: row[column] for field, column in zip(fields, columns)}
+                for name, keys in related.items():
+                    data[name] = keys.get(row['pk'], [])
+                yield {'model': label, 'fields': data}
+
+
+def related_keys(field, pks, using):
+    """Return ``{owner pk: [natural keys]}`` of a many-to-many field."""
+    through = field.remote_field.through
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    keys = {}
+    rows = (
+        through.objects.using(using).filter(**{f'{source}_id__in': pks})
+        .order_by('pk').values_list(f'{source}_id', f'{target}__{natural_key(field.related_model)}')
+    )
+    for pk, key in rows:
+        keys.setdefault(pk, []).append(key)
+    return keys
+
+
+def write_records(records, stream):
+    """Write ``records`` to ``stream`` as NDJSON; returns the row count."""
+    count = 0
+    for record in records:
+        stream.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def read_records(stream):
+    """Yield the records of an NDJSON stream, skipping blank lines."""
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            label = record['model'].lower()
+            fields = record['fields']
+        except (ValueError, KeyError, TypeError, AttributeError):
+            raise ValueError(f'Line {number}: not a content record')
+        if label not in NATURAL_KEYS:
+            raise ValueError(f'Line {number}: unknown model {record["model"]!r}')
+        yield label, fields
+
+
+def batched(records, batch_size):
+    """Group consecutive records of the same model into lists of ``batch_size``."""
+    for label, group in groupby(records, key=lambda record: record[0]):
+        batch = []
+        for _, fields in group:
+            batch.append(fields)
+            if len(batch) >= batch_size:
+                yield label, batch
+                batch = []
+        if batch:
+            yield label, batch
+
+
+def import_records(records, batch_size=500, using=DEFAULT_DB_ALIAS):
+    """
+    Upsert ``records`` batch by batch, yielding ``(label, rows)`` per batch.
+
+    Each batch is committed on its own, so an error only rolls back the batch
+    it happened in.
+    """
+    for label, rows in batched(records, batch_size):
+        model = apps.get_model(label)
+        with transaction.atomic(using=using):
+            import_batch(model, rows, using)
+        yield label, len(rows)
+
+
+def import_batch(model, rows, using=DEFAULT_DB_ALIAS):
+    key = natural_key(model)
+    fields = [field for field in content_fields(model) if any(field.name in row for row in rows)]
+
+    references = {}
+    for field in fields:
+        if field.is_relation:
+            references[field.name] = resolve_keys(
+                field.related_model, {row.get(field.name) for row in rows}, using
+            )
+    existing = {}
+    for pk, value in (
+        model.objects.using(using)
+        .filter(**{f'{key}__in': [row[key] for row in rows if row.get(key)]})
+        .order_by('pk').values_list('pk', key)
+    ):
+        existing.setdefault(value, pk)
+
+    # Later lines win when a batch repeats a natural key.
+    by_key = {}
+    unkeyed = []
+    for row in rows:
+        values = {}
+        for field in fields:
+            if field.name not in row:
+                continue
+            value = row[field.name]
+            if field.is_relation:
+                values[field.attname] = references[field.name].get(value) if value else None
+            else:
+                values[field.attname] = field.to_python(value)
+        instance = model(**values)
+        if row.get(key):
+            instance.pk = existing.get(row[key])
+            by_key[row[key]] = (instance, row)
+        else:
+            unkeyed.append((instance, row))
+    pairs = list(by_key.values()) + unkeyed
+
+    created = [instance for instance, _ in pairs if instance.pk is None]
+    updated = [instance for instance, _ in pairs if instance.pk is not None]
+    if created:
+        if key == 'slug':
+            allocate_slugs(model, created, using=using)
+        # auto_now_add/auto_now overwrite the exported timestamps on insert.
+        restore = [
+            field.name for field in fields
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+        ]
+        timestamps = [
+            (instance, {name: getattr(instance, name) for name in restore})
+            for instance in created
+        ]
+        model.objects.using(using).bulk_create(created, batch_size=len(created))
+        if restore:
+            for instance, values in timestamps:
+                for name, value in values.items():
+                    if value is not None:
+                        setattr(instance, name, value)
+            model.objects.using(using).bulk_update(created, restore, batch_size=len(created))
+    if updated:
+        update_fields = [field.name for field in fields if field.name != key]
+        if 'updated_at' not in update_fields and hasattr(model, 'updated_at'):
+            now = timezone.now()
+            for instance in updated:
+                instance.updated_at = now
+            update_fields.append('updated_at')
+        if update_fields:
+            model.objects.using(using).bulk_update(updated, update_fields, batch_size=len(updated))
+
+    for field in model._meta.many_to_many:
+        import_related(field, [(instance, row) for instance, row in pairs if field.name in row], using)
+
+    instances = [instance for instance, _ in pairs]
+    sync_tags(model, instances, using=using)
+    update_search_index(model, [instance.pk for instance in instances], using=using)
+    refresh_snapshots(model, [instance.pk for instance in instances], using=using)
+    transaction.on_commit(lambda: response_cache.bump(model), using=using)
+
+
+def resolve_keys(model, keys, using=DEFAULT_DB_ALIAS):
+    """Return ``{natural key: pk}`` for the rows of ``model`` named in ``keys``."""
+    keys = [key for key in keys if key]
+    if not keys:
+        return {}
+    key = natural_key(model)
+    resolved = {}
+    for pk, value in (
+        model.objects.using(using).filter(**{f'{key}__in': keys}).order_by('pk').values_list('pk', key)
+    ):
+        resolved.setdefault(value, pk)
+    return resolved
+
+
+def import_related(field, pairs, using=DEFAULT_DB_ALIAS):
+    """Replace the many-to-many links of the imported rows in two statements."""
+    if not pairs:
+        return
+    through = field.remote_field.through
+    source = f'{field.m2m_field_name()}_id'
+    target = f'{field.m2m_reverse_field_name()}_id'
+    targets = resolve_keys(
+        field.related_model, {key for _, row in pairs for key in row[field.name] or []}, using
+    )
+    through.objects.using(using).filter(**{f'{source}__in': [instance.pk for instance, _ in pairs]}).delete()
+    through.objects.using(using).bulk_create(
+        [
+            through(**{source: instance.pk, target: targets[key]})
+            for instance, row in pairs
+            for key in dict.fromkeys(row[field.name] or [])
+            if key in targets
+        ],
+        ignore_conflicts=True,
+    )
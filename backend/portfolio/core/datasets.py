@@ -0,0 +1,335 @@
+"""
+Synthetic portfolio content for benchmarks and load tests.
+
+``generate_dataset`` inserts any number of files, services, projects and
+journal entries with realistic shapes: English and Arabic text of varying
+length, Zipf-distributed tags and tech stacks (a few popular, a long tail of
+rare ones), main/featured images and project galleries.
+
+Rows are generated in chunks of ``batch_size``. Chunk ``n`` of a model draws
+from its own generator seeded with ``(seed, model, n)``, so a seed always
+produces the same content, however many workers insert it and in whatever
+order their chunks finish. Dates count back from ``now`` (``DEFAULT_NOW``
+unless given), never from the clock. Each chunk is written like an import batch (see
+``content.py``): one ``bulk_create`` in a transaction, then its tag links,
+search index rows and snapshots.
+
+Files are rows only; their names point at ``uploads/dataset/`` files that are
+never written.
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import F
+
+from .cache import response_cache
+from .models import File, JournalEntry, Project, Service
+from .search import update_search_index
+from .slugs import SAVE_ATTEMPTS, allocate_slugs, base_slug
+from .snapshots import refresh_snapshots
+from .tags import sync_tags
+
+ENGLISH_WORDS = (
+    'adaptive', 'analytics', 'api', 'architecture', 'archive', 'async', 'audit', 'backend', 'balance',
+    'benchmark', 'brand', 'browser', 'budget', 'build', 'cache', 'campaign', 'canvas', 'client',
+    'cloud', 'cluster', 'component', 'concept', 'content', 'contrast', 'craft', 'dashboard', 'data',
+    'deploy', 'design', 'detail', 'device', 'digital', 'document', 'dynamic', 'editorial', 'engine',
+    'experience', 'experiment', 'feature', 'feedback', 'field', 'flow', 'focus', 'form', 'framework',
+    'frontend', 'gallery', 'grid', 'growth', 'guide', 'identity', 'image', 'index', 'insight',
+    'interface', 'journey', 'layer', 'layout', 'light', 'local', 'logic', 'market', 'media', 'mobile',
+    'model', 'modern', 'module', 'motion', 'network', 'notes', 'open', 'pattern', 'performance',
+    'pipeline', 'platform', 'portfolio', 'practice', 'process', 'product', 'prototype', 'query',
+    'reader', 'release', 'render', 'research', 'responsive', 'review', 'scale', 'schema', 'search',
+    'server', 'service', 'signal', 'simple', 'sketch', 'source', 'space', 'stack', 'static', 'story',
+    'strategy', 'stream', 'studio', 'style', 'system', 'team', 'template', 'test', 'theme', 'tooling',
+    'type', 'update', 'user', 'version', 'visual', 'web', 'workflow', 'writing',
+)
+
+ARABIC_WORDS = (
+    'تصميم', 'تطوير', 'مشروع', 'منصة', 'تجربة', 'المستخدم', 'واجهة', 'بيانات', 'نظام', 'خدمة',
+    'محتوى', 'رقمي', 'تطبيق', 'موقع', 'أداء', 'سرعة', 'جودة', 'فريق', 'عميل', 'سوق', 'هوية',
+    'علامة', 'تجارية', 'استراتيجية', 'بحث', 'تحليل', 'نتائج', 'مراجعة', 'إصدار', 'ميزة', 'صورة',
+    'معرض', 'قصة', 'كتابة', 'ملاحظات', 'عملية', 'نموذج', 'تجريبي', 'حديث', 'بسيط', 'سحابة',
+    'خادم', 'شبكة', 'أمان', 'اختبار', 'مكتبة', 'إطار', 'عمل', 'تعلم', 'فكرة', 'حل', 'مشكلة',
+    'جديد', 'مستقبل', 'رحلة', 'مساحة', 'ضوء', 'لون', 'خط', 'حركة',
+)
+
+TECH_STACK = (
+    'Python', 'Django', 'React', 'TypeScript', 'PostgreSQL', 'Next.js', 'Tailwind CSS', 'Docker',
+    'Redis', 'Node.js', 'GraphQL', 'Vue', 'Figma', 'AWS', 'GCP', 'Kubernetes', 'Nginx', 'Vite',
+    'Celery', 'Elasticsearch', 'Svelte', 'Go', 'Rust', 'Flutter', 'Swift', 'Kotlin', 'Three.js',
+    'D3.js', 'WebGL', 'Terraform',
+)
+
+CATEGORIES = ('Web', 'Mobile', 'Branding', 'Data', 'Research', 'Open Source', 'Editorial', 'Tooling')
+
+# Models in insertion order: files first, everything else references them.
+MODELS = (File, Service, Project, JournalEntry)
+
+# Publication dates and years are spread back from this moment.
+DEFAULT_NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def zipf_weights(count, exponent=1.1):
+    """Cumulative weights of ranks ``1..count`` for ``random.choices(cum_weights=...)``."""
+    total = 0.0
+    weights = []
+    for rank in range(1, count + 1):
+        total += 1 / rank ** exponent
+        weights.append(total)
+    return weights
+
+
+def pick(rng, population, cum_weights, low, high):
+    """Return ``low..high`` distinct items of ``population``, popular ones more often."""
+    picked = rng.choices(population, cum_weights=cum_weights, k=rng.randint(low, high))
+    return list(dict.fromkeys(picked))
+
+
+def words(rng, vocabulary, low, high):
+    return rng.choices(vocabulary, k=rng.randint(low, high))
+
+
+def sentence(rng, vocabulary, low=8, high=20):
+    text = ' '.join(words(rng, vocabulary, low, high))
+    return text[0].upper() + text[1:] + '.'
+
+
+def paragraph(rng, vocabulary):
+    return ' '.join(sentence(rng, vocabulary) for _ in range(rng.randint(3, 7)))
+
+
+def rich_text(rng, vocabulary, median_paragraphs):
+    """HTML paragraphs; their number is log-normal, so most texts are short and a few are long."""
+    count = max(1, min(40, round(rng.lognormvariate(0, 0.6) * median_paragraphs)))
+    return ''.join(f'<p>{paragraph(rng, vocabulary)}</p>' for _ in range(count))
+
+
+def title(rng, vocabulary):
+    return ' '.join(words(rng, vocabulary, 2, 6)).capitalize()
+
+
+def slug(model, text, index):
+    """A slug that is unique within the run without a lookup; taken ones are reallocated on insert."""
+    return f'{base_slug(model, text)}-{index}'
+
+
+class DatasetGenerator:
+    """Builds the unsaved rows of one chunk from a seeded generator."""
+
+    def __init__(self, seed, tag_count=200, gallery_size=6, file_pks=(), now=DEFAULT_NOW):
+        self.seed = seed
+        self.gallery_size = gallery_size
+        self.file_pks = list(file_pks)
+        self.tags = [f'{ENGLISH_WORDS[n % len(ENGLISH_WORDS)]}-{n}' for n in range(tag_count)]
+        self.tags_ar = [f'{ARABIC_WORDS[n % len(ARABIC_WORDS)]} {n}' for n in range(tag_count)]
+        self.tag_weights = zipf_weights(tag_count)
+        self.tech_weights = zipf_weights(len(TECH_STACK))
+        self.now = now
+
+    def random(self, model, chunk):
+        return random.Random(f'{self.seed}:{model._meta.label_lower}:{chunk}')
+
+    def image(self, rng, chance=0.9):
+        if self.file_pks and rng.random() < chance:
+            return rng.choice(self.file_pks)
+        return None
+
+    def status(self, rng):
+        return rng.choices(('published', 'draft', 'archived'), (80, 15, 5))[0]
+
+    def rows(self, model, chunk, start, count):
+        """Return the rows ``start..start + count`` of ``model`` and, for projects, their gallery file pks."""
+        rng = self.random(model, chunk)
+        build = getattr(self, f'build_{model._meta.model_name}')
+        rows, galleries = [], []
+        for index in range(start, start + count):
+            row, gallery = build(rng, index)
+            rows.append(row)
+            galleries.append(gallery)
+        return rows, galleries
+
+    def build_file(self, rng, index):
+        width, height = rng.choice(((1600, 900), (1200, 1200), (900, 1600), (2400, 1350), (800, 600)))
+        return File(
+            title=title(rng, ENGLISH_WORDS),
+            description=sentence(rng, ENGLISH_WORDS) if rng.random() < 0.5 else None,
+            file=f'uploads/dataset/{self.seed}/image-{index}.jpg',
+            filename_disk=f'image-{index}.jpg',
+            width=width,
+            height=height,
+            filesize=rng.randint(40_000, 4_000_000),
+            mime_type='image/jpeg',
+        ), None
+
+    def build_service(self, rng, index):
+        text = title(rng, ENGLISH_WORDS)
+        return Service(
+            title=text,
+            slug=slug(Service, text, index),
+            title_ar=title(rng, ARABIC_WORDS),
+            description_rich_text=rich_text(rng, ENGLISH_WORDS, 2),
+            description_rich_text_ar=rich_text(rng, ARABIC_WORDS, 2),
+            icon_svg='<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24"><circle cx="12" cy="12" r="10"/></svg>',
+            status=self.status(rng),
+            featured_image_id=self.image(rng),
+            sort=index,
+        ), None
+
+    def build_project(self, rng, index):
+        gallery = []
+        if self.file_pks and self.gallery_size:
+            gallery = rng.sample(self.file_pks, min(len(self.file_pks), rng.randint(0, self.gallery_size)))
+        text = title(rng, ENGLISH_WORDS)
+        return Project(
+            title=text,
+            slug=slug(Project, text, index),
+            description=' '.join(sentence(rng, ENGLISH_WORDS) for _ in range(rng.randint(1, 3))),
+            long_description_html=rich_text(rng, ENGLISH_WORDS, 4),
+            status=self.status(rng),
+            main_image_id=self.image(rng),
+            category=rng.choice(CATEGORIES),
+            year=str(self.now.year - min(15, int(rng.expovariate(0.4)))),
+            tech_stack=pick(rng, TECH_STACK, self.tech_weights, 2, 6),
+            tags=pick(rng, self.tags, self.tag_weights, 1, 5),
+            live_url=f'https://example.com/projects/{index}' if rng.random() < 0.6 else None,
+            repo_url=f'https://github.com/example/project-{index}' if rng.random() < 0.4 else None,
+            sort=index,
+        ), gallery
+
+    def build_journalentry(self, rng, index):
+        language = rng.choices(('en', 'ar', 'both'), (60, 25, 15))[0]
+        english = language != 'ar'
+        arabic = language != 'en'
+        title_ar = title(rng, ARABIC_WORDS) if arabic else None
+        text = title(rng, ENGLISH_WORDS) if english else title_ar
+        return JournalEntry(
+            title=text,
+            slug=slug(JournalEntry, text, index),
+            title_ar=title_ar,
+            excerpt=sentence(rng, ENGLISH_WORDS, 20, 45) if english else None,
+            excerpt_ar=sentence(rng, ARABIC_WORDS, 20, 45) if arabic else None,
+            content_rich_text=rich_text(rng, ENGLISH_WORDS, 6) if english else None,
+            content_rich_text_ar=rich_text(rng, ARABIC_WORDS, 6) if arabic else None,
+            language=language,
+            status=self.status(rng),
+            # Spread over the last five years, more recent entries more likely.
+            publication_date=self.now - timedelta(days=min(5 * 365, rng.expovariate(1 / 365)), seconds=rng.randint(0, 86399)),
+            featured_image_id=self.image(rng, chance=0.7),
+            tags=pick(rng, self.tags, self.tag_weights, 1, 6) if english else None,
+            tags_ar=pick(rng, self.tags_ar, self.tag_weights, 1, 6) if arabic else None,
+            sort=index,
+        ), None
+
+
+def insert_chunk(generator, model, chunk, start, count, using=DEFAULT_DB_ALIAS):
+    """Generate and insert one chunk with its derived data; return the number of rows."""
+    rows, galleries = generator.rows(model, chunk, start, count)
+    with transaction.atomic(using=using):
+        insert_rows(model, rows, using)
+        if model is Project:
+            through = Project.gallery_images.through
+            through.objects.using(using).bulk_create(
+                [
+                    through(project_id=project.pk, file_id=file_pk)
+                    for project, gallery in zip(rows, galleries)
+                    for file_pk in gallery
+                ],
+                batch_size=len(rows) * max(generator.gallery_size, 1),
+            )
+        if model is JournalEntry:
+            # ``auto_now_add`` stamps every row with the insert time; entries
+            # look created when they were published.
+            JournalEntry.objects.using(using).filter(pk__in=[row.pk for row in rows]).update(
+                created_at=F('publication_date')
+            )
+        if model is not File:
+            pks = [row.pk for row in rows]
+            sync_tags(model, rows, using=using)
+            update_search_index(model, pks, using=using)
+            refresh_snapshots(model, pks, using=using)
+    return len(rows)
+
+
+def insert_rows(model, rows, using=DEFAULT_DB_ALIAS):
+    """``bulk_create`` ``rows``; if a generated slug is taken, allocate free ones and retry."""
+    for attempt in range(SAVE_ATTEMPTS):
+        try:
+            with transaction.atomic(using=using):
+                model.objects.using(using).bulk_create(rows, batch_size=len(rows))
+            return
+        except IntegrityError:
+            if not hasattr(model, 'slug') or attempt == SAVE_ATTEMPTS - 1:
+                raise
+            for row in rows:
+                row.slug = ''
+            allocate_slugs(model, rows, using=using)
+
+
+def chunks(count, batch_size):
+    """Yield ``(chunk, start, size)`` covering ``count`` rows."""
+    for chunk, start in enumerate(range(0, count, batch_size)):
+        yield chunk, start, min(batch_size, count - start)
+
+
+# Set in each worker process by ``init_worker``.
+_worker = {}
+
+
+def init_worker(options, file_pks, using):
+    import django
+
+    django.setup()
+    _worker['generator'] = DatasetGenerator(file_pks=file_pks, **options)
+    _worker['using'] = using
+
+
+def run_chunk(label, chunk, start, count):
+    model = {model._meta.label_lower: model for model in MODELS}[label]
+    try:
+        return label, insert_chunk(_worker['generator'], model, chunk, start, count, _worker['using'])
+    finally:
+        connections.close_all()
+
+
+def generate_dataset(counts, seed=0, tag_count=200, gallery_size=6, batch_size=1000, workers=1,
+                     using=DEFAULT_DB_ALIAS, now=DEFAULT_NOW):
+    """
+    Insert ``counts[model]`` generated rows per model, yielding ``(model, rows)`` per chunk.
+
+    With ``workers > 1`` the chunks of each model are inserted by that many
+    processes, each with its own connection.
+    """
+    options = {'seed': seed, 'tag_count': tag_count, 'gallery_size': gallery_size, 'now': now}
+    file_pks = []
+    for phase in ((File,), (Service, Project, JournalEntry)):
+        if phase[0] is not File:
+            # Rows of this run and of earlier ones can be referenced.
+            file_pks = list(File.objects.using(using).order_by('pk').values_list('pk', flat=True))
+        tasks = [
+            (model, chunk, start, size)
+            for model in phase
+            for chunk, start, size in chunks(counts.get(model, 0), batch_size)
+        ]
+        if workers > 1 and len(tasks) > 1:
+            # Forked workers must not share the parent's connections.
+            connections.close_all()
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(options, file_pks, using)) as pool:
+                models = {model._meta.label_lower: model for model in phase}
+                futures = [
+                    pool.submit(run_chunk, model._meta.label_lower, chunk, start, size)
+                    for model, chunk, start, size in tasks
+                ]
+                for future in futures:
+                    label, rows = future.result()
+                    yield models[label], rows
+        else:
+            generator = DatasetGenerator(file_pks=file_pks, **options)
+            for model, chunk, start, size in tasks:
+                yield model, insert_chunk(generator, model, chunk, start, size, using)
+    for model in MODELS:
+        if counts.get(model):
+            response_cache.bump(model)
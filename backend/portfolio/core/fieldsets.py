@@ -0,0 +1,181 @@
+"""
+Sparse fieldsets for the core endpoints: ``?fields=``, ``?omit=`` and ``?expand=``.
+
+* ``?fields=title,slug,main_image.file`` keeps only the listed fields; a
+  dotted name selects inside a nested object (and keeps its parent);
+* ``?omit=description_rich_text,featured_image.description`` drops fields;
+* ``?expand=main_image`` lists the nested objects to render in full. Without
+  ``expand`` every nested object is rendered, as before; once it is passed
+  (even empty) the nested objects it does not name collapse to their
+  primary keys.
+
+The selection is applied to the serializer fields, and read actions load
+only what the pruned serializer reads: ``values()`` columns for the list
+rows (see ``rows.py``) and ``only()``/``select_related``/``Prefetch`` for
+detail views, so omitted columns and collapsed relations are never fetched.
+Selections only apply to safe methods; writes always see every field.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField
+
+
+def parse_paths(value):
+    """``"a, b.c"`` -> ``{('a',), ('b', 'c')}``."""
+    return frozenset(
+        tuple(part for part in item.strip().split('.') if part)
+        for item in value.split(',') if item.strip()
+    )
+
+
+class Fieldset:
+    """The fields a request selected, as sets of dotted paths."""
+
+    query_params = ('fields', 'omit', 'expand')
+
+    def __init__(self, fields=None, omit=frozenset(), expand=None):
+        self.fields = fields
+        self.omit = omit
+        self.expand = expand
+
+    @classmethod
+    def from_request(cls, request):
+        """Return the request's selection, or None when it makes none (or writes)."""
+        params = request.query_params
+        if request.method not in SAFE_METHODS or not any(name in params for name in cls.query_params):
+            return None
+        return cls(
+            fields=parse_paths(params['fields']) if 'fields' in params else None,
+            omit=parse_paths(params.get('omit', '')),
+            expand=parse_paths(params['expand']) if 'expand' in params else None,
+        )
+
+    def key(self):
+        return (self.fields, self.omit, self.expand)
+
+    def __eq__(self, other):
+        return isinstance(other, Fieldset) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def includes(self, path):
+        """Whether the field at ``path`` is rendered."""
+        if path in self.omit:
+            return False
+        if self.fields is None:
+            return True
+        parent = path[:-1]
+        chosen = [selected for selected in self.fields if selected[:len(parent)] == parent and len(selected) > len(parent)]
+        # No selection at this level keeps every field.
+        return not chosen or any(selected[len(parent)] == path[-1] for selected in chosen)
+
+    def expands(self, path):
+        """Whether the nested object at ``path`` is rendered in full."""
+        if self.expand is None:
+            return True
+        selected = self.expand | (self.fields or frozenset())
+        return any(item[:len(path)] == path and (item in self.expand or len(item) > len(path)) for item in selected)
+
+
+def field_path(serializer):
+    """Names from the root serializer down to ``serializer``."""
+    path = []
+    while serializer.parent is not None:
+        if serializer.field_name:
+            path.append(serializer.field_name)
+        serializer = serializer.parent
+    return tuple(reversed(path))
+
+
+class SparseFieldsMixin:
+    """Prune serializer fields to the ``Fieldset`` in ``context['fieldset']``."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        if fieldset is None:
+            return fields
+        path = field_path(self)
+        for name, field in list(fields.items()):
+            if not fieldset.includes(path + (name,)):
+                del fields[name]
+            elif isinstance(field, serializers.BaseSerializer) and not fieldset.expands(path + (name,)):
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    source=field.source, read_only=True, many=isinstance(field, serializers.ListSerializer),
+                )
+        return fields
+
+
+def load_plan(serializer, prefix=''):
+    """
+    Return ``(only, select_related, prefetch)`` for what ``serializer`` reads.
+
+    ``only`` is None when a field does not map to a column (a property, a
+    method field without ``row_sources``), in which case nothing is deferred.
+    """
+    model = serializer.Meta.model
+    only, related, prefetch = [prefix + model._meta.pk.name], [], []
+    for field in serializer._readable_fields:
+        source = prefix + field.source
+        if isinstance(field, serializers.ListSerializer):
+            child_only, child_related, child_prefetch = load_plan(field.child)
+            queryset = field.child.Meta.model.objects.select_related(*child_related).prefetch_related(*child_prefetch)
+            prefetch.append(Prefetch(source, queryset=queryset.only(*child_only) if child_only else queryset))
+        elif isinstance(field, ManyRelatedField):
+            queryset = model._meta.get_field(field.source).related_model.objects.only('pk')
+            prefetch.append(Prefetch(source, queryset=queryset))
+        elif isinstance(field, serializers.BaseSerializer):
+            child_only, child_related, child_prefetch = load_plan(field, f'{source}__')
+            related += [source, *child_related]
+            prefetch += child_prefetch
+            only = None if only is None or child_only is None else only + [source, *child_only]
+        elif isinstance(field, serializers.SerializerMethodField):
+            sources = getattr(serializer, 'row_sources', {}).get(field.field_name)
+            only = None if only is None or sources is None else only + [prefix + name for name in sources]
+        elif only is not None:
+            try:
+                model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                only = None
+            else:
+                only.append(source)
+    return only, related, prefetch
+
+
+def shape_queryset(queryset, serializer):
+    """Load only the columns and relations ``serializer`` renders."""
+    only, related, prefetch = load_plan(serializer)
+    queryset = queryset.select_related(*related) if related else queryset.select_related(None)
+    queryset = queryset.prefetch_related(None).prefetch_related(*prefetch)
+    return queryset.only(*only) if only is not None else queryset
+
+
+class SparseFieldsViewMixin:
+    """Feed ``?fields=``/``?omit=``/``?expand=`` into serializers and querysets."""
+
+    def get_fieldset(self):
+        return Fieldset.from_request(self.request)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fieldset'] = self.get_fieldset()
+        return context
+
+    def get_fieldset_context(self):
+        """Serializer context for the public actions: the selection, but no request (file URLs stay relative)."""
+        return {'fieldset': self.get_fieldset()}
+
+    def shape_queryset(self, queryset):
+        """
+        Restrict a read action's queryset to what its serializer renders.
+
+        Writes load whole rows (``save()`` only writes the fields that were
+        loaded), and ``row_actions`` select their own ``values()`` columns.
+        """
+        if self.request.method not in SAFE_METHODS or self.action in getattr(self, 'row_actions', ()):
+            return queryset
+        return shape_queryset(queryset, self.get_serializer_class()(context=self.get_fieldset_context()))
@@ -0,0 +1,277 @@
+"""
+Responsive image variants for uploaded files.
+
+When a ``File`` is created (or its upload replaced) the original is opened
+with Pillow once and re-encoded at every configured width and format, with
+EXIF stripped (orientation is applied first). Dimensions, size and MIME type
+of the original are recorded on the row together with a ``variants`` map::
+
+    {"source": "uploads/2024/01/01/cover.png",
+     "webp": {"320": "variants/12/320.webp", "640": "variants/12/640.webp"}}
+
+Encoding runs in a process pool, off the request thread; only the final
+``UPDATE`` happens back in the web process. The pool processes never touch
+the database. Other uploads (videos, documents) skip the pool: they only get
+their size, and a MIME type guessed from the name if the row has none.
+"""
+
+import atexit
+import logging
+import mimetypes
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280, 1920)
+DEFAULT_FORMATS = ('avif', 'webp', 'jpeg')
+
+FORMAT_EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+
+VARIANT_NAME = 'variants/{pk}/{width}.{extension}'
+
+# Columns ``generate_variants`` can fill.
+COLUMNS = ('filesize', 'mime_type', 'width', 'height', 'variants')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_formats():
+    """Return the configured formats this Pillow build can encode."""
+    from PIL import features
+
+    formats = getattr(settings, 'IMAGE_VARIANT_FORMATS', DEFAULT_FORMATS)
+    return [name for name in formats if name == 'jpeg' or features.check(name)]
+
+
+def variant_widths(original_width):
+    """Return the configured widths below ``original_width``, plus the original."""
+    widths = sorted(getattr(settings, 'IMAGE_VARIANT_WIDTHS', DEFAULT_WIDTHS))
+    chosen = [width for width in widths if width < original_width]
+    if not widths or original_width <= widths[-1]:
+        chosen.append(original_width)
+    return chosen
+
+
+def encode(image, name, quality):
+    """Encode ``image`` without metadata; returns the bytes."""
+    from PIL import Image
+
+    buffer = BytesIO()
+    if name == 'jpeg':
+        if image.mode not in ('RGB', 'L'):
+            # JPEG has no alpha channel: flatten onto white.
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, name.upper(), quality=quality)
+    return buffer.getvalue()
+
+
+def may_be_image(name):
+    """Whether ``name`` could be an image, judged from its MIME type or Pillow's extensions."""
+    from PIL import Image
+
+    mime_type = mimetypes.guess_type(name)[0]
+    if mime_type is not None:
+        return mime_type.startswith('image/')
+    return os.path.splitext(name)[1].lower() in Image.registered_extensions()
+
+
+def generate_variants(pk, name, widths=None, formats=None, quality=80, storage=None):
+    """
+    Read the upload ``name`` and write its variants; returns the column values.
+
+    Runs in the pool processes, so it only uses the storage, never the ORM.
+    Returns None if the upload cannot be read. Other files (videos, documents)
+    are never opened: they can be gigabytes. ``mime_type`` is only included
+    when Pillow identified the image.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    storage = storage or default_storage
+    try:
+        result = {'filesize': storage.size(name), 'variants': {'source': name}}
+    except OSError:
+        return None
+    if not may_be_image(name):
+        return result
+    try:
+        # Pillow reads from the handle as it decodes; no copy of the upload.
+        with storage.open(name, 'rb') as handle:
+            image = Image.open(handle)
+            image.load()
+    except (UnidentifiedImageError, OSError):
+        return result
+
+    if image.format in Image.MIME:
+        result['mime_type'] = Image.MIME[image.format]
+    image = ImageOps.exif_transpose(image)
+    result['width'], result['height'] = image.size
+    if getattr(image, 'is_animated', False) or image.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+        # Animations and CMYK/16-bit images are served as uploaded.
+        return result
+    if image.mode == 'P':
+        image = image.convert('RGBA')
+
+    for width in widths if widths is not None else variant_widths(image.width):
+        height = max(round(image.height * width / image.width), 1)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for format_name in formats if formats is not None else variant_formats():
+            variant = VARIANT_NAME.format(pk=pk, width=width, extension=FORMAT_EXTENSIONS[format_name])
+            if storage.exists(variant):
+                storage.delete(variant)
+            saved = storage.save(variant, ContentFile(encode(resized, format_name, quality)))
+            result['variants'].setdefault(format_name, {})[str(width)] = saved
+    return result
+
+
+def init_worker():
+    """Make the pool usable with the ``spawn``/``forkserver`` start methods too."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_PROCESSING_WORKERS', 2),
+                initializer=init_worker,
+            )
+            atexit.register(_executor.shutdown, wait=False, cancel_futures=True)
+    return _executor
+
+
+def save_variants(pk, result):
+    """Store the outcome of ``generate_variants`` on the ``File`` row."""
+    from .cache import response_cache
+    from .models import File
+    from .snapshots import refresh_snapshots
+    from .static_api import schedule_export
+
+    if result is None:
+        return
+    name = result['variants']['source']
+    old = File.objects.filter(pk=pk, file=name).values(*COLUMNS).first()
+    if old is None:
+        # The row was deleted or re-uploaded while we were encoding.
+        return
+    if 'mime_type' not in result and not old['mime_type']:
+        # A guess from the name only fills an empty column; it never replaces
+        # the type the client sent.
+        result['mime_type'] = mimetypes.guess_type(name)[0]
+    changes = {column: value for column, value in result.items() if old[column] != value}
+    if not changes:
+        return
+    updated = File.objects.filter(pk=pk, file=name).update(updated_at=timezone.now(), **changes)
+    if not updated:
+        return
+    delete_variants(old['variants'], keep=result['variants'])
+    if changes.keys() == {'variants'} and not has_variants(old['variants']) and not has_variants(result['variants']):
+        # Only the processed-upload marker moved; no response shows it.
+        return
+    # update() sends no signals; the stored JSON embeds the new srcset.
+    refresh_snapshots(File, [pk])
+    response_cache.bump(File)
+    schedule_export({File: [pk]})
+
+
+def has_variants(variants):
+    return any(key != 'source' for key in variants or {})
+
+
+def delete_variants(variants, keep=None):
+    """Delete the stored files of a ``variants`` map, except those in ``keep``."""
+    keep = {
+        name for key, names in (keep or {}).items() if key != 'source' for name in names.values()
+    }
+    for key, names in (variants or {}).items():
+        if key == 'source':
+            continue
+        for name in names.values():
+            if name not in keep:
+                default_storage.delete(name)
+
+
+def process_file(pk, name):
+    """Generate the variants of one upload, inline; returns the column values."""
+    result = generate_variants(
+        pk, name, quality=getattr(settings, 'IMAGE_VARIANT_QUALITY', 80),
+    )
+    save_variants(pk, result)
+    return result
+
+
+def schedule_processing(pk, name):
+    """
+    Queue an upload for processing, or process it inline without workers.
+
+    Files that cannot be images are handled inline as well: they are only
+    sized, never read, so the pool would add nothing but a round trip.
+    """
+    if not getattr(settings, 'IMAGE_PROCESSING_WORKERS', 2) or not may_be_image(name):
+        try:
+            process_file(pk, name)
+        except Exception:
+            # The upload itself is already committed; never fail the request.
+            logger.exception('Generating image variants for file %s failed', pk)
+        return
+
+    future = get_executor().submit(
+        generate_variants, pk, name, None, None, getattr(settings, 'IMAGE_VARIANT_QUALITY', 80),
+    )
+
+    def done(future):
+        # Runs on the executor's management thread, which has its own connection.
+        try:
+            save_variants(pk, future.result())
+        except Exception:
+            logger.exception('Generating image variants for file %s failed', pk)
+        finally:
+            connections.close_all()
+
+    future.add_done_callback(done)
+
+
+def build_srcset(variants, request=None):
+    """Return ``{format: "url 320w, url 640w"}`` for a ``variants`` map."""
+    srcset = {}
+    for key, names in (variants or {}).items():
+        if key == 'source':
+            continue
+        candidates = []
+        for width, name in sorted(names.items(), key=lambda item: int(item[0])):
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            candidates.append(f'{url} {width}w')
+        srcset[key] = ', '.join(candidates)
+    return srcset
+
+
+def needs_processing(instance):
+    name = instance.file.name if instance.file else ''
+    return bool(name) and (instance.variants or {}).get('source') != name
+
+
+def process_on_commit(instance, using):
+    """Schedule an upload once the transaction that saved it has committed."""
+    if needs_processing(instance):
+        pk, name = instance.pk, instance.file.name
+        transaction.on_commit(lambda: schedule_processing(pk, name), using=using)
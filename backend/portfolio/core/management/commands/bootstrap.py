@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.core.bootstrap import bootstrap
+
+
+class Command(BaseCommand):
+    help = 'Creates the admin user and placeholder data on a fresh database (safe to run on every deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--skip-admin', action='store_true',
+            help='Do not create the default admin user',
+        )
+        parser.add_argument(
+            '--skip-placeholders', action='store_true',
+            help='Do not create placeholder projects, journal entries and services',
+        )
+
+    def handle(self, *args, **options):
+        done = bootstrap(
+            admin=not options['skip_admin'],
+            placeholders=not options['skip_placeholders'],
+        )
+        if done:
+            self.stdout.write(self.style.SUCCESS(f'Bootstrap created: {", ".join(done)}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Bootstrap already complete'))
@@ -0,0 +1,34 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portfolio.core.models import UploadSession
+from portfolio.core.uploads import delete_session, discard_temp_file, expired_sessions, upload_dir
+
+
+class Command(BaseCommand):
+    help = 'Deletes abandoned chunked uploads and their temp files'
+
+    def handle(self, *args, **options):
+        sessions = 0
+        for session in expired_sessions().iterator():
+            delete_session(session)
+            sessions += 1
+
+        # Temp files whose session row is gone (e.g. deleted from the admin).
+        orphans = 0
+        directory = upload_dir()
+        if os.path.isdir(directory):
+            cutoff = time.time() - getattr(settings, 'UPLOAD_SESSION_EXPIRY_HOURS', 24) * 3600
+            pending = {str(pk) for pk in UploadSession.objects.filter(status='pending').values_list('pk', flat=True)}
+            for entry in os.scandir(directory):
+                session_id = entry.name.removesuffix('.part')
+                if entry.name.endswith('.part') and session_id not in pending and entry.stat().st_mtime < cutoff:
+                    discard_temp_file(entry.path)
+                    orphans += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {sessions} expired upload sessions and {orphans} orphaned temp files'
+        ))
@@ -0,0 +1,47 @@
+import sys
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.core.content import CONTENT_MODELS, export_records, write_records
+
+
+class Command(BaseCommand):
+    help = 'Exports files, services, projects and journal entries as NDJSON (file contents are not included)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', '-o', default='-',
+            help='File to write, or - for stdout',
+        )
+        parser.add_argument(
+            '--models', nargs='+', default=list(CONTENT_MODELS), choices=CONTENT_MODELS,
+            help='Models to export, in order',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows read per query',
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Database alias to export from',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        records = export_records(options['models'], options['batch_size'], options['database'])
+        # Progress goes to stderr so that stdout stays a clean NDJSON stream.
+        report = self.stderr if options['output'] == '-' else self.stdout
+
+        start = perf_counter()
+        if options['output'] == '-':
+            count = write_records(records, sys.stdout)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                count = write_records(records, stream)
+        elapsed = perf_counter() - start
+
+        report.write(self.style.SUCCESS(
+            f'Exported {count} rows in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
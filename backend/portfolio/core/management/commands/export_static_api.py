@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.core.static_api import SECTIONS, Exporter
+
+
+class Command(BaseCommand):
+    help = 'Renders the public API responses to files nginx serves directly, rewriting only changed files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=None,
+            help='Directory to write to (default STATIC_API_ROOT)',
+        )
+        parser.add_argument(
+            '--base-url', default=None,
+            help='Scheme and host of the public site, for pagination links (default STATIC_API_BASE_URL)',
+        )
+        parser.add_argument(
+            '--section', action='append', choices=SECTIONS, dest='sections',
+            help='Only export this section (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        exporter = Exporter(root=options['output'], base_url=options['base_url'])
+        try:
+            stats = exporter.export(options['sections'] or SECTIONS)
+        except OSError as error:
+            raise CommandError(f'Could not write to {exporter.root}: {error}')
+        self.stdout.write(
+            f"Wrote {stats['written']} files, kept {stats['unchanged']} unchanged, removed {stats['removed']}"
+        )
+        self.stdout.write(self.style.SUCCESS(f'Static API exported to {exporter.root}'))
@@ -0,0 +1,103 @@
+from collections import Counter
+from datetime import datetime, timezone
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from portfolio.core.datasets import DEFAULT_NOW, generate_dataset
+from portfolio.core.models import File, JournalEntry, Project, Service
+from portfolio.core.static_api import export_after_bulk_change
+
+
+class Command(BaseCommand):
+    help = 'Generates synthetic projects, journal entries, services and files for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=500, help='Number of files')
+        parser.add_argument('--services', type=int, default=10, help='Number of services')
+        parser.add_argument('--projects', type=int, default=200, help='Number of projects')
+        parser.add_argument('--journal-entries', type=int, default=2000, help='Number of journal entries')
+        parser.add_argument(
+            '--tags', type=int, default=200,
+            help='Number of distinct tags, used with a Zipf distribution',
+        )
+        parser.add_argument(
+            '--gallery-size', type=int, default=6,
+            help='Maximum number of gallery images per project',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the generated content')
+        parser.add_argument(
+            '--now', default=DEFAULT_NOW.isoformat(),
+            help='ISO date publication dates count back from (default %(default)s, not the clock)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows written per transaction',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of processes inserting in parallel (PostgreSQL only)',
+        )
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help='Do nothing if the database already has projects or journal entries',
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Database alias to fill',
+        )
+
+    def handle(self, *args, **options):
+        counts = {
+            File: options['files'],
+            Service: options['services'],
+            Project: options['projects'],
+            JournalEntry: options['journal_entries'],
+        }
+        if any(count < 0 for count in counts.values()) or options['tags'] < 1 or options['gallery_size'] < 0:
+            raise CommandError('Counts must not be negative and --tags must be positive')
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--batch-size and --workers must be positive')
+
+        try:
+            now = datetime.fromisoformat(options['now'])
+        except ValueError:
+            raise CommandError(f"--now must be an ISO date, not {options['now']!r}")
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=timezone.utc)
+
+        using = options['database']
+        if options['if_empty'] and (
+            Project.objects.using(using).exists() or JournalEntry.objects.using(using).exists()
+        ):
+            self.stdout.write('The database already has content; nothing generated')
+            return
+
+        workers = options['workers']
+        if workers > 1 and connections[using].vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite allows one writer at a time; using 1 worker'))
+            workers = 1
+
+        totals = Counter()
+        start = perf_counter()
+        for model, rows in generate_dataset(
+            counts, seed=options['seed'], tag_count=options['tags'], gallery_size=options['gallery_size'],
+            batch_size=options['batch_size'], workers=workers, using=using, now=now,
+        ):
+            totals[model] += rows
+            if options['verbosity'] > 1:
+                elapsed = perf_counter() - start
+                total = sum(totals.values())
+                self.stdout.write(
+                    f'{model._meta.verbose_name_plural}: {totals[model]} rows ({total / max(elapsed, 1e-9):.0f} rows/s)'
+                )
+
+        elapsed = perf_counter() - start
+        for model, count in totals.items():
+            self.stdout.write(f'Generated {count} {model._meta.verbose_name_plural}')
+        export_after_bulk_change(self.stdout)
+        total = sum(totals.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {total} rows in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
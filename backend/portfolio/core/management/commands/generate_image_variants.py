@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.core.images import needs_processing, process_file
+from portfolio.core.models import File
+
+
+class Command(BaseCommand):
+    help = 'Generates responsive image variants for uploads that do not have them yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate the variants of every file',
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        for file in File.objects.exclude(file='').order_by('pk').iterator(chunk_size=100):
+            if options['force'] or needs_processing(file):
+                if process_file(file.pk, file.file.name) is not None:
+                    processed += 1
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {processed} files'))
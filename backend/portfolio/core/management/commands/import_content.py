@@ -0,0 +1,61 @@
+import sys
+from collections import Counter
+from time import perf_counter
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.core.content import import_records, read_records
+from portfolio.core.static_api import export_after_bulk_change
+
+
+class Command(BaseCommand):
+    help = 'Imports an NDJSON dump written by export_content, updating rows with the same slug or file name'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='NDJSON file to read, or - for stdin')
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of rows written per transaction',
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Database alias to import into',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        if options['input'] == '-':
+            self.load(sys.stdin, options)
+        else:
+            try:
+                with open(options['input'], encoding='utf-8') as stream:
+                    self.load(stream, options)
+            except OSError as exc:
+                raise CommandError(f'Cannot read {options["input"]}: {exc}')
+
+    def load(self, stream, options):
+        counts = Counter()
+        start = perf_counter()
+        try:
+            for label, rows in import_records(
+                read_records(stream), options['batch_size'], options['database']
+            ):
+                counts[label] += rows
+                elapsed = perf_counter() - start
+                if options['verbosity'] > 1:
+                    total = sum(counts.values())
+                    self.stdout.write(f'{label}: {counts[label]} rows ({total / max(elapsed, 1e-9):.0f} rows/s)')
+        except (ValueError, ValidationError) as exc:
+            raise CommandError(str(exc))
+
+        elapsed = perf_counter() - start
+        for label, count in counts.items():
+            self.stdout.write(f'Imported {count} {label} rows')
+        export_after_bulk_change(self.stdout)
+        total = sum(counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {total} rows in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.0f} rows/s)'
+        ))
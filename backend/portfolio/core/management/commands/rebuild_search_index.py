@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.core.models import JournalEntry, Project
+from portfolio.core.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index for projects and journal entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows updated per statement',
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Database alias to rebuild',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Project, JournalEntry):
+            count = rebuild_search_index(
+                model, batch_size=options['batch_size'], using=options['database']
+            )
+            self.stdout.write(f'Indexed {count} {model._meta.verbose_name_plural}')
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt successfully'))
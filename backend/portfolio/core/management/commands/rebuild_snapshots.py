@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.core.models import JournalEntry, Project, Service
+from portfolio.core.snapshots import rebuild_snapshots
+from portfolio.core.static_api import export_after_bulk_change
+
+
+class Command(BaseCommand):
+    help = 'Re-renders the stored JSON snapshots of projects, journal entries and services'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of rows rendered per statement',
+        )
+        parser.add_argument(
+            '--database', default='default',
+            help='Database alias to rebuild',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Project, JournalEntry, Service):
+            count = rebuild_snapshots(
+                model, batch_size=options['batch_size'], using=options['database']
+            )
+            self.stdout.write(f'Rendered {count} {model._meta.verbose_name_plural}')
+        export_after_bulk_change(self.stdout)
+        self.stdout.write(self.style.SUCCESS('Snapshots rebuilt successfully'))
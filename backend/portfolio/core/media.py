@@ -0,0 +1,206 @@
+"""
+Media delivery.
+
+Uploads are served by ``/media/<name>`` (and ``/api/files/<id>/content``)
+only when the ``File`` is used by published content; staff can see every
+file. Once the check passes the response depends on ``MEDIA_ACCEL_REDIRECT``:
+
+* on (behind nginx): an empty response with ``X-Accel-Redirect`` pointing at
+  the ``internal`` location ``MEDIA_ACCEL_PREFIX``, so nginx sends the file
+  itself with sendfile, ``Range`` support and the cache headers set here.
+* off (``runserver``, tests): the file is streamed by Django, honouring a
+  single ``Range``, ``If-Modified-Since`` and ``If-Range``.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+BLOCK_SIZE = 64 * 1024
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+VARIANT = re.compile(r'^variants/(\d+)/[^/]+$')
+
+PUBLISHED = (
+    Q(project_main_images__status='published')
+    | Q(project_gallery_images__status='published')
+    | Q(journal_featured_images__status='published')
+    | Q(service_featured_images__status='published')
+)
+
+
+def find_file(name):
+    """Return the ``File`` an upload or variant name belongs to, or None."""
+    from .models import File
+
+    match = VARIANT.match(name)
+    if match:
+        file = File.objects.filter(pk=match.group(1)).first()
+        if file and name in served_names(file):
+            return file
+        return None
+    return File.objects.filter(file=name).first()
+
+
+def served_names(file):
+    names = {file.file.name}
+    for key, variants in (file.variants or {}).items():
+        if key != 'source':
+            names.update(variants.values())
+    return names
+
+
+def is_published(file):
+    """Return whether ``file`` is shown by any published project, entry or service."""
+    from .models import File
+
+    return File.objects.filter(pk=file.pk).filter(PUBLISHED).exists()
+
+
+def request_user(request):
+    """Return the session or JWT user; plain Django views skip DRF authentication."""
+    if request.user.is_authenticated:
+        return request.user
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (InvalidToken, TokenError):
+        return request.user
+    return result[0] if result else request.user
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single-range ``Range`` header.
+
+    Returns None when the header is absent or not one we handle (the whole
+    file is sent then) and raises ValueError when it cannot be satisfied.
+    """
+    match = RANGE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # "bytes=-500" is the last 500 bytes.
+        length = int(last)
+        if not length:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end
+
+
+def read_range(handle, start, length):
+    try:
+        handle.seek(start)
+        while length:
+            block = handle.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        handle.close()
+
+
+def cache_control(public):
+    if public:
+        return f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 30 * 24 * 3600)}"
+    return 'private, no-cache'
+
+
+def accel_response(name, content_type, public):
+    prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+    response = HttpResponse(content_type=content_type)
+    response['X-Accel-Redirect'] = prefix + quote(name)
+    response['Cache-Control'] = cache_control(public)
+    return response
+
+
+def file_response(request, name, content_type, public):
+    """Stream ``name`` from storage, answering conditional and Range requests."""
+    try:
+        modified = default_storage.get_modified_time(name).timestamp()
+        size = default_storage.size(name)
+    except (OSError, NotImplementedError):
+        raise Http404('File is missing')
+
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': cache_control(public),
+        'Last-Modified': http_date(modified),
+    }
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), modified):
+        response = HttpResponseNotModified()
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range or parse_http_date_safe(if_range) == int(modified):
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    handle = default_storage.open(name, 'rb')
+    if byte_range is None:
+        response = FileResponse(handle, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(read_range(handle, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def deliver(request, file, name):
+    """Check that ``request`` may see ``file`` and send its stored ``name``."""
+    public = is_published(file)
+    if not public and not request_user(request).is_staff:
+        raise Http404('File not found')
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if getattr(settings, 'MEDIA_ACCEL_REDIRECT', False):
+        return accel_response(name, content_type, public)
+    return file_response(request, name, content_type, public)
+
+
+@require_safe
+def serve_media(request, name):
+    """Serve an upload or image variant by its storage name (``/media/<name>``)."""
+    name = os.path.normpath(name).replace('\\', '/')
+    file = find_file(name)
+    if file is None:
+        raise Http404('File not found')
+    return deliver(request, file, name)
+
+
+@require_safe
+def serve_file(request, pk):
+    """Serve the original upload of ``File`` ``pk``."""
+    from .models import File
+
+    file = File.objects.filter(pk=pk).first()
+    if file is None or not file.file:
+        raise Http404('File not found')
+    return deliver(request, file, file.file.name)
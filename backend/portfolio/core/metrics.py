@@ -0,0 +1,146 @@
+"""
+In-process request metrics rendered in the Prometheus text exposition format.
+
+Metrics live in the memory of the worker that recorded them. With several
+gunicorn workers each scrape sees one worker; scrape every worker (or sum in
+Prometheus) to get the full picture.
+"""
+
+import threading
+from bisect import bisect_left
+
+from .cache import response_cache
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+class Histogram:
+    """A labelled histogram with fixed buckets."""
+
+    def __init__(self, name, documentation, buckets, labelnames=('view', 'action')):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = labelnames
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = {
+                    'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0,
+                }
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def collect(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+            series = [(labels, dict(data, buckets=list(data['buckets']))) for labels, data in series]
+        for labelvalues, data in series:
+            labels = list(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip(self.buckets, data['buckets']):
+                cumulative += count
+                bucket_labels = format_labels(labels + [('le', format_value(bound))])
+                lines.append(f'{self.name}_bucket{bucket_labels} {cumulative}')
+            bucket_labels = format_labels(labels + [('le', '+Inf')])
+            lines.append(f'{self.name}_bucket{bucket_labels} {data["count"]}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {format_value(data["sum"])}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {data["count"]}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+request_duration = Histogram(
+    'portfolio_request_duration_seconds',
+    'Total time spent handling the request.',
+    LATENCY_BUCKETS,
+)
+sql_duration = Histogram(
+    'portfolio_request_sql_duration_seconds',
+    'Time spent executing SQL per request.',
+    LATENCY_BUCKETS,
+)
+sql_queries = Histogram(
+    'portfolio_request_sql_queries',
+    'Number of SQL queries per request.',
+    QUERY_COUNT_BUCKETS,
+)
+serialize_duration = Histogram(
+    'portfolio_request_serialize_duration_seconds',
+    'Time spent in the view outside SQL, i.e. building the response data.',
+    LATENCY_BUCKETS,
+)
+render_duration = Histogram(
+    'portfolio_request_render_duration_seconds',
+    'Time spent rendering the response body.',
+    LATENCY_BUCKETS,
+)
+response_size = Histogram(
+    'portfolio_response_size_bytes',
+    'Size of the response body.',
+    SIZE_BUCKETS,
+)
+
+HISTOGRAMS = (
+    request_duration, sql_duration, sql_queries,
+    serialize_duration, render_duration, response_size,
+)
+
+
+def collect_cache_counters():
+    name = 'portfolio_response_cache_events_total'
+    lines = [
+        f'# HELP {name} Response cache lookups by outcome.',
+        f'# TYPE {name} counter',
+    ]
+    for event, count in sorted(response_cache.stats().items()):
+        lines.append(f'{name}{format_labels([("event", event)])} {count}')
+    return lines
+
+
+def render_metrics():
+    """Return every metric of this process in Prometheus text format."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.collect())
+    lines.extend(collect_cache_counters())
+    return '\n'.join(lines) + '\n'
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
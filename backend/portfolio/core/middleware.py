@@ -0,0 +1,177 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+from .compression import compress_response
+
+
+class RequestStats:
+    """Timings collected while a single request is handled."""
+
+    def __init__(self, track_sql=True):
+        self.track_sql = track_sql
+        self.view = 'unresolved'
+        self.action = ''
+        self.queries = 0
+        self.sql_time = 0.0
+        self.view_started = None
+        self.sql_time_at_view_start = 0.0
+        self.view_finished = None
+        self.view_sql_time = None
+        self.render_finished = None
+
+    def track_query(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook counting and timing every query."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += perf_counter() - start
+            self.queries += 1
+
+
+def resolve_view_name(view_func, method):
+    """Return ``(view, action)`` labels for a resolved view function."""
+    cls = getattr(view_func, 'cls', None)
+    name = cls.__name__ if cls is not None else getattr(view_func, '__name__', 'unknown')
+    # Viewset routes (and the async read views) carry their method -> action mapping.
+    actions = getattr(view_func, 'actions', None) or {}
+    return name, actions.get(method, method)
+
+
+class PerformanceMiddleware:
+    """
+    Record SQL, serialization and render timings per resolved view and action.
+
+    Results are kept as histograms in ``metrics`` and exposed by the internal
+    metrics endpoint. Under ASGI queries run on other threads than the
+    middleware, so only durations and sizes are recorded there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # A coroutine hook runs on the event loop; a sync one would cost
+            # a thread hop on every request.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'PERFORMANCE_METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        stats = request._performance_stats = RequestStats()
+        start = perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats.track_query))
+            response = self.get_response(request)
+        finished = perf_counter()
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name == 'metrics':
+            return response
+        self.record(stats, response, start, finished)
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'PERFORMANCE_METRICS_ENABLED', True):
+            return await self.get_response(request)
+
+        stats = request._performance_stats = RequestStats(track_sql=False)
+        start = perf_counter()
+        response = await self.get_response(request)
+        finished = perf_counter()
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name == 'metrics':
+            return response
+        self.record(stats, response, start, finished)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        stats = getattr(request, '_performance_stats', None)
+        if stats is None:
+            return None
+        stats.view, stats.action = resolve_view_name(view_func, request.method.lower())
+        stats.view_started = perf_counter()
+        stats.sql_time_at_view_start = stats.sql_time
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        return PerformanceMiddleware.process_view(self, request, view_func, view_args, view_kwargs)
+
+    def process_template_response(self, request, response):
+        stats = getattr(request, '_performance_stats', None)
+        if stats is None:
+            return response
+        stats.view_finished = perf_counter()
+        stats.view_sql_time = stats.sql_time - stats.sql_time_at_view_start
+
+        def mark_rendered(rendered_response):
+            stats.render_finished = perf_counter()
+
+        response.add_post_render_callback(mark_rendered)
+        return response
+
+    def record(self, stats, response, start, finished):
+        labels = (stats.view, stats.action)
+        metrics.request_duration.observe(finished - start, *labels)
+        if stats.track_sql:
+            metrics.sql_duration.observe(stats.sql_time, *labels)
+            metrics.sql_queries.observe(stats.queries, *labels)
+
+        if stats.view_started is not None:
+            # Responses that are not template responses (cache hits, 304s) are
+            # complete when the view returns: no separate render step.
+            view_finished = stats.view_finished or finished
+            view_sql_time = stats.view_sql_time
+            if view_sql_time is None:
+                view_sql_time = stats.sql_time - stats.sql_time_at_view_start
+            metrics.serialize_duration.observe(
+                max(view_finished - stats.view_started - view_sql_time, 0.0), *labels
+            )
+            render_time = 0.0
+            if stats.view_finished and stats.render_finished:
+                render_time = stats.render_finished - stats.view_finished
+            metrics.render_duration.observe(render_time, *labels)
+
+        if not response.streaming:
+            metrics.response_size.observe(len(response.content), *labels)
+
+
+class CompressionMiddleware:
+    """
+    Compress JSON responses with Brotli or gzip, negotiated on ``Accept-Encoding``.
+
+    Cached API responses arrive here already encoded (see ``cache.py``) and
+    are passed through untouched.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if not getattr(settings, 'RESPONSE_COMPRESSION_ENABLED', True):
+            return response
+        return compress_response(request, response)
@@ -1,28 +1,34 @@
 # Generated by Django 4.2.7 on 2023-11-15 12:10
 
 from django.db import migrations
+from django.db.models import Q
 from django.utils.text import slugify
 
 
 def generate_service_slugs(apps, schema_editor):
     """
     Generate slugs for existing services.
+
+    Taken slugs are read with one query and free ones allocated in memory,
+    rather than an ``exists()`` probe per candidate. Self-contained on
+    purpose: later changes to ``core/slugs.py`` must not alter this migration.
     """
     Service = apps.get_model('core', 'Service')
-    for service in Service.objects.all():
-        if not service.slug:
-            # Generate a unique slug
-            base_slug = slugify(service.title)
-            slug = base_slug
-            counter = 1
-            
-            # Check if the slug already exists
-            while Service.objects.filter(slug=slug).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-                
-            service.slug = slug
-            service.save()
+    db = schema_editor.connection.alias
+    services = list(Service.objects.using(db).filter(Q(slug='') | Q(slug__isnull=True)).order_by('pk'))
+    if not services:
+        return
+    taken = set(Service.objects.using(db).exclude(slug='').exclude(slug__isnull=True).values_list('slug', flat=True))
+    for service in services:
+        base_slug = slugify(service.title)
+        slug = base_slug
+        counter = 1
+        while slug in taken:
+            slug = f"{base_slug}-{counter}"
+            counter += 1
+        service.slug = slug
+        taken.add(slug)
+    Service.objects.using(db).bulk_update(services, ['slug'], batch_size=500)
 
 
 class Migration(migrations.Migration):
@@ -33,4 +39,4 @@ class Migration(migrations.Migration):
 
     operations = [
         migrations.RunPython(generate_service_slugs, migrations.RunPython.noop),
-    ]
\ No newline at end of file
+    ]
@@ -0,0 +1,20 @@
+# Generated migration for conditional GET support on files
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_add_arabic_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='file',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated migration for full-text search
+
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models import F, TextField
+from django.db.models.functions import Cast
+from django.utils.html import strip_tags
+
+# Search documents as of this migration: (field, text search configuration,
+# weight) per table. A frozen copy, so later changes to core/search.py do not
+# change what this migration builds.
+SEARCH_TABLES = {
+    'core.project': ('core_project', [
+        ('title', 'english', 'A'),
+        ('description', 'english', 'B'),
+        ('category', 'english', 'C'),
+        ('tech_stack', 'english', 'C'),
+        ('tags', 'english', 'B'),
+    ]),
+    'core.journalentry': ('core_journalentry', [
+        ('title', 'english', 'A'),
+        ('title_ar', 'arabic', 'A'),
+        ('excerpt', 'english', 'B'),
+        ('excerpt_ar', 'arabic', 'B'),
+        ('tags', 'english', 'B'),
+        ('tags_ar', 'arabic', 'B'),
+        ('content_rich_text', 'english', 'D'),
+        ('content_rich_text_ar', 'arabic', 'D'),
+    ]),
+}
+
+JSON_FIELDS = ('tags', 'tags_ar', 'tech_stack')
+
+
+def document_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return strip_tags(str(value))
+
+
+def fill_search_index(model, table, fields, schema_editor):
+    """Build the search document of every existing row of ``model``."""
+    db = schema_editor.connection.alias
+    if schema_editor.connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+
+        vector = None
+        for field, config, weight in fields:
+            expression = Cast(field, output_field=TextField()) if field in JSON_FIELDS else F(field)
+            part = SearchVector(expression, config=config, weight=weight)
+            vector = part if vector is None else vector + part
+        model.objects.using(db).update(search_vector=vector)
+    elif schema_editor.connection.vendor == 'sqlite':
+        names = [field for field, _, _ in fields]
+        rows = [
+            [row[0]] + [document_value(value) for value in row[1:]]
+            for row in model.objects.using(db).order_by('pk').values_list('pk', *names).iterator()
+        ]
+        if rows:
+            placeholders = ', '.join(['%s'] * (len(names) + 1))
+            with schema_editor.connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {table}_fts (rowid, {', '.join(names)}) VALUES ({placeholders})", rows
+                )
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    Create the GIN indexes on PostgreSQL, or the FTS5 tables on SQLite, and
+    fill them from the existing rows.
+    """
+    vendor = schema_editor.connection.vendor
+    for label, (table, fields) in SEARCH_TABLES.items():
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)'
+            )
+        elif vendor == 'sqlite':
+            columns = ', '.join(field for field, _, _ in fields)
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {table}_fts USING fts5('
+                f"{columns}, tokenize = 'porter unicode61 remove_diacritics 2')"
+            )
+        fill_search_index(apps.get_model(label), table, fields, schema_editor)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, _ in SEARCH_TABLES.values():
+        if vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {table}_search_vector_gin')
+        elif vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_file_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
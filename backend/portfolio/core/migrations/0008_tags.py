@@ -0,0 +1,91 @@
+# Generated migration for indexed tag storage
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tags(apps, schema_editor):
+    """Create tag links for every existing project and journal entry."""
+    db = schema_editor.connection.alias
+    Tag = apps.get_model('core', 'Tag')
+    sources = [
+        ('Project', 'ProjectTag', 'project', 'kind', {'tag': 'tags', 'tech': 'tech_stack'}),
+        ('JournalEntry', 'JournalEntryTag', 'entry', 'language', {'en': 'tags', 'ar': 'tags_ar'}),
+    ]
+    tag_ids = {}
+    for model_name, through_name, owner, discriminator, fields in sources:
+        model = apps.get_model('core', model_name)
+        through = apps.get_model('core', through_name)
+        links = set()
+        for row in model.objects.using(db).values('pk', *fields.values()).iterator(chunk_size=1000):
+            for value, field in fields.items():
+                names = row[field] if isinstance(row[field], list) else []
+                for name in names:
+                    name = str(name).strip()[:255] if name is not None else ''
+                    if name:
+                        links.add((row['pk'], name, value))
+            if len(links) >= 1000:
+                write_links(Tag, through, owner, discriminator, links, tag_ids, db)
+                links = set()
+        write_links(Tag, through, owner, discriminator, links, tag_ids, db)
+
+
+def write_links(Tag, through, owner, discriminator, links, tag_ids, db):
+    names = {name for _, name, _ in links} - tag_ids.keys()
+    if names:
+        Tag.objects.using(db).bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+        tag_ids.update(Tag.objects.using(db).filter(name__in=names).values_list('name', 'id'))
+    through.objects.using(db).bulk_create(
+        [
+            through(**{f'{owner}_id': owner_id, 'tag_id': tag_ids[name], discriminator: value})
+            for owner_id, name, value in links
+        ],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('tag', 'Tag'), ('tech', 'Tech stack')], max_length=10)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='core.project')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='core.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'kind', 'project'], name='core_projecttag_lookup')],
+                'constraints': [models.UniqueConstraint(fields=('project', 'tag', 'kind'), name='unique_project_tag')],
+            },
+        ),
+        migrations.CreateModel(
+            name='JournalEntryTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('en', 'English'), ('ar', 'Arabic')], max_length=10)),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='core.journalentry')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='journal_entry_links', to='core.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'entry'], name='core_journalentrytag_lookup')],
+                'constraints': [models.UniqueConstraint(fields=('entry', 'tag', 'language'), name='unique_journal_entry_tag')],
+            },
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
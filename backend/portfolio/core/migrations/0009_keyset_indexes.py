@@ -0,0 +1,28 @@
+# Generated migration for keyset pagination indexes
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(
+                fields=['status', '-publication_date', '-created_at', 'id'],
+                name='core_journalentry_keyset',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['status', '-created_at', 'id'], name='core_project_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['status', 'sort', 'title', 'id'], name='core_service_keyset'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_upload_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journalentry',
+            name='detail_snapshot',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='list_snapshot',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='detail_snapshot',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='list_snapshot',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='detail_snapshot',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='list_snapshot',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+    ]
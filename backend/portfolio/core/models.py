@@ -1,5 +1,10 @@
+import uuid
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from django.utils.text import slugify
+
+from .slugs import save_with_unique_slug
 
 class BaseModel(models.Model):
     """Base model with common fields for all models."""
@@ -9,6 +14,14 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+class SnapshotModel(BaseModel):
+    """Base model for content also stored as pre-rendered JSON (see `core/snapshots.py`)."""
+    list_snapshot = models.TextField(blank=True, null=True, editable=False)
+    detail_snapshot = models.TextField(blank=True, null=True, editable=False)
+
+    class Meta:
+        abstract = True
+
 class File(models.Model):
     """Model for storing files and images."""
     title = models.CharField(max_length=255, blank=True, null=True)
@@ -19,11 +32,58 @@ class File(models.Model):
     height = models.IntegerField(blank=True, null=True)
     filesize = models.BigIntegerField(blank=True, null=True)
     mime_type = models.CharField(max_length=255, blank=True, null=True)
+    # Resized copies by format and width, filled in by core/images.py.
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title or self.file.name
 
-class Project(BaseModel):
+class UploadSession(models.Model):
+    """
+    A resumable upload in progress (see `core/uploads.py`).
+
+    Chunks are appended to a temp file; the `File` row is only created when
+    the upload is finalized.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('complete', 'Complete'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255, blank=True, null=True)
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True, null=True, help_text="Expected checksum, if known")
+    title = models.CharField(max_length=255, blank=True, null=True)
+    description = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='upload_sessions'
+    )
+    file = models.ForeignKey(
+        File,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_sessions'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.filename
+
+class Project(SnapshotModel):
     """Model for portfolio projects."""
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -55,25 +115,22 @@ class Project(BaseModel):
     live_url = models.URLField(blank=True, null=True)
     repo_url = models.URLField(blank=True, null=True)
     sort = models.IntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of published projects (see core/pagination.py).
+            models.Index(fields=['status', '-created_at', 'id'], name='core_project_keyset'),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-            # Check if the slug already exists
-            original_slug = self.slug
-            counter = 1
-            while Project.objects.filter(slug=self.slug).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
-
-class JournalEntry(BaseModel):
+        save_with_unique_slug(self, super().save, *args, **kwargs)
+
+class JournalEntry(SnapshotModel):
     """Model for journal/blog entries."""
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -107,26 +164,25 @@ class JournalEntry(BaseModel):
     tags = models.JSONField(blank=True, null=True)
     tags_ar = models.JSONField(blank=True, null=True, help_text="Arabic tags")
     sort = models.IntegerField(default=0)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ['-publication_date', '-created_at']
         verbose_name_plural = 'Journal Entries'
+        indexes = [
+            models.Index(
+                fields=['status', '-publication_date', '-created_at', 'id'],
+                name='core_journalentry_keyset',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-            # Check if the slug already exists
-            original_slug = self.slug
-            counter = 1
-            while JournalEntry.objects.filter(slug=self.slug).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
-
-class Service(BaseModel):
+        save_with_unique_slug(self, super().save, *args, **kwargs)
+
+class Service(SnapshotModel):
     """Model for services offered."""
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -152,17 +208,66 @@ class Service(BaseModel):
 
     class Meta:
         ordering = ['sort', 'title']
+        indexes = [
+            models.Index(fields=['status', 'sort', 'title', 'id'], name='core_service_keyset'),
+        ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-            # Check if the slug already exists
-            original_slug = self.slug
-            counter = 1
-            while Service.objects.filter(slug=self.slug).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
+        save_with_unique_slug(self, super().save, *args, **kwargs)
+
+
+class Tag(models.Model):
+    """Normalized tag name, indexed for `?tag=` and `?tech_stack=` filters."""
+    name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+class ProjectTag(models.Model):
+    """
+    Link between a project and one entry of its `tags` or `tech_stack` JSON.
+
+    The JSON fields remain the source of truth; these rows are kept in sync on
+    save (see `core/tags.py`) so filters can use indexes instead of scanning.
+    """
+    KIND_CHOICES = [
+        ('tag', 'Tag'),
+        ('tech', 'Tech stack'),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='project_links')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'tag', 'kind'], name='unique_project_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'kind', 'project'], name='core_projecttag_lookup'),
+        ]
+
+class JournalEntryTag(models.Model):
+    """Link between a journal entry and one entry of its `tags` or `tags_ar` JSON."""
+    LANGUAGE_CHOICES = [
+        ('en', 'English'),
+        ('ar', 'Arabic'),
+    ]
+
+    entry = models.ForeignKey(JournalEntry, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='journal_entry_links')
+    language = models.CharField(max_length=10, choices=LANGUAGE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entry', 'tag', 'language'], name='unique_journal_entry_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'entry'], name='core_journalentrytag_lookup'),
+        ]
@@ -0,0 +1,235 @@
+"""
+Opt-in keyset (cursor) pagination for the public list endpoints.
+
+Page-number pagination runs ``COUNT(*)`` plus ``OFFSET n`` on every page, so
+deep pages get slower the further a crawler or infinite-scroll client goes.
+Passing ``?cursor=`` (empty for the first page) switches to keyset mode: the
+next page is found with a ``WHERE (ordering columns) > (last row)`` condition
+on the view's ordering plus an ``id`` tiebreaker, and the count is only run
+when ``?count=true`` is also passed.
+"""
+
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import F, Q
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+class KeysetPaginationMixin:
+    """
+    Add a keyset mode to a page-number paginator.
+
+    NULLs sort as the largest value, which is PostgreSQL's default and so
+    matches plain composite indexes there; the order is spelled out for
+    nullable columns because SQLite sorts NULLs as the smallest value.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.start_keyset(queryset, request)
+        self.count = queryset.count() if self.count_requested(request) else None
+        queryset = self.keyset_page_queryset(queryset)
+        return self.keyset_page(list(queryset[:page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Like ``paginate_queryset`` but evaluated with the async ORM."""
+        self.keyset = self.cursor_query_param in request.query_params
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        if self.keyset:
+            self.start_keyset(queryset, request)
+            self.count = await queryset.acount() if self.count_requested(request) else None
+            queryset = self.keyset_page_queryset(queryset)
+            return self.keyset_page([row async for row in queryset[:page_size + 1]], page_size)
+
+        # Mirrors PageNumberPagination.paginate_queryset and Paginator.page().
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        if page_number in self.last_page_strings:
+            page_number = paginator.num_pages
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        bottom = (number - 1) * paginator.per_page
+        top = bottom + paginator.per_page
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        rows = [row async for row in queryset[bottom:top]]
+        self.page = paginator._get_page(rows, number, paginator)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+
+    def start_keyset(self, queryset, request):
+        """Read the ordering of ``queryset`` and the cursor position of ``request``."""
+        self.request = request
+        self.ordering = self.get_keyset_ordering(queryset)
+        self.position = self.decode_cursor(request, queryset.model)
+
+    def keyset_page_queryset(self, queryset):
+        """Return ``queryset`` ordered for keyset paging and starting after the cursor."""
+        queryset = queryset.order_by(*self.order_expressions(queryset.model))
+        if self.position is not None:
+            queryset = queryset.filter(self.after(queryset.model, self.position))
+        return queryset
+
+    def keyset_page(self, rows, page_size):
+        """Trim the ``page_size + 1`` fetched rows to a page and remember what follows."""
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = self.row_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        body = OrderedDict()
+        if self.count is not None:
+            body['count'] = self.count
+        body['next'] = self.get_next_link()
+        body['results'] = data
+        return Response(body)
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_keyset_ordering(self, queryset):
+        """Return ``(name, descending)`` pairs ending with a unique ``id`` key."""
+        ordering = []
+        for item in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(item, str) or item == '?':
+                continue
+            name = item.lstrip('-')
+            if name == 'pk':
+                name = 'id'
+            ordering.append((name, item.startswith('-')))
+        if 'id' not in [name for name, _ in ordering]:
+            ordering.append(('id', False))
+        return ordering
+
+    def ordering_labels(self):
+        return [f"{'-' if descending else ''}{name}" for name, descending in self.ordering]
+
+    def order_expressions(self, model):
+        expressions = []
+        for name, descending in self.ordering:
+            if not self.is_nullable(model, name):
+                expressions.append(F(name).desc() if descending else F(name).asc())
+            elif descending:
+                expressions.append(F(name).desc(nulls_first=True))
+            else:
+                expressions.append(F(name).asc(nulls_last=True))
+        return expressions
+
+    def is_nullable(self, model, name):
+        try:
+            return model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+
+    def after(self, model, position):
+        """
+        Build ``WHERE`` for rows strictly after ``position``.
+
+        For orderings (a, b, id) that is ``a > va OR (a = va AND (b > vb OR
+        (b = vb AND id > vid)))``, with NULL the largest value of a column.
+        """
+        condition = None
+        for (name, descending), value in reversed(list(zip(self.ordering, position))):
+            if value is None:
+                equal = Q(**{f'{name}__isnull': True})
+                # Descending, every value follows the leading NULLs; ascending,
+                # nothing but other NULLs follows them.
+                strictly_after = Q(**{f'{name}__isnull': False}) if descending else Q(pk__in=[])
+            else:
+                equal = Q(**{name: value})
+                strictly_after = Q(**{f'{name}__lt': value}) if descending else Q(**{f'{name}__gt': value})
+                if not descending and self.is_nullable(model, name):
+                    strictly_after |= Q(**{f'{name}__isnull': True})
+            if condition is None:
+                condition = strictly_after
+            else:
+                condition = strictly_after | (equal & condition)
+        return condition
+
+    def row_position(self, row):
+        # Rows are model instances, or dicts for ``values()`` querysets (see rows.py).
+        if isinstance(row, dict):
+            return [encode_value(row[name]) for name, _ in self.ordering]
+        return [encode_value(getattr(row, name)) for name, _ in self.ordering]
+
+    def encode_cursor(self, position):
+        payload = {'o': self.ordering_labels(), 'p': position}
+        raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request, model):
+        """Return the position stored in the cursor, or None for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param, '').strip()
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4))
+            payload = json.loads(raw)
+            if payload['o'] != self.ordering_labels() or len(payload['p']) != len(self.ordering):
+                raise ValueError('Cursor ordering mismatch')
+            return [
+                self.parse_value(model, name, value)
+                for (name, _), value in zip(self.ordering, payload['p'])
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_value(self, model, name, value):
+        if value is None:
+            return None
+        try:
+            return model._meta.get_field(name).to_python(value)
+        except FieldDoesNotExist:
+            # Annotations such as the search rank are plain numbers.
+            return value
+
+
+class KeysetPageNumberPagination(KeysetPaginationMixin, pagination.PageNumberPagination):
+    """Page-number pagination with an opt-in ``?cursor=`` keyset mode."""
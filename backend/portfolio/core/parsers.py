@@ -0,0 +1,37 @@
+"""orjson-backed JSON parser, a drop-in for DRF's ``JSONParser``."""
+
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import ORJSONRenderer, orjson
+
+
+def is_utf8(encoding):
+    try:
+        return codecs.lookup(encoding).name == 'utf-8'
+    except LookupError:
+        return False
+
+
+class ORJSONParser(JSONParser):
+    """
+    Parse JSON request bodies with orjson.
+
+    orjson rejects ``NaN``/``Infinity`` like the strict stdlib parser does;
+    the lenient mode (``STRICT_JSON = False``) and bodies in other charsets
+    go through ``JSONParser``.
+    """
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or not is_utf8(encoding):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,131 @@
+"""
+orjson-backed JSON renderer, a drop-in for DRF's ``JSONRenderer``.
+
+Output matches DRF's: compact, UTF-8, ``\\u2028``/``\\u2029`` escaped, and
+anything orjson does not handle natively (datetimes, Decimals, lazy strings,
+querysets...) is converted by DRF's own ``JSONEncoder.default``, so e.g.
+datetimes keep their trailing ``Z``. Requests for indented output and
+payloads orjson rejects (integers over 64 bits) fall back to the stdlib path.
+
+``RawJSON`` values in the data are JSON text rendered earlier (see
+``snapshots.py``); they are written into the output as-is.
+"""
+
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+class RawJSON:
+    """
+    A value that is already rendered JSON text.
+
+    Renderers write the text as-is; anything else reading it (tests, the
+    browsable API) sees the decoded value, parsed once on first access.
+    """
+
+    __slots__ = ('content', '_value')
+
+    def __init__(self, content):
+        self.content = content
+
+    @classmethod
+    def array(cls, items):
+        """A JSON array of already rendered items."""
+        return cls('[' + ','.join(items) + ']')
+
+    def decode(self):
+        try:
+            return self._value
+        except AttributeError:
+            self._value = json.loads(self.content)
+            return self._value
+
+    def __getitem__(self, key):
+        return self.decode()[key]
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __len__(self):
+        return len(self.decode())
+
+    def __contains__(self, item):
+        return item in self.decode()
+
+    def __eq__(self, other):
+        return self.decode() == (other.decode() if isinstance(other, RawJSON) else other)
+
+    __hash__ = None
+
+    def get(self, key, default=None):
+        return self.decode().get(key, default)
+
+    def keys(self):
+        return self.decode().keys()
+
+    def items(self):
+        return self.decode().items()
+
+
+class RawJSONEncoder(JSONEncoder):
+    """DRF's encoder, decoding ``RawJSON`` for the stdlib path."""
+
+    def default(self, obj):
+        if isinstance(obj, RawJSON):
+            return obj.decode()
+        return super().default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Render JSON with orjson, byte-compatible with ``JSONRenderer``."""
+
+    encoder_class = RawJSONEncoder
+
+    def __init__(self):
+        self.default = JSONEncoder().default
+        # DRF formats datetimes itself (``Z`` suffix), so orjson hands them over.
+        self.options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        raw = []
+
+        def default(obj):
+            # Stand in a placeholder string for RawJSON, swapped for the text below.
+            if isinstance(obj, RawJSON):
+                raw.append(obj)
+                return f'\x00raw:{len(raw) - 1}'
+            return self.default(obj)
+
+        try:
+            content = orjson.dumps(data, default=default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Placeholders render as "\u0000raw:N"; the envelopes RawJSON sits in
+        # (pagination links, section names) never hold a NUL.
+        for index, value in enumerate(raw):
+            content = content.replace(b'"\\u0000raw:%d"' % index, value.content.encode(), 1)
+
+        # Keep the output a strict JavaScript subset, as JSONRenderer does.
+        if LINE_SEPARATOR in content or PARAGRAPH_SEPARATOR in content:
+            content = content.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return content
@@ -0,0 +1,199 @@
+"""
+Read-replica routing for the public API.
+
+``ReplicaRoutingMiddleware`` decides per request whether its reads may go to
+a replica: only safe-method requests to views marked ``replica_reads`` (the
+core viewsets, the homepage bundle and the async read endpoints) qualify.
+Everything else -- the admin, auth, uploads, any write -- stays on
+``default``. ``ReplicaRouter`` then sends the ORM reads of a qualifying
+request to one replica, picked once per request so its queries see one
+consistent snapshot.
+
+Read-your-writes: a response to an unsafe request sets a short-lived
+cookie, and requests carrying it read from the primary for
+``REPLICA_PIN_SECONDS``, so an editor sees their change at once. A write
+within a request also moves the rest of that request to the primary.
+
+Replicas lagging more than ``REPLICA_MAX_LAG`` seconds (or unreachable)
+are skipped; lag is checked at most every ``REPLICA_LAG_CHECK_INTERVAL``
+seconds per process. Responses cached from a replica read soon after an
+invalidation are kept only ``REPLICA_MAX_LAG`` seconds (see ``cache.py``).
+"""
+
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_COOKIE = 'db_primary'
+
+# Replication lag in seconds: 0 when the replica has replayed all it has received.
+POSTGRES_LAG_SQL = '''
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+
+class RoutingState:
+    """Routing decisions of the current request."""
+
+    def __init__(self):
+        self.replica = None
+        self.wrote = False
+
+
+_state = ContextVar('replica_routing', default=None)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def max_lag():
+    return getattr(settings, 'REPLICA_MAX_LAG', 5)
+
+
+def replica_lag(alias):
+    """Return how many seconds ``alias`` is behind the primary."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(POSTGRES_LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+class LagMonitor:
+    """Per-process cache of which replicas are fit to read from."""
+
+    def __init__(self):
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 5)
+        now = time.monotonic()
+        with self._lock:
+            checked = self._checked.get(alias)
+            if checked is not None and now - checked[0] < interval:
+                return checked[1]
+        try:
+            healthy = replica_lag(alias) <= max_lag()
+        except DatabaseError:
+            healthy = False
+        with self._lock:
+            self._checked[alias] = (now, healthy)
+        return healthy
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+
+lag_monitor = LagMonitor()
+
+
+def choose_replica():
+    """Return a replica alias fit to read from, or None for the primary."""
+    healthy = [alias for alias in replica_aliases() if lag_monitor.is_healthy(alias)]
+    return random.choice(healthy) if healthy else None
+
+
+def current_replica():
+    """The replica the current request reads from, if any."""
+    state = _state.get()
+    if state is None or state.wrote:
+        return None
+    return state.replica
+
+
+class ReplicaRouter:
+    """Send the reads of qualifying requests to their replica; everything else to ``default``."""
+
+    def db_for_read(self, model, **hints):
+        return current_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas follow the primary's schema through replication.
+        return db not in replica_aliases()
+
+
+def reads_from_replica(view_func):
+    cls = getattr(view_func, 'cls', None)
+    return getattr(cls if cls is not None else view_func, 'replica_reads', False)
+
+
+class ReplicaRoutingMiddleware:
+    """Route the reads of safe requests to marked views to a replica; pin clients to the primary after a write."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Only qualifying requests pay a thread hop (for the lag check).
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _state.set(RoutingState())
+        try:
+            return self.pin(request, self.get_response(request))
+        finally:
+            _state.reset(token)
+
+    async def __acall__(self, request):
+        token = _state.set(RoutingState())
+        try:
+            return self.pin(request, await self.get_response(request))
+        finally:
+            _state.reset(token)
+
+    def qualifies(self, request, view_func):
+        return (
+            _state.get() is not None
+            and replica_aliases()
+            and request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+            and reads_from_replica(view_func)
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.qualifies(request, view_func):
+            _state.get().replica = choose_replica()
+        return None
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if self.qualifies(request, view_func):
+            # The lag check may query the replica.
+            _state.get().replica = await sync_to_async(choose_replica)()
+        return None
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and replica_aliases():
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,148 @@
+"""
+Serializer-free list responses built from ``values()`` rows.
+
+For a page of list rows most of the time goes into DRF rather than SQL: a
+model instance per row (plus one for its nested file) and a
+``to_representation`` walk over every field object of every row.
+``RowSerializer`` reads a serializer's fields once and turns them into a plan
+of columns; the list is then fetched with one ``values()`` query
+(nested files come through the same ``LEFT JOIN`` ``select_related`` used) and
+each row is built straight from its dict.
+
+Output is the serializer's, key for key and byte for byte (see
+``test_rows.py``): plain columns are copied, file fields go through the same
+storage ``url()``, anything else (datetimes...) through the field's own
+``to_representation``. ``SerializerMethodField`` methods are called on a
+stand-in object carrying the columns the serializer lists in ``row_sources``.
+Fields the plan cannot express (to-many relations, ``source='*'``) raise
+``ImproperlyConfigured`` so a serializer change cannot silently diverge.
+"""
+
+from functools import lru_cache
+from types import SimpleNamespace
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation returns database values unchanged.
+PLAIN_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.ChoiceField,
+    serializers.EmailField, serializers.IntegerField, serializers.SlugField, serializers.URLField,
+)
+
+
+def ordering_columns(queryset):
+    """Names the queryset is ordered by, which keyset pagination reads from each row."""
+    columns = []
+    for item in queryset.query.order_by or queryset.model._meta.ordering:
+        if isinstance(item, str) and item != '?':
+            name = item.lstrip('-')
+            columns.append('id' if name == 'pk' else name)
+    return columns + ['id']
+
+
+class RowSerializer:
+    """Render ``serializer_class`` output from ``values()`` rows."""
+
+    @classmethod
+    def for_serializer(cls, serializer_class, context=None):
+        """
+        Return a row serializer for ``serializer_class`` and ``context``.
+
+        Without a request in the context (the public ``published`` lists) the
+        plan only depends on the field selection, so it is built once per
+        worker and selection and reused.
+        """
+        context = context or {}
+        if set(context) - {'fieldset'}:
+            return cls(serializer_class, context)
+        return shared(cls, serializer_class, context.get('fieldset'))
+
+    def __init__(self, serializer_class, context=None):
+        serializer = serializer_class(context=context or {})
+        self.request = serializer.context.get('request')
+        self.columns = []
+        self.plan = self.build_plan(serializer, '')
+
+    def build_plan(self, serializer, prefix):
+        model = serializer.Meta.model
+        plan = []
+        for field in serializer._readable_fields:
+            column = prefix + field.source
+            if isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+                raise ImproperlyConfigured(f'{type(serializer).__name__}.{field.field_name}: nested lists are not supported')
+            if not isinstance(field, serializers.SerializerMethodField) and (
+                field.source == '*' or '.' in field.source
+            ):
+                raise ImproperlyConfigured(f'{type(serializer).__name__}.{field.field_name}: unsupported source')
+            if isinstance(field, serializers.BaseSerializer):
+                pk = f'{column}__{field.Meta.model._meta.pk.name}'
+                self.columns.append(pk)
+                plan.append((field.field_name, 'nested', pk, self.build_plan(field, f'{column}__')))
+            elif isinstance(field, serializers.SerializerMethodField):
+                sources = getattr(serializer, 'row_sources', {}).get(field.field_name)
+                if sources is None:
+                    raise ImproperlyConfigured(
+                        f'{type(serializer).__name__}.row_sources does not list the columns of {field.field_name!r}'
+                    )
+                columns = {name: prefix + name for name in sources}
+                self.columns.extend(columns.values())
+                plan.append((field.field_name, 'method', columns, getattr(serializer, field.method_name)))
+            elif isinstance(field, serializers.FileField):
+                self.columns.append(column)
+                use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+                storage = model._meta.get_field(field.source).storage if use_url else None
+                plan.append((field.field_name, 'file', column, storage))
+            else:
+                self.columns.append(column)
+                plain = (
+                    type(field) in PLAIN_FIELDS
+                    or (type(field) is serializers.JSONField and not field.binary)
+                    # A collapsed relation (see fieldsets.py): the column is the key.
+                    or (type(field) is PrimaryKeyRelatedField and field.pk_field is None)
+                )
+                plan.append((field.field_name, 'plain' if plain else 'field', column, field))
+        return plan
+
+    def values(self, queryset):
+        """Return ``queryset`` as dict rows with every column the plan reads."""
+        columns = dict.fromkeys(self.columns + ordering_columns(queryset))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def build(self, plan, row):
+        data = {}
+        for name, kind, column, extra in plan:
+            if kind == 'nested':
+                data[name] = None if row[column] is None else self.build(extra, row)
+                continue
+            if kind == 'method':
+                data[name] = extra(SimpleNamespace(**{attr: row[key] for attr, key in column.items()}))
+                continue
+            value = row[column]
+            if value is None or kind == 'plain':
+                data[name] = value
+            elif kind == 'file':
+                # FileField.to_representation with the column as the file name.
+                if not value:
+                    data[name] = None
+                elif extra is None:
+                    data[name] = value
+                else:
+                    url = extra.url(value)
+                    data[name] = self.request.build_absolute_uri(url) if self.request is not None else url
+            else:
+                data[name] = extra.to_representation(value)
+        return data
+
+    def to_representation(self, row):
+        return self.build(self.plan, row)
+
+    def data(self, rows):
+        return [self.build(self.plan, row) for row in rows]
+
+
+@lru_cache(maxsize=128)
+def shared(cls, serializer_class, fieldset):
+    return cls(serializer_class, {'fieldset': fieldset})
@@ -0,0 +1,237 @@
+"""
+Full-text search for projects and journal entries.
+
+On PostgreSQL every searchable model keeps a ``search_vector`` column
+(``tsvector``, GIN indexed) built from its English and Arabic fields. Locally
+on SQLite the same documents are kept in an FTS5 virtual table per model.
+Both are updated on save (``signals.py``) and can be rebuilt in bulk with the
+``rebuild_search_index`` management command.
+"""
+
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Case, F, FloatField, TextField, Value, When
+from django.db.models.functions import Cast
+from django.utils.html import strip_tags
+from rest_framework.filters import BaseFilterBackend
+
+ENGLISH = 'english'
+ARABIC = 'arabic'
+
+# (field, text search configuration, weight). Weights rank title matches above
+# excerpt/tag matches above body matches.
+SEARCH_FIELDS = {
+    'core.project': [
+        ('title', ENGLISH, 'A'),
+        ('description', ENGLISH, 'B'),
+        ('category', ENGLISH, 'C'),
+        ('tech_stack', ENGLISH, 'C'),
+        ('tags', ENGLISH, 'B'),
+    ],
+    'core.journalentry': [
+        ('title', ENGLISH, 'A'),
+        ('title_ar', ARABIC, 'A'),
+        ('excerpt', ENGLISH, 'B'),
+        ('excerpt_ar', ARABIC, 'B'),
+        ('tags', ENGLISH, 'B'),
+        ('tags_ar', ARABIC, 'B'),
+        ('content_rich_text', ENGLISH, 'D'),
+        ('content_rich_text_ar', ARABIC, 'D'),
+    ],
+}
+
+# bm25() column weights for the FTS5 fallback, mirroring the tsvector weights.
+FTS5_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+JSON_FIELDS = ('tags', 'tags_ar', 'tech_stack')
+
+# The SQLite fallback only exists for local runs; keep the rank CASE small.
+FTS5_MAX_RESULTS = 500
+
+
+def is_searchable(model):
+    return model._meta.label_lower in SEARCH_FIELDS
+
+
+def search_fields(model):
+    return SEARCH_FIELDS[model._meta.label_lower]
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def uses_postgres(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'postgresql'
+
+
+def uses_fts5(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def search_vector(model):
+    """Return the ``SearchVector`` expression that fills ``model.search_vector``."""
+    from django.contrib.postgres.search import SearchVector
+
+    vector = None
+    for field, config, weight in search_fields(model):
+        expression = Cast(field, output_field=TextField()) if field in JSON_FIELDS else F(field)
+        part = SearchVector(expression, config=config, weight=weight)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def document_value(value):
+    """Flatten a model value into plain text for the FTS5 table."""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(item) for item in value)
+    return strip_tags(str(value))
+
+
+def update_search_index(model, pks, using=DEFAULT_DB_ALIAS):
+    """Recompute the search document of the given rows."""
+    pks = list(pks)
+    if not pks or not is_searchable(model):
+        return
+    queryset = model.objects.using(using).filter(pk__in=pks)
+    if uses_postgres(using):
+        queryset.update(search_vector=search_vector(model))
+    elif uses_fts5(using):
+        fields = [field for field, _, _ in search_fields(model)]
+        write_fts5_rows(model, queryset.values_list('pk', *fields), using, replace=True)
+
+
+def write_fts5_rows(model, rows, using=DEFAULT_DB_ALIAS, replace=False):
+    table = fts_table(model)
+    fields = [field for field, _, _ in search_fields(model)]
+    values = [
+        [row[0]] + [document_value(value) for value in row[1:]]
+        for row in rows
+    ]
+    if not values:
+        return
+    columns = ', '.join(['rowid'] + fields)
+    placeholders = ', '.join(['%s'] * (len(fields) + 1))
+    with connections[using].cursor() as cursor:
+        if replace:
+            cursor.executemany(
+                f'DELETE FROM {table} WHERE rowid = %s', [[row[0]] for row in values]
+            )
+        cursor.executemany(
+            f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', values
+        )
+
+
+def remove_from_search_index(model, pks, using=DEFAULT_DB_ALIAS):
+    """Drop deleted rows from the FTS5 table (tsvector columns go with their row)."""
+    pks = list(pks)
+    if pks and is_searchable(model) and uses_fts5(using):
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {fts_table(model)} WHERE rowid = %s', [[pk] for pk in pks]
+            )
+
+
+def rebuild_search_index(model, batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """Rebuild the whole index of ``model`` in batches; returns the row count."""
+    if not is_searchable(model):
+        return 0
+    if uses_fts5(using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {fts_table(model)}')
+
+    fields = [field for field, _, _ in search_fields(model)]
+    total = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            model.objects.using(using).filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return total
+        queryset = model.objects.using(using).filter(pk__in=pks)
+        if uses_postgres(using):
+            queryset.update(search_vector=search_vector(model))
+        elif uses_fts5(using):
+            write_fts5_rows(model, queryset.values_list('pk', *fields), using)
+        total += len(pks)
+        last_pk = pks[-1]
+
+
+def fts5_query(query):
+    """Quote every term so user input can never be parsed as FTS5 syntax."""
+    terms = re.findall(r'\w+', query)
+    return ' '.join('"{}"'.format(term) for term in terms)
+
+
+def search_queryset(queryset, query):
+    """
+    Filter ``queryset`` to rows matching ``query``, annotated with ``search_rank``.
+
+    Higher ranks are better matches on every backend.
+    """
+    model = queryset.model
+    using = queryset.db
+    if uses_postgres(using):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = (
+            SearchQuery(query, config=ENGLISH, search_type='websearch')
+            | SearchQuery(query, config=ARABIC, search_type='websearch')
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query)
+        )
+
+    no_rank = Value(0.0, output_field=FloatField())
+    if uses_fts5(using):
+        match = fts5_query(query)
+        if not match:
+            return queryset.annotate(search_rank=no_rank).none()
+        weights = ', '.join(str(FTS5_WEIGHTS[weight]) for _, _, weight in search_fields(model))
+        table = fts_table(model)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({table}, {weights}) AS rank FROM {table} '
+                f'WHERE {table} MATCH %s ORDER BY rank LIMIT {FTS5_MAX_RESULTS}',
+                [match],
+            )
+            ranks = cursor.fetchall()
+        if not ranks:
+            return queryset.annotate(search_rank=no_rank).none()
+        # bm25() is lower-is-better; flip it so both backends sort descending.
+        return queryset.filter(pk__in=[pk for pk, _ in ranks]).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(-rank)) for pk, rank in ranks],
+                output_field=FloatField(),
+            )
+        )
+
+    field = search_fields(model)[0][0]
+    return queryset.filter(**{f'{field}__icontains': query}).annotate(search_rank=no_rank)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ``?search=`` backed by the full-text index, ordered by relevance.
+
+    Must come after ``OrderingFilter`` in ``filter_backends``: an explicit
+    ``?ordering=`` wins, otherwise results are ranked with the view's default
+    ordering as a tiebreaker.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        queryset = search_queryset(queryset, query)
+        if request.query_params.get('ordering'):
+            return queryset
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.order_by('-search_rank', *ordering)
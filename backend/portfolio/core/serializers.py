@@ -1,39 +1,58 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils.text import get_valid_filename
 from rest_framework import serializers
-from .models import File, Project, JournalEntry, Service
+from .fieldsets import SparseFieldsMixin
+from .images import build_srcset
+from .models import File, Project, JournalEntry, Service, UploadSession
+
+# Pre-rendered JSON columns (see `core/snapshots.py`), never part of the API.
+SNAPSHOT_FIELDS = ['list_snapshot', 'detail_snapshot']
 
-class FileSerializer(serializers.ModelSerializer):
+class FileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for the File model."""
+    srcset = serializers.SerializerMethodField()
+    # Columns get_srcset reads, for list rows built from values() (see `core/rows.py`).
+    row_sources = {'srcset': ['variants']}
+
     class Meta:
         model = File
-        fields = '__all__'
+        exclude = ['variants']
+
+    def get_srcset(self, obj):
+        """Resized variants per format, ready for `<source srcset>`."""
+        return build_srcset(obj.variants, self.context.get('request'))
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for the Project model."""
     main_image = FileSerializer(read_only=True)
     gallery_images = FileSerializer(many=True, read_only=True)
 
     class Meta:
         model = Project
-        fields = '__all__'
+        exclude = ['search_vector', *SNAPSHOT_FIELDS]
 
-class JournalEntrySerializer(serializers.ModelSerializer):
+class JournalEntrySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for the JournalEntry model."""
     featured_image = FileSerializer(read_only=True)
 
     class Meta:
         model = JournalEntry
-        fields = '__all__'
+        exclude = ['search_vector', *SNAPSHOT_FIELDS]
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for the Service model."""
     featured_image = FileSerializer(read_only=True)
 
     class Meta:
         model = Service
-        fields = '__all__'
+        exclude = SNAPSHOT_FIELDS
 
 # Serializers for list views (with fewer fields for better performance)
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for listing projects with minimal fields."""
     main_image = FileSerializer(read_only=True)
 
@@ -45,7 +64,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'tech_stack', 'tags', 'category', 'year'
         ]
 
-class JournalEntryListSerializer(serializers.ModelSerializer):
+class JournalEntryListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for listing journal entries with minimal fields."""
     featured_image = FileSerializer(read_only=True)
 
@@ -56,7 +75,7 @@ class JournalEntryListSerializer(serializers.ModelSerializer):
             'publication_date', 'featured_image', 'tags', 'tags_ar', 'language'
         ]
 
-class ServiceListSerializer(serializers.ModelSerializer):
+class ServiceListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for listing services with minimal fields."""
     featured_image = FileSerializer(read_only=True)
 
@@ -66,3 +85,37 @@ class ServiceListSerializer(serializers.ModelSerializer):
             'id', 'title', 'title_ar', 'slug', 'description_rich_text', 'description_rich_text_ar', 
             'icon_svg', 'status', 'featured_image'
         ]
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable upload sessions."""
+    offset = serializers.IntegerField(source='received', read_only=True)
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'filename', 'content_type', 'size', 'sha256', 'title', 'description',
+            'offset', 'chunk_size', 'status', 'file', 'created_at'
+        ]
+        read_only_fields = ['status', 'file', 'created_at']
+
+    def get_chunk_size(self, obj):
+        return getattr(settings, 'UPLOAD_CHUNK_SIZE', 8 * 1024 ** 2)
+
+    def validate_filename(self, value):
+        try:
+            return get_valid_filename(os.path.basename(value))
+        except SuspiciousFileOperation:
+            raise serializers.ValidationError('Invalid file name.')
+
+    def validate_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Size must be positive.')
+        if value > getattr(settings, 'UPLOAD_SESSION_MAX_SIZE', 2 * 1024 ** 3):
+            raise serializers.ValidationError('File is too large.')
+        return value
+
+    def validate_sha256(self, value):
+        if value and not re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raise serializers.ValidationError('Expected a hex SHA-256 digest.')
+        return value.lower() if value else value
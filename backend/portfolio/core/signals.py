@@ -0,0 +1,127 @@
+"""Signal receivers that keep derived data in sync with the core models."""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import response_cache
+from .images import delete_variants, process_on_commit
+from .models import File, JournalEntry, Project, Service
+from .search import remove_from_search_index, update_search_index
+from .snapshots import file_dependents, update_file_dependents, update_snapshots
+from .static_api import schedule_export
+from .tags import sync_tags
+
+
+@receiver(post_save, sender=File)
+@receiver(post_delete, sender=File)
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_delete, sender=JournalEntry)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def bump_cache_generation(sender, using, **kwargs):
+    """Invalidate cached responses built from the changed model, once the change is visible."""
+    # Bumping inside the transaction would let a concurrent read cache the old
+    # rows under the new generation.
+    transaction.on_commit(lambda: response_cache.bump(sender), using=using)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_delete, sender=JournalEntry)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def export_static_api(sender, instance, using, **kwargs):
+    """Re-export the static API files of the changed row, if enabled."""
+    schedule_export({sender: [instance.pk]}, using=using)
+
+
+@receiver(m2m_changed, sender=Project.gallery_images.through)
+def bump_gallery_generation(sender, action, **kwargs):
+    """Gallery edits do not touch the project row, so bump explicitly."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(lambda: response_cache.bump(Project), using=kwargs['using'])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=JournalEntry)
+def index_for_search(sender, instance, using, **kwargs):
+    """Refresh the full-text document of the saved row."""
+    update_search_index(sender, [instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=JournalEntry)
+def unindex_for_search(sender, instance, using, **kwargs):
+    remove_from_search_index(sender, [instance.pk], using=using)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=JournalEntry)
+def sync_tag_links(sender, instance, using, **kwargs):
+    """Mirror the JSON tag fields into the indexed tag tables."""
+    sync_tags(sender, [instance], using=using)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=JournalEntry)
+@receiver(post_save, sender=Service)
+def render_snapshots(sender, instance, using, **kwargs):
+    """Re-render the stored JSON of the saved row."""
+    update_snapshots(sender, [instance.pk], using=using)
+
+
+@receiver(m2m_changed, sender=Project.gallery_images.through)
+def render_gallery_snapshots(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """Re-render and re-export the projects whose gallery changed, from either side of the relation."""
+    if not reverse:
+        pks = [instance.pk] if action in ('post_add', 'post_remove', 'post_clear') else []
+    elif action == 'pre_clear':
+        # The links are gone by post_clear, so note the projects now.
+        instance._gallery_projects = list(instance.project_gallery_images.values_list('pk', flat=True))
+        return
+    elif action in ('post_add', 'post_remove'):
+        pks = pk_set
+    elif action == 'post_clear':
+        pks = instance.__dict__.pop('_gallery_projects', [])
+    else:
+        return
+    if pks:
+        update_snapshots(Project, pks, using=using)
+        schedule_export({Project: pks}, using=using)
+
+
+@receiver(post_save, sender=File)
+def render_file_dependents(sender, instance, using, created, **kwargs):
+    """Re-render and re-export the rows that embed the edited file."""
+    if not created:
+        update_file_dependents(file_dependents([instance.pk], using=using), using=using)
+        schedule_export({File: [instance.pk]}, using=using)
+
+
+@receiver(pre_delete, sender=File)
+def note_file_dependents(sender, instance, using, **kwargs):
+    # Deleting nulls the references and gallery links without signals.
+    instance._snapshot_dependents = file_dependents([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=File)
+def render_former_file_dependents(sender, instance, using, **kwargs):
+    dependents = instance.__dict__.pop('_snapshot_dependents', {})
+    update_file_dependents(dependents, using=using)
+    schedule_export(dependents, using=using)
+
+
+@receiver(post_save, sender=File)
+def process_upload(sender, instance, using, **kwargs):
+    """Generate resized variants of new or replaced uploads."""
+    process_on_commit(instance, using)
+
+
+@receiver(post_delete, sender=File)
+def delete_upload_variants(sender, instance, using, **kwargs):
+    variants = instance.variants
+    transaction.on_commit(lambda: delete_variants(variants), using=using)
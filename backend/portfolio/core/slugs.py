@@ -0,0 +1,134 @@
+"""
+Unique slug allocation for projects, journal entries and services.
+
+Free slugs are found with one indexed ``slug LIKE 'base%'`` query instead of
+probing ``base-1``, ``base-2``, ... one ``exists()`` at a time. The unique
+constraint stays the final arbiter: a save that loses a race with a
+concurrent create gets an ``IntegrityError`` inside a savepoint and retries
+with the next free suffix.
+"""
+
+import hashlib
+import re
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, router, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+SAVE_ATTEMPTS = 5
+
+# Room kept at the end of the column for a ``-<n>`` suffix.
+SUFFIX_LENGTH = 8
+
+# Hex digits of the title hash used when a title has no Latin spelling.
+HASH_LENGTH = 8
+
+# Bases looked up per query when allocating slugs in bulk.
+BULK_LOOKUP_SIZE = 100
+
+ARABIC_TRANSLITERATION = str.maketrans({
+    'ا': 'a', 'أ': 'a', 'إ': 'i', 'آ': 'a', 'ٱ': 'a', 'ء': '', 'ؤ': 'u', 'ئ': 'i',
+    'ب': 'b', 'ت': 't', 'ث': 'th', 'ج': 'j', 'ح': 'h', 'خ': 'kh', 'د': 'd',
+    'ذ': 'dh', 'ر': 'r', 'ز': 'z', 'س': 's', 'ش': 'sh', 'ص': 's', 'ض': 'd',
+    'ط': 't', 'ظ': 'z', 'ع': 'a', 'غ': 'gh', 'ف': 'f', 'ق': 'q', 'ك': 'k',
+    'ل': 'l', 'م': 'm', 'ن': 'n', 'ه': 'h', 'ة': 'a', 'و': 'w', 'ي': 'y',
+    'ى': 'a', 'پ': 'p', 'چ': 'ch', 'گ': 'g', 'ڤ': 'v', 'ـ': '',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+})
+
+# Harakat and other combining marks carry no letters of their own.
+ARABIC_MARKS = re.compile('[\u064b-\u065f\u0670\u06d6-\u06ed]')
+
+
+def transliterate(text):
+    """Spell Arabic letters in Latin so ``slugify()`` has something to keep."""
+    return ARABIC_MARKS.sub('', text).translate(ARABIC_TRANSLITERATION)
+
+
+def base_slug(model, text):
+    """
+    Return the slug ``text`` would get before de-duplication.
+
+    Falls back to a transliteration for Arabic titles. When nothing Latin is
+    left (e.g. CJK titles) the model name plus a hash of the title is used,
+    so such titles do not all share one base and one ever longer
+    ``LIKE 'base-%'`` lookup.
+    """
+    max_length = model._meta.get_field('slug').max_length - SUFFIX_LENGTH
+    text = text or ''
+    slug = slugify(text) or slugify(transliterate(text))
+    if not slug and text.strip():
+        digest = hashlib.sha1(text.strip().encode()).hexdigest()[:HASH_LENGTH]
+        slug = f'{model._meta.model_name}-{digest}'
+    return slug[:max_length].strip('-') or model._meta.model_name
+
+
+def first_free(base, taken):
+    """Return ``base`` or the first ``base-<n>`` not in ``taken``."""
+    if base not in taken:
+        return base
+    counter = 1
+    while f'{base}-{counter}' in taken:
+        counter += 1
+    return f'{base}-{counter}'
+
+
+def slug_lookup(base):
+    return Q(slug=base) | Q(slug__startswith=f'{base}-')
+
+
+def allocate_slug(model, text, using=DEFAULT_DB_ALIAS):
+    """Return a slug for ``text`` that is free in ``model``, with one query."""
+    base = base_slug(model, text)
+    taken = set(
+        model._default_manager.using(using).filter(slug_lookup(base)).values_list('slug', flat=True)
+    )
+    return first_free(base, taken)
+
+
+def allocate_slugs(model, instances, source='title', using=DEFAULT_DB_ALIAS):
+    """
+    Fill the empty slugs of ``instances`` for a later ``bulk_create``.
+
+    Runs one query per ``BULK_LOOKUP_SIZE`` distinct bases and also keeps the
+    new slugs apart from each other. Concurrent writers are still caught by
+    the unique constraint when the batch is inserted.
+    """
+    pending = [(instance, base_slug(model, getattr(instance, source))) for instance in instances if not instance.slug]
+    bases = sorted({base for _, base in pending})
+    taken = {instance.slug for instance in instances if instance.slug}
+    for start in range(0, len(bases), BULK_LOOKUP_SIZE):
+        lookup = Q()
+        for base in bases[start:start + BULK_LOOKUP_SIZE]:
+            lookup |= slug_lookup(base)
+        taken.update(model._default_manager.using(using).filter(lookup).values_list('slug', flat=True))
+
+    for instance, base in pending:
+        instance.slug = first_free(base, taken)
+        taken.add(instance.slug)
+    return instances
+
+
+def save_with_unique_slug(instance, save, *args, source='title', **kwargs):
+    """
+    Call ``save`` after giving ``instance`` a free slug, if it has none.
+
+    The insert runs in a savepoint; if another request took the same slug in
+    the meantime, the next free one is allocated and the save retried.
+    """
+    if instance.slug:
+        return save(*args, **kwargs)
+
+    model = type(instance)
+    using = kwargs.get('using') or router.db_for_write(model, instance=instance)
+    for attempt in range(SAVE_ATTEMPTS):
+        instance.slug = allocate_slug(model, getattr(instance, source), using=using)
+        try:
+            with transaction.atomic(using=using):
+                return save(*args, **kwargs)
+        except IntegrityError:
+            taken = model._default_manager.using(using).filter(slug=instance.slug).exists()
+            instance.slug = ''
+            if not taken or attempt == SAVE_ATTEMPTS - 1:
+                raise
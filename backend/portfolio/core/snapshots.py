@@ -0,0 +1,127 @@
+"""
+Pre-rendered JSON snapshots of projects, journal entries and services.
+
+Each row keeps its list item (``list_snapshot``) and its detail body
+(``detail_snapshot``) as rendered by the list/detail serializers without a
+request, i.e. exactly what ``published`` and ``by_slug`` return. Those actions
+then read one text column per row and embed it as ``RawJSON`` (see
+``renderers.py``), with no joins to ``File`` and no serializer work.
+
+Snapshots are rewritten in the writer's transaction by the signal receivers
+in ``signals.py``: on save, on gallery changes and on edits to (or deletion
+of) a referenced ``File``. Paths that bypass signals -- ``update()``, bulk
+imports, the image-variant worker -- call ``refresh_snapshots`` themselves, and
+``manage.py rebuild_snapshots`` rewrites every row. A missing snapshot (rows
+from before the column existed) makes the endpoint fall back to serializing,
+so responses never depend on the rebuild having run.
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .renderers import ORJSONRenderer, RawJSON
+
+
+def snapshot_serializers(model):
+    """Return ``(list serializer, detail serializer)`` of a snapshotted model."""
+    from .serializers import (
+        JournalEntryListSerializer, JournalEntrySerializer,
+        ProjectListSerializer, ProjectSerializer,
+        ServiceListSerializer, ServiceSerializer,
+    )
+
+    return {
+        'core.project': (ProjectListSerializer, ProjectSerializer),
+        'core.journalentry': (JournalEntryListSerializer, JournalEntrySerializer),
+        'core.service': (ServiceListSerializer, ServiceSerializer),
+    }[model._meta.label_lower]
+
+
+def snapshots_enabled():
+    return getattr(settings, 'SNAPSHOTS_ENABLED', True)
+
+
+def update_snapshots(model, pks, using=DEFAULT_DB_ALIAS):
+    """Re-render the snapshots of the given rows."""
+    from .fieldsets import shape_queryset
+
+    pks = list(pks)
+    if not pks:
+        return
+    list_class, detail_class = snapshot_serializers(model)
+    # The detail serializer renders every column the list one does.
+    queryset = shape_queryset(model.objects.using(using).filter(pk__in=pks), detail_class())
+    renderer = ORJSONRenderer()
+    instances = list(queryset)
+    # One serializer per class, so fields are built once per batch, not per row.
+    rendered = zip(instances, list_class(instances, many=True).data, detail_class(instances, many=True).data)
+    for instance, list_data, detail_data in rendered:
+        instance.list_snapshot = renderer.render(list_data).decode()
+        instance.detail_snapshot = renderer.render(detail_data).decode()
+    model.objects.using(using).bulk_update(instances, ['list_snapshot', 'detail_snapshot'])
+
+
+def rebuild_snapshots(model, batch_size=500, using=DEFAULT_DB_ALIAS):
+    """Rewrite the snapshots of every row of ``model`` in batches; returns the row count."""
+    total = 0
+    last_pk = 0
+    while True:
+        pks = list(
+            model.objects.using(using).filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return total
+        update_snapshots(model, pks, using)
+        total += len(pks)
+        last_pk = pks[-1]
+
+
+def file_dependents(file_pks, using=DEFAULT_DB_ALIAS):
+    """Return ``{model: pks}`` of the rows whose snapshots embed the given files."""
+    from .models import JournalEntry, Project, Service
+
+    file_pks = list(file_pks)
+    projects = Project.objects.using(using)
+    return {
+        Project: set(projects.filter(main_image__in=file_pks).values_list('pk', flat=True))
+        | set(projects.filter(gallery_images__in=file_pks).values_list('pk', flat=True)),
+        JournalEntry: set(
+            JournalEntry.objects.using(using).filter(featured_image__in=file_pks).values_list('pk', flat=True)
+        ),
+        Service: set(Service.objects.using(using).filter(featured_image__in=file_pks).values_list('pk', flat=True)),
+    }
+
+
+def update_file_dependents(dependents, using=DEFAULT_DB_ALIAS):
+    for model, pks in dependents.items():
+        update_snapshots(model, pks, using)
+
+
+def refresh_snapshots(model, pks, using=DEFAULT_DB_ALIAS):
+    """Update every snapshot that renders the given rows of ``model`` (any core model)."""
+    from .models import File, SnapshotModel
+
+    if model is File:
+        update_file_dependents(file_dependents(pks, using), using)
+    elif issubclass(model, SnapshotModel):
+        update_snapshots(model, pks, using)
+
+
+def snapshot_values(queryset, column):
+    """``values()`` rows of ``column``, with the columns keyset pagination reads."""
+    from .rows import ordering_columns
+
+    return queryset.prefetch_related(None).values(column, *ordering_columns(queryset))
+
+
+def collect_snapshots(rows, column):
+    """
+    Return the ``column`` snapshots of ``values()`` rows as one ``RawJSON`` array.
+
+    Returns None when a row has none yet, for the caller to serialize instead.
+    """
+    snapshots = [row[column] for row in rows]
+    if None in snapshots:
+        return None
+    return RawJSON.array(snapshots)
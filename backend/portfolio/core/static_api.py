@@ -0,0 +1,425 @@
+"""
+Export of the public API responses to files that nginx serves directly.
+
+Every anonymous read the site makes -- the ``published`` pages of projects
+and journal entries for each filter value, the services list, ``by_slug``
+for every slug and the homepage bundle -- is rendered through the real view
+and written under ``STATIC_API_ROOT`` with its gzip and Brotli variants::
+
+    api/projects/published/index.json             /api/projects/published/
+    api/projects/published/page=2&tag=web.json    ...?page=2&tag=web
+    api/projects/by_slug/slug=my-project.json     ...?slug=my-project
+
+File names are the query strings the frontend sends (``src/lib/api.ts``),
+encoded like ``encodeURIComponent``; nginx maps ``$args`` onto them with
+``try_files`` and falls back to Django for anything else (see nginx.conf).
+
+Exports are incremental. ``manifest.json`` records the SHA-256 of every
+file, so a rebuild only rewrites the files whose body changed and removes
+those that are no longer produced (unpublished rows, emptied pages). With
+``STATIC_API_EXPORT_ON_SAVE`` the rows a transaction changed are exported
+again once it commits, on a background thread of the process. That covers
+their ``by_slug`` files, the lists they appear on and the homepage bundle.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from .cache import bypass_cache
+from .compression import compress_all
+from .tags import clean_names
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('projects', 'journal-entries', 'services', 'home')
+
+# The list and ``by_slug`` views of each section with rows.
+SECTION_VIEWS = {
+    'projects': ('project-published', 'project-by-slug'),
+    'journal-entries': ('journalentry-published', 'journalentry-by-slug'),
+    'services': ('service-published', 'service-by-slug'),
+}
+
+# ``(param, field)`` filters the frontend pages lists by. Arabic journal tags
+# go through the same ``?tag=`` filter.
+LIST_FILTERS = {
+    'projects': [('tech_stack', 'tech_stack'), ('tag', 'tags'), ('category', 'category')],
+    'journal-entries': [('tag', 'tags'), ('tag', 'tags_ar')],
+    'services': [],
+}
+
+ENCODING_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+# Characters encodeURIComponent leaves as they are.
+URI_COMPONENT_SAFE = "-_.!~*'()"
+
+# Longer names (very long slugs) are left to Django.
+MAX_NAME_LENGTH = 240
+
+
+def export_root():
+    return Path(getattr(settings, 'STATIC_API_ROOT', settings.BASE_DIR / 'static_api'))
+
+
+def export_on_save():
+    return getattr(settings, 'STATIC_API_EXPORT_ON_SAVE', False)
+
+
+def encode_query(params):
+    """``[('tag', 'C# & .NET')]`` -> ``'tag=C%23%20%26%20.NET'``, as ``encodeURIComponent`` would."""
+    return '&'.join(f'{name}={quote(str(value), safe=URI_COMPONENT_SAFE)}' for name, value in params)
+
+
+def section_model(section):
+    from .models import JournalEntry, Project, Service
+
+    return {'projects': Project, 'journal-entries': JournalEntry, 'services': Service}[section]
+
+
+def published_rows(section, pks=None):
+    """Yield ``values()`` dicts of the published rows of ``section``: pk, slug and the filtered fields."""
+    rows = section_model(section).objects.filter(status='published')
+    if pks is not None:
+        rows = rows.filter(pk__in=pks)
+    fields = [field for _, field in LIST_FILTERS[section]]
+    return rows.order_by('pk').values('pk', 'slug', *fields).iterator()
+
+
+def row_filters(section, row):
+    """Return the sorted ``(param, value)`` list filters a row from ``published_rows`` appears under."""
+    filters = set()
+    for param, field in LIST_FILTERS[section]:
+        value = row[field]
+        filters.update((param, name) for name in clean_names(value if isinstance(value, list) else [value]))
+    return sorted(filters)
+
+
+class Exporter:
+    """Render the public endpoints through their views and write them to ``root``."""
+
+    def __init__(self, root=None, base_url=None):
+        self.root = Path(root) if root is not None else export_root()
+        base_url = urlsplit(base_url or getattr(settings, 'STATIC_API_BASE_URL', 'http://localhost'))
+        # Pagination links are absolute, built from the host the site is served on.
+        self.factory = RequestFactory(
+            HTTP_HOST=base_url.netloc, HTTP_ACCEPT='application/json',
+            **{'wsgi.url_scheme': base_url.scheme},
+        )
+
+    def render(self, path, query=''):
+        """
+        Return the body the view answers ``path?query`` with, or None when it is not a 200.
+
+        The response cache is bypassed: while a public request holds an
+        entry's rebuild lock it would hand back the stale body.
+        """
+        request = self.factory.get(f'{path}?{query}' if query else path)
+        match = resolve(path)
+        with bypass_cache():
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response.content if response.status_code == 200 else None
+
+    def pages(self, path, filters=()):
+        """Yield ``(query, body, meta)`` for every page of a paginated list, unfiltered and per filter."""
+        for item in [None, *filters]:
+            params = [item] if item else []
+            meta = {'filter': list(item) if item else None}
+            if not params:
+                body = self.render(path)
+                if body is not None:
+                    yield '', body, meta
+            page = 1
+            while True:
+                query = encode_query([('page', page), *params])
+                body = self.render(path, query)
+                if body is None:
+                    break
+                yield query, body, meta
+                if json.loads(body).get('next') is None:
+                    break
+                page += 1
+
+    def section(self, name, rows=None, filters=None):
+        """
+        Yield ``(path, query, body, meta)`` for the responses of one section.
+
+        By default that is all of them. ``rows`` (from ``published_rows``)
+        limits ``by_slug`` to those rows and ``filters`` limits the lists to
+        the unfiltered pages and those filters. ``meta`` goes into the
+        manifest, where ``export_rows`` finds what a row was exported under.
+        """
+        if name == 'home':
+            home = reverse('home')
+            body = self.render(home)
+            if body is not None:
+                yield home, '', body, {}
+            return
+
+        published, by_slug = (reverse(view) for view in SECTION_VIEWS[name])
+        if filters is None:
+            filters = sorted({item for row in published_rows(name) for item in row_filters(name, row)})
+        if LIST_FILTERS[name]:
+            yield from ((published, query, body, meta) for query, body, meta in self.pages(published, filters))
+        else:
+            # The services list is neither paginated nor filtered.
+            body = self.render(published)
+            if body is not None:
+                yield published, '', body, {'filter': None}
+        for row in published_rows(name) if rows is None else rows:
+            query = encode_query([('slug', row['slug'])])
+            body = self.render(by_slug, query)
+            if body is not None:
+                meta = {'pk': row['pk'], 'filters': [list(item) for item in row_filters(name, row)]}
+                yield by_slug, query, body, meta
+
+    def file_name(self, path, query):
+        """Return the file, relative to ``root``, nginx looks up for ``path?query``."""
+        name = f'{query or "index"}.json'
+        if len(name) > MAX_NAME_LENGTH:
+            return None
+        return f'{path.strip("/")}/{name}'
+
+    def export(self, sections=SECTIONS):
+        """Re-export ``sections``; returns ``{'written': n, 'unchanged': n, 'removed': n}``."""
+        with self.locked() as (manifest, stats):
+            for section in sections:
+                self.update(manifest, stats, section, self.section(section), lambda entry: True)
+        return stats
+
+    def export_rows(self, changes):
+        """
+        Re-export what changes to some rows affect; returns stats like ``export``.
+
+        ``changes`` is ``{model: pks}``, where files stand for the rows that
+        embed them. A row's ``by_slug`` file is rewritten, or removed once it
+        is unpublished or renamed. Every page of each list the row is in, or
+        was in before the change, is rendered again, since counts and
+        positions shift across pages. The homepage bundle is re-rendered too.
+        Drafts that were never exported cost nothing.
+        """
+        from .models import File
+        from .snapshots import file_dependents
+
+        changes = {model: set(pks) for model, pks in changes.items()}
+        files = changes.pop(File, None)
+        if files:
+            for model, pks in file_dependents(files).items():
+                changes.setdefault(model, set()).update(pks)
+
+        with self.locked() as (manifest, stats):
+            changed = False
+            for section in SECTION_VIEWS:
+                pks = changes.get(section_model(section))
+                if not pks:
+                    continue
+                previous = [
+                    entry for entry in manifest.values() if entry['section'] == section and entry.get('pk') in pks
+                ]
+                rows = list(published_rows(section, pks))
+                if not rows and not previous:
+                    continue
+                changed = True
+                filters = {tuple(item) for entry in previous for item in entry.get('filters', ())}
+                filters.update(item for row in rows for item in row_filters(section, row))
+
+                def in_scope(entry, pks=pks, filters=filters):
+                    if 'filter' in entry:
+                        return entry['filter'] is None or tuple(entry['filter']) in filters
+                    return entry.get('pk') in pks
+
+                self.update(manifest, stats, section, self.section(section, rows, sorted(filters)), in_scope)
+            if changed:
+                self.update(manifest, stats, 'home', self.section('home'), lambda entry: True)
+        return stats
+
+    @contextmanager
+    def locked(self):
+        """
+        Yield the manifest and a stats dict, then save the manifest.
+
+        Holds an exclusive lock on the export directory, so concurrent
+        exports (several workers saving at once) run one after the other.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            manifest = self.read_manifest()
+            yield manifest, {'written': 0, 'unchanged': 0, 'removed': 0}
+            self.write_file(self.root / 'manifest.json', json.dumps(manifest, indent=1, sort_keys=True).encode())
+
+    def update(self, manifest, stats, section, responses, in_scope):
+        """
+        Write the ``responses`` of ``section`` whose body changed, then remove
+        the files of ``section`` selected by ``in_scope(entry)`` that were not
+        produced.
+        """
+        produced = set()
+        for path, query, body, meta in responses:
+            name = self.file_name(path, query)
+            if name is None:
+                continue
+            produced.add(name)
+            digest = hashlib.sha256(body).hexdigest()
+            entry = manifest.get(name)
+            if entry and entry['sha256'] == digest and (self.root / name).exists():
+                stats['unchanged'] += 1
+            else:
+                self.write(name, body)
+                stats['written'] += 1
+            manifest[name] = {'section': section, 'sha256': digest, **meta}
+        for name, entry in list(manifest.items()):
+            if entry['section'] == section and name not in produced and in_scope(entry):
+                self.remove(name)
+                del manifest[name]
+                stats['removed'] += 1
+
+    def read_manifest(self):
+        try:
+            return json.loads((self.root / 'manifest.json').read_bytes())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def write(self, name, body):
+        """Write a body and its compressed variants; stale variants are removed."""
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        encoded = compress_all(body)
+        # Variants first: nginx must never pair a new body with an old variant
+        # for long, and a missing variant just falls back to the plain file.
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            variant = path.with_name(path.name + suffix)
+            if encoding in encoded:
+                self.write_file(variant, encoded[encoding])
+            else:
+                variant.unlink(missing_ok=True)
+        self.write_file(path, body)
+
+    def write_file(self, path, content):
+        """Replace ``path`` atomically, so nginx never reads a partial file."""
+        fd, temporary = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as stream:
+                stream.write(content)
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def remove(self, name):
+        path = self.root / name
+        path.unlink(missing_ok=True)
+        for suffix in ENCODING_SUFFIXES.values():
+            path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def export_in_background():
+    return getattr(settings, 'STATIC_API_EXPORT_IN_BACKGROUND', True)
+
+
+def merge_changes(target, changes):
+    for model, pks in changes.items():
+        target.setdefault(model, set()).update(pks)
+
+
+def export_changes(changes):
+    """Run ``Exporter.export_rows``; failures are logged, never raised, as saves have committed."""
+    try:
+        Exporter().export_rows(changes)
+    except Exception:
+        logger.exception('Exporting the static API failed')
+
+
+class ExportQueue:
+    """
+    Changes waiting for this process's export thread.
+
+    Changes queued while an export runs are merged and exported together
+    after it. A burst of commits therefore costs one or two exports, not one
+    per commit.
+    """
+
+    def __init__(self):
+        self._changes = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, changes):
+        with self._lock:
+            merge_changes(self._changes, changes)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name='static-api-export', daemon=True)
+                self._thread.start()
+
+    def run(self):
+        try:
+            while True:
+                with self._lock:
+                    changes, self._changes = self._changes, {}
+                    if not changes:
+                        self._thread = None
+                        return
+                export_changes(changes)
+        finally:
+            connections.close_all()
+
+
+export_queue = ExportQueue()
+
+# Changes not yet handed to an export, per thread and database alias.
+_pending = threading.local()
+
+
+def flush_export(using):
+    changes = _pending.__dict__.pop(using, None)
+    if not changes:
+        return
+    if export_in_background():
+        export_queue.add(changes)
+    else:
+        export_changes(changes)
+
+
+def export_after_bulk_change(stdout):
+    """
+    With ``STATIC_API_EXPORT_ON_SAVE``, re-export everything, inline, and report to ``stdout``.
+
+    For the commands that write rows in bulk (``import_content``,
+    ``generate_dataset``, ``rebuild_snapshots``). One full pass costs less
+    than exporting every batch, and an export thread would die with the
+    command.
+    """
+    if not export_on_save():
+        return
+    stats = Exporter().export()
+    stdout.write(f"Static API: wrote {stats['written']} files, kept {stats['unchanged']}, removed {stats['removed']}")
+
+
+def schedule_export(changes, using=DEFAULT_DB_ALIAS):
+    """
+    With ``STATIC_API_EXPORT_ON_SAVE``, export ``changes`` (``{model: pks}``) once they commit.
+
+    Changes collect per thread until a commit. The first commit callback
+    takes all of them, so a transaction that saves many rows runs one
+    export. Changes left over from a rolled-back transaction go out with the
+    next commit; exporting them rewrites nothing.
+    """
+    if not export_on_save() or not any(changes.values()):
+        return
+    merge_changes(_pending.__dict__.setdefault(using, {}), changes)
+    transaction.on_commit(lambda: flush_export(using), using=using)
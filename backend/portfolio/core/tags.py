@@ -0,0 +1,113 @@
+"""
+Keep the indexed tag tables in sync with the JSON tag fields.
+
+``Project.tags`` / ``Project.tech_stack`` and ``JournalEntry.tags`` /
+``JournalEntry.tags_ar`` stay the source of truth (they are what the API
+returns). ``ProjectTag`` and ``JournalEntryTag`` mirror them so that ``?tag=``
+and ``?tech_stack=`` become index lookups instead of JSON scans, which also
+work on SQLite where ``__contains`` on a JSONField is unsupported.
+"""
+
+from django.db import DEFAULT_DB_ALIAS
+
+# model label -> (through model name, owner FK, discriminator field,
+#                 {discriminator value: JSON field})
+TAG_SOURCES = {
+    'core.project': ('ProjectTag', 'project', 'kind', {'tag': 'tags', 'tech': 'tech_stack'}),
+    'core.journalentry': ('JournalEntryTag', 'entry', 'language', {'en': 'tags', 'ar': 'tags_ar'}),
+}
+
+
+def clean_names(values):
+    """Return the distinct, non-empty tag names of a JSON tag list."""
+    if not isinstance(values, (list, tuple)):
+        return []
+    names = []
+    for value in values:
+        if value is None:
+            continue
+        name = str(value).strip()[:255]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def get_tag_ids(names, using=DEFAULT_DB_ALIAS):
+    """Return ``{name: id}`` for ``names``, creating the missing tags."""
+    from .models import Tag
+
+    names = set(names)
+    if not names:
+        return {}
+    existing = dict(Tag.objects.using(using).filter(name__in=names).values_list('name', 'id'))
+    missing = names - existing.keys()
+    if missing:
+        Tag.objects.using(using).bulk_create(
+            [Tag(name=name) for name in missing], ignore_conflicts=True
+        )
+        existing.update(
+            Tag.objects.using(using).filter(name__in=missing).values_list('name', 'id')
+        )
+    return existing
+
+
+def sync_tags(model, instances, using=DEFAULT_DB_ALIAS):
+    """
+    Bring the tag links of ``instances`` in line with their JSON fields.
+
+    Works on any number of rows with a constant number of queries, so bulk
+    import paths can call it once per batch.
+    """
+    from django.apps import apps
+
+    source = TAG_SOURCES.get(model._meta.label_lower)
+    instances = [instance for instance in instances if instance.pk is not None]
+    if source is None or not instances:
+        return
+    through_name, owner, discriminator, fields = source
+    through = apps.get_model('core', through_name)
+
+    wanted = set()
+    for instance in instances:
+        for value, field in fields.items():
+            for name in clean_names(getattr(instance, field)):
+                wanted.add((instance.pk, name, value))
+
+    owner_ids = [instance.pk for instance in instances]
+    current = {
+        (owner_id, name, value): link_id
+        for link_id, owner_id, name, value in through.objects.using(using)
+        .filter(**{f'{owner}_id__in': owner_ids})
+        .values_list('id', f'{owner}_id', 'tag__name', discriminator)
+    }
+
+    stale = [link_id for key, link_id in current.items() if key not in wanted]
+    if stale:
+        through.objects.using(using).filter(id__in=stale).delete()
+
+    missing = wanted - current.keys()
+    if missing:
+        tag_ids = get_tag_ids({name for _, name, _ in missing}, using=using)
+        through.objects.using(using).bulk_create(
+            [
+                through(**{f'{owner}_id': owner_id, 'tag_id': tag_ids[name], discriminator: value})
+                for owner_id, name, value in missing
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def tagged_ids(model, name, values=None):
+    """
+    Return a subquery of ``model`` ids linked to tag ``name``.
+
+    ``values`` restricts the match to some JSON fields, e.g. ``['tech']`` for a
+    project's tech stack.
+    """
+    from django.apps import apps
+
+    through_name, owner, discriminator, _ = TAG_SOURCES[model._meta.label_lower]
+    links = apps.get_model('core', through_name).objects.filter(tag__name=name)
+    if values is not None:
+        links = links.filter(**{f'{discriminator}__in': values})
+    return links.values(f'{owner}_id')
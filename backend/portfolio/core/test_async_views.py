@@ -0,0 +1,74 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import JournalEntry, Project, Service
+
+
+class AsyncReadEndpointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for number in range(8):
+            Project.objects.create(
+                title=f"Async Project {number}",
+                status="published" if number % 4 else "draft",
+                tags=["web"] if number % 2 else ["mobile"],
+            )
+        JournalEntry.objects.create(title="Async Entry", status="published")
+        Service.objects.create(title="Async Service", status="published")
+
+    def tearDown(self):
+        cache.clear()
+
+    def assertSameResponse(self, sync_url, async_url):
+        sync_response = self.client.get(sync_url)
+        async_response = self.client.get(async_url)
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        # Pagination links point back at the endpoint that was called.
+        body = async_response.content.replace(b"/api/async/", b"/api/")
+        self.assertEqual(json.loads(body), sync_response.json())
+        self.assertEqual(async_response.get('ETag'), sync_response.get('ETag'))
+        return async_response
+
+    def test_published_matches_sync_endpoints(self):
+        """Test that async published lists equal the sync ones, filters and pagination included."""
+        for query in ["", "?tag=web", "?page=2&page_size=2", "?cursor=&page_size=2", "?page=9", "?fields=title,main_image.file"]:
+            with self.subTest(query=query):
+                self.assertSameResponse(
+                    reverse('project-published') + query, reverse('async-project-published') + query,
+                )
+        self.assertSameResponse(reverse('journalentry-published'), reverse('async-journalentry-published'))
+        self.assertSameResponse(reverse('service-published'), reverse('async-service-published'))
+
+    def test_detail_and_by_slug_match_sync_endpoints(self):
+        """Test that retrieve and by_slug return the same bodies and errors."""
+        slug = Project.objects.filter(status="published").first().slug
+        self.assertSameResponse(
+            reverse('project-detail', args=[slug]), reverse('async-project-detail', args=[slug]),
+        )
+        for query in [f"?slug={slug}", "?slug=missing", ""]:
+            with self.subTest(query=query):
+                self.assertSameResponse(
+                    reverse('project-by-slug') + query, reverse('async-project-by-slug') + query,
+                )
+
+    def test_published_responses_are_cached(self):
+        """Test that the async published lists use the response cache."""
+        self.client.get(reverse('project-published'))
+        self.assertEqual(self.client.get(reverse('async-project-published'))['X-Cache'], "MISS")
+        self.assertEqual(self.client.get(reverse('async-project-published'))['X-Cache'], "HIT")
+
+    async def test_conditional_get_under_asgi(self):
+        """Test the async handler end to end, including a 304 for a current ETag."""
+        response = await self.async_client.get(reverse('async-journalentry-published'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['title'], "Async Entry")
+
+        response = await self.async_client.get(
+            reverse('async-journalentry-published'), headers={'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,36 @@
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from .bootstrap import bootstrap
+from .models import JournalEntry, Project, Service
+
+
+class BootstrapTest(TestCase):
+    def test_app_ready_does_not_query(self):
+        """Test that loading the app config never touches the database."""
+        with self.assertNumQueries(0):
+            apps.get_app_config('core').ready()
+
+    def test_bootstrap_is_idempotent(self):
+        """Test that a second run finds everything in place and creates nothing."""
+        self.assertEqual(bootstrap(), ['admin user', 'placeholder data'])
+        self.assertTrue(User.objects.get(username='admin').is_superuser)
+        counts = (Project.objects.count(), JournalEntry.objects.count(), Service.objects.count())
+        self.assertEqual(counts, (6, 12, 3))
+
+        self.assertEqual(bootstrap(), [])
+        self.assertEqual(User.objects.filter(username='admin').count(), 1)
+        self.assertEqual(
+            (Project.objects.count(), JournalEntry.objects.count(), Service.objects.count()), counts
+        )
+
+    def test_command_can_skip_steps(self):
+        """Test that placeholders can be left out, e.g. for production."""
+        out = StringIO()
+        call_command('bootstrap', '--skip-placeholders', stdout=out)
+        self.assertIn('admin user', out.getvalue())
+        self.assertFalse(Project.objects.exists())
@@ -0,0 +1,119 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .cache import normalize_query, response_cache
+from .models import File, Project
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class NormalizeQueryTest(TestCase):
+    def test_order_and_unknown_params_are_ignored(self):
+        """Test that equivalent query strings normalize to the same key."""
+        from django.http import QueryDict
+
+        first = normalize_query(QueryDict('tag=web&page=2&utm_source=x'))
+        second = normalize_query(QueryDict('page=2&tag=web&_=123'))
+        self.assertEqual(first, second)
+        self.assertEqual(first, 'page=2&tag=web')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING_WORKERS=0)
+class ResponseCacheTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        response_cache.reset_stats()
+        self.client = APIClient()
+        self.project = Project.objects.create(title="Cached Project", status="published")
+        self.published_url = reverse('project-published')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_second_request_is_a_hit(self):
+        """Test that a repeated request is served from the cache without queries."""
+        first = self.client.get(self.published_url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.published_url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual((second['ETag'], second['Last-Modified']), (first['ETag'], first['Last-Modified']))
+        self.assertEqual(response_cache.stats()['hit'], 1)
+        self.assertEqual(response_cache.stats()['miss'], 1)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(self.published_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], first['ETag'])
+
+    def test_query_params_are_part_of_the_key(self):
+        """Test that different filters do not share a cache entry."""
+        self.client.get(self.published_url)
+        response = self.client.get(f"{self.published_url}?category=web")
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    @override_settings(RESPONSE_CACHE_STALE_TIMEOUT=0)
+    def test_save_invalidates_entries(self):
+        """Test that saving a project bumps the generation and evicts the entry."""
+        self.client.get(self.published_url)
+        self.project.title = "Renamed Project"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+
+        response = self.client.get(self.published_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn(b'Renamed Project', response.content)
+        self.assertEqual(response_cache.stats()['evict'], 1)
+
+    def test_stale_entry_is_served_while_revalidating(self):
+        """Test that only one request rebuilds an outdated entry."""
+        response_cache.store('test.published', 'digest', (1,), b'[]', 'application/json')
+
+        # The first request after a bump takes the rebuild lock...
+        entry, state = response_cache.fetch('test.published', 'digest', (2,))
+        self.assertEqual(state, 'miss')
+        self.assertIsNone(entry)
+
+        # ...while concurrent requests keep getting the old body.
+        entry, state = response_cache.fetch('test.published', 'digest', (2,))
+        self.assertEqual(state, 'stale')
+        self.assertEqual(entry['content'], b'[]')
+
+    def test_gallery_change_invalidates_projects(self):
+        """Test that m2m changes to the gallery bump the project generation."""
+        before = response_cache.get_generations([Project])
+        image = File.objects.create(title="Gallery", file="uploads/gallery.jpg")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.gallery_images.add(image)
+        self.assertNotEqual(response_cache.get_generations([Project]), before)
+
+    def test_generation_is_bumped_on_commit(self):
+        """Test that a read before the writer commits cannot cache old rows under the new generation."""
+        self.client.get(self.published_url)
+        before = response_cache.get_generations([Project])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.title = "Renamed Project"
+            self.project.save()
+            # Still inside the transaction: entries keep the old generation.
+            self.assertEqual(response_cache.get_generations([Project]), before)
+        self.assertNotEqual(response_cache.get_generations([Project]), before)
+
+    def test_browsable_api_is_not_cached(self):
+        """Test that non-JSON renderers bypass the cache."""
+        response = self.client.get(self.published_url, HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Cache', response)
@@ -0,0 +1,96 @@
+import gzip
+from unittest import mock
+
+import brotli
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import compression
+from .compression import choose_encoding
+from .models import Project
+
+
+class ChooseEncodingTest(TestCase):
+    def test_negotiation(self):
+        """Test that Brotli is preferred and q=0 or missing codings are respected."""
+        self.assertEqual(choose_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(choose_encoding("gzip, br;q=0"), "gzip")
+        self.assertEqual(choose_encoding("*"), "br")
+        self.assertIsNone(choose_encoding("identity"))
+        self.assertIsNone(choose_encoding(None))
+        self.assertEqual(choose_encoding("br, gzip", encodings=["gzip"]), "gzip")
+
+
+class CompressedResponseTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for number in range(5):
+            Project.objects.create(
+                title=f"Compressed Project {number}",
+                description="A long description that repeats. " * 20,
+                status="published",
+            )
+        self.published_url = reverse('project-published')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_cached_responses_are_compressed_once(self):
+        """Test that hits reuse the bodies compressed when the entry was stored."""
+        plain = self.client.get(self.published_url).content
+
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            for _ in range(3):
+                response = self.client.get(self.published_url, HTTP_ACCEPT_ENCODING="gzip, br")
+                self.assertEqual(response['X-Cache'], "HIT")
+                self.assertEqual(response['Content-Encoding'], "br")
+                self.assertEqual(brotli.decompress(response.content), plain)
+        compress.assert_not_called()
+
+        response = self.client.get(self.published_url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response['Content-Encoding'], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertIn("Accept-Encoding", response['Vary'])
+
+    def test_encoded_bodies_have_weak_etags(self):
+        """Test that cached gzip/br bodies do not share the identity body's strong ETag."""
+        miss = self.client.get(self.published_url, HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(miss['X-Cache'], "MISS")
+        hit = self.client.get(self.published_url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(hit['X-Cache'], "HIT")
+        identity = self.client.get(self.published_url)
+        self.assertFalse(identity['ETag'].startswith('W/'))
+        for response in (miss, hit):
+            self.assertEqual(response['ETag'], f"W/{identity['ETag']}")
+
+        # A weak ETag still revalidates.
+        response = self.client.get(self.published_url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=hit['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_identity_responses_vary_on_accept_encoding(self):
+        """Test that uncompressed answers still tell caches they depend on the header."""
+        for _ in range(2):
+            response = self.client.get(self.published_url)
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertIn("Accept-Encoding", response['Vary'])
+
+    def test_uncached_json_is_compressed_by_the_middleware(self):
+        """Test that responses outside the response cache are compressed per request."""
+        response = self.client.get(reverse('project-list'), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response['Content-Encoding'], "gzip")
+        self.assertIn(b"Compressed Project", gzip.decompress(response.content))
+
+    def test_html_is_not_compressed(self):
+        """Test that HTML pages, which may carry CSRF tokens, are left alone."""
+        response = self.client.get("/admin/login/", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    @override_settings(RESPONSE_COMPRESSION_ENABLED=False)
+    def test_compression_can_be_disabled(self):
+        """Test that the setting turns compression off."""
+        response = self.client.get(reverse('project-list'), HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertFalse(response.has_header('Content-Encoding'))
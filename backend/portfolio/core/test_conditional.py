@@ -0,0 +1,126 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import File, JournalEntry, Project, Service
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING_WORKERS=0)
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.file = File.objects.create(
+            title="Image",
+            file=SimpleUploadedFile("image.jpg", b"image_content"),
+            mime_type="image/jpeg"
+        )
+        self.project = Project.objects.create(
+            title="Conditional Project", status="published", main_image=self.file
+        )
+        self.entry = JournalEntry.objects.create(title="Conditional Entry", status="published")
+        self.service = Service.objects.create(title="Conditional Service", status="published")
+
+    def tearDown(self):
+        cache.clear()
+
+    def assertRevalidates(self, url):
+        """Fetch ``url`` then replay its ETag and Last-Modified, expecting 304s."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b'')
+
+        not_modified = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        return response['ETag']
+
+    def test_all_read_actions_support_conditional_requests(self):
+        """Test list, published, retrieve and by_slug on every viewset."""
+        urls = [
+            reverse('project-list'),
+            reverse('project-published'),
+            reverse('project-detail', kwargs={'slug': self.project.slug}),
+            f"{reverse('project-by-slug')}?slug={self.project.slug}",
+            reverse('journalentry-list'),
+            reverse('journalentry-published'),
+            reverse('journalentry-detail', kwargs={'slug': self.entry.slug}),
+            f"{reverse('journalentry-by-slug')}?slug={self.entry.slug}",
+            reverse('service-list'),
+            reverse('service-published'),
+            reverse('service-detail', kwargs={'slug': self.service.slug}),
+            f"{reverse('service-by-slug')}?slug={self.service.slug}",
+            reverse('file-list'),
+            reverse('file-detail', args=[self.file.id]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertRevalidates(url)
+
+    def test_not_modified_skips_serialization(self):
+        """Test that a 304 is answered with a single aggregate query."""
+        url = f"{reverse('project-by-slug')}?slug={self.project.slug}"
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_with_filters(self):
+        """Test that different query strings produce different validators."""
+        url = reverse('service-list')
+        first = self.client.get(url)['ETag']
+        second = self.client.get(f"{url}?search=Conditional")['ETag']
+        self.assertNotEqual(first, second)
+
+    def test_nested_file_change_invalidates_etag(self):
+        """Test that editing an embedded File changes the project ETag."""
+        url = f"{reverse('project-by-slug')}?slug={self.project.slug}"
+        etag = self.client.get(url)['ETag']
+
+        self.file.title = "Renamed Image"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.file.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delete_advances_last_modified(self):
+        """Test that removing a row from a list is not answered with a 304 for If-Modified-Since."""
+        Project.objects.create(title="Older Project", status="published")
+        url = reverse('project-published')
+        last_modified = self.client.get(url)['Last-Modified']
+
+        later = time.time() + 60
+        with mock.patch('portfolio.core.cache.time.time', return_value=later):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.project.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(b"Conditional Project", response.content)
+        self.assertNotEqual(response['Last-Modified'], last_modified)
+
+    def test_missing_object_is_still_404(self):
+        """Test that validators are skipped when nothing matches."""
+        response = self.client.get(f"{reverse('project-by-slug')}?slug=missing")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,121 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .content import export_records, import_records, read_records, write_records
+from .models import File, JournalEntry, Project, Service
+from .search import search_queryset
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING_WORKERS=0)
+class ContentExportImportTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cover = File.objects.create(title="Cover", file="uploads/cover.png")
+        self.shot = File.objects.create(title="Shot", file="uploads/shot.png")
+        self.project = Project.objects.create(
+            title="Exported Project",
+            status="published",
+            main_image=self.cover,
+            tags=["web"],
+            tech_stack=["Django"],
+        )
+        self.project.gallery_images.set([self.shot, self.cover])
+        self.created_at = datetime(2021, 5, 4, 12, 0, tzinfo=dt_timezone.utc)
+        Project.objects.filter(pk=self.project.pk).update(created_at=self.created_at)
+        JournalEntry.objects.create(title="مرحبا", tags_ar=["عربي"], status="published")
+        Service.objects.create(title="Consulting", status="published")
+
+        fd, self.path = tempfile.mkstemp(suffix='.ndjson')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def dump(self):
+        call_command('export_content', output=self.path, stdout=io.StringIO())
+        with open(self.path, encoding='utf-8') as stream:
+            return [json.loads(line) for line in stream]
+
+    def test_export_uses_natural_keys(self):
+        """Test that references are written as file names and slugs."""
+        records = self.dump()
+        self.assertEqual([r['model'] for r in records[:2]], ['core.file', 'core.file'])
+        project = next(r['fields'] for r in records if r['model'] == 'core.project')
+        self.assertEqual(project['main_image'], "uploads/cover.png")
+        self.assertEqual(sorted(project['gallery_images']), ["uploads/cover.png", "uploads/shot.png"])
+        self.assertNotIn('search_vector', project)
+
+    def test_round_trip_into_empty_database(self):
+        """Test that a dump restores rows, relations, timestamps and derived data."""
+        self.dump()
+        for model in (Project, JournalEntry, Service, File):
+            model.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('import_content', self.path, batch_size=2, stdout=out)
+        self.assertIn('rows/s', out.getvalue())
+
+        project = Project.objects.get(slug="exported-project")
+        self.assertEqual(project.created_at, self.created_at)
+        self.assertEqual(project.main_image.file.name, "uploads/cover.png")
+        self.assertEqual(
+            sorted(project.gallery_images.values_list('file', flat=True)),
+            ["uploads/cover.png", "uploads/shot.png"],
+        )
+        self.assertTrue(project.tag_links.filter(tag__name="Django", kind='tech').exists())
+        self.assertEqual(list(search_queryset(Project.objects.all(), "exported")), [project])
+        self.assertEqual(JournalEntry.objects.get().tag_links.get().tag.name, "عربي")
+
+    def test_reimport_updates_in_place(self):
+        """Test that importing the same dump twice does not duplicate rows."""
+        self.dump()
+        call_command('import_content', self.path, stdout=io.StringIO())
+        call_command('import_content', self.path, stdout=io.StringIO())
+        self.assertEqual(Project.objects.count(), 1)
+        self.assertEqual(File.objects.count(), 2)
+        self.assertEqual(Service.objects.get().slug, "consulting")
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Test that a batch costs the same number of queries for 5 or 50 rows."""
+        def import_projects(count, prefix):
+            records = [
+                ('core.project', {"title": f"{prefix} {i}", "tags": ["bulk"], "main_image": "uploads/cover.png"})
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                list(import_records(iter(records), batch_size=count))
+            return len(queries)
+
+        import_projects(1, "Warm-up")  # creates the shared tag
+        self.assertEqual(import_projects(5, "Small"), import_projects(50, "Large"))
+        self.assertEqual(Project.objects.filter(title__startswith="Large").count(), 50)
+
+    def test_streams_round_trip_in_memory(self):
+        """Test that the generators can be chained without touching disk."""
+        stream = io.StringIO()
+        count = write_records(export_records(), stream)
+        stream.seek(0)
+        self.assertEqual(len(list(read_records(stream))), count)
+
+    def test_invalid_lines_are_rejected(self):
+        """Test that a malformed line stops the import with its line number."""
+        with open(self.path, 'w', encoding='utf-8') as stream:
+            stream.write('{"model": "core.project", "fields": {"title": "Ok"}}\nnot json\n')
+        with self.assertRaisesMessage(CommandError, 'Line 2'):
+            call_command('import_content', self.path, stdout=io.StringIO())
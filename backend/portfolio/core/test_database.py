@@ -0,0 +1,55 @@
+import os
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from portfolio.database import database_config
+
+POSTGRES_URL = "postgres://portfolio:secret@db:5432/portfolio"
+
+
+class DatabaseConfigTest(SimpleTestCase):
+    def config(self, **env):
+        with mock.patch.dict(os.environ, env):
+            return database_config()
+
+    def test_persistent_connections_are_health_checked(self):
+        """Test that the default mode keeps connections and checks them before reuse."""
+        config = self.config(DATABASE_URL=POSTGRES_URL, DATABASE_CONNECTIONS="persistent")
+        self.assertEqual((config["CONN_MAX_AGE"], config["CONN_HEALTH_CHECKS"]), (600, True))
+        self.assertNotIn("pool", config["OPTIONS"])
+
+        config = self.config(DATABASE_URL=POSTGRES_URL, DATABASE_CONNECTIONS="per-request")
+        self.assertEqual((config["CONN_MAX_AGE"], config["CONN_HEALTH_CHECKS"]), (0, False))
+
+    def test_pool_mode_needs_django_5_1(self):
+        """Test that pool mode is refused on Django versions without native pool support."""
+        with mock.patch("django.VERSION", (5, 0, 9, "final", 0)):
+            with self.assertRaisesMessage(ImproperlyConfigured, "Django 5.1"):
+                self.config(DATABASE_URL=POSTGRES_URL, DATABASE_CONNECTIONS="pool")
+
+    def test_pool_mode(self):
+        """Test that pool mode passes the sizes to psycopg's pool, or explains what is missing."""
+        env = {"DATABASE_URL": POSTGRES_URL, "DATABASE_CONNECTIONS": "pool", "DATABASE_POOL_MAX_SIZE": "8"}
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            with self.assertRaisesMessage(ImproperlyConfigured, "psycopg[pool]"):
+                self.config(**env)
+            return
+        config = self.config(**env)
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual((config["OPTIONS"]["pool"]["min_size"], config["OPTIONS"]["pool"]["max_size"]), (2, 8))
+        self.assertTrue(callable(config["OPTIONS"]["pool"]["check"]))
+
+    def test_prepared_statements_and_other_engines(self):
+        """Test the prepare threshold on PostgreSQL, that SQLite ignores it, and that bad modes fail."""
+        config = self.config(DATABASE_URL=POSTGRES_URL, DATABASE_PREPARE_THRESHOLD="5")
+        self.assertEqual(config["OPTIONS"], {"server_side_binding": True, "prepare_threshold": 5})
+
+        config = self.config(DATABASE_URL="sqlite:////tmp/portfolio.sqlite3", DATABASE_PREPARE_THRESHOLD="5")
+        self.assertNotIn("prepare_threshold", config.get("OPTIONS", {}))
+
+        with self.assertRaises(ImproperlyConfigured):
+            self.config(DATABASE_CONNECTIONS="pooled")
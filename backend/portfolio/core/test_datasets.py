@@ -0,0 +1,73 @@
+import io
+import json
+from datetime import datetime, timezone
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .datasets import DatasetGenerator
+from .models import File, JournalEntry, Project, Service
+from .search import search_queryset
+
+
+class GenerateDatasetTest(TestCase):
+    def generate(self, **options):
+        out = io.StringIO()
+        options = {"files": 20, "services": 2, "projects": 15, "journal_entries": 30, "batch_size": 7, **options}
+        call_command('generate_dataset', stdout=out, **options)
+        return out.getvalue()
+
+    def test_counts_relations_and_derived_data(self):
+        """Test that the requested rows are created with images, tags, search index and snapshots."""
+        self.assertIn("Generated 67 rows", self.generate())
+        self.assertEqual(
+            [File.objects.count(), Service.objects.count(), Project.objects.count(), JournalEntry.objects.count()],
+            [20, 2, 15, 30],
+        )
+        self.assertTrue(Project.gallery_images.through.objects.exists())
+        self.assertTrue(JournalEntry.objects.filter(language__in=['ar', 'both']).exclude(title_ar=None).exists())
+
+        project = Project.objects.exclude(tags=None).first()
+        self.assertEqual(
+            set(project.tag_links.filter(kind='tag').values_list('tag__name', flat=True)), set(project.tags)
+        )
+        self.assertEqual(json.loads(project.detail_snapshot)["slug"], project.slug)
+        self.assertFalse(JournalEntry.objects.filter(list_snapshot=None).exists())
+        entry = JournalEntry.objects.exclude(language='ar').first()
+        self.assertIn(entry, search_queryset(JournalEntry.objects.all(), entry.title.split()[0]))
+
+    def test_same_seed_same_content(self):
+        """Test that chunks depend only on the seed, not on which worker or order generates them."""
+        def dates(seed):
+            return [row.publication_date for row in DatasetGenerator(seed).rows(JournalEntry, 0, 0, 5)[0]]
+
+        def titles(seed, chunks):
+            generator = DatasetGenerator(seed)
+            return [
+                row.title for chunk in chunks for row in generator.rows(JournalEntry, chunk, chunk * 5, 5)[0]
+            ]
+
+        self.assertEqual(titles(1, [0, 1, 2]), titles(1, [0, 1, 2]))
+        self.assertEqual(dates(1), dates(1))
+        self.assertEqual(titles(1, [0, 1, 2])[5:10], titles(1, [1]))
+        self.assertNotEqual(titles(1, [0]), titles(2, [0]))
+
+    def test_now_anchors_dates(self):
+        """Test that dates count back from --now rather than the clock."""
+        self.generate(now="2020-06-01", journal_entries=5, projects=0)
+        now = datetime(2020, 6, 1, tzinfo=timezone.utc)
+        self.assertLessEqual(JournalEntry.objects.latest('publication_date').publication_date, now)
+        self.assertLessEqual(JournalEntry.objects.latest('created_at').created_at, now)
+        with self.assertRaises(CommandError):
+            self.generate(now="yesterday")
+
+    def test_rerun_allocates_free_slugs(self):
+        """Test that generating the same seed again adds rows instead of failing on taken slugs."""
+        self.generate(seed=3)
+        self.generate(seed=3)
+        self.assertEqual(Project.objects.count(), 30)
+        self.assertEqual(Project.objects.values('slug').distinct().count(), 30)
+
+        self.assertIn("nothing generated", self.generate(if_empty=True))
+        self.assertEqual(Project.objects.count(), 30)
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .fieldsets import Fieldset
+from .models import File, Project, Service
+from .renderers import ORJSONRenderer
+from .rows import RowSerializer
+from .serializers import ProjectListSerializer
+
+
+class SparseFieldsetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        image = File.objects.create(
+            title="Cover", file="uploads/2024/05/01/cover.jpg", description="A long caption",
+            variants={"source": "uploads/2024/05/01/cover.jpg", "webp": {"640": "variants/1/640.webp"}},
+        )
+        self.project = Project.objects.create(
+            title="Sparse Project", status="published", description="Summary",
+            long_description_html="<p>Body</p>", main_image=image,
+        )
+        self.project.gallery_images.add(image)
+        Service.objects.create(title="Sparse Service", status="published", icon_svg="<svg/>", featured_image=image)
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), " ".join(query["sql"] for query in queries.captured_queries)
+
+    def test_fields_and_omit_prune_lists(self):
+        """Test that ?fields= and ?omit= prune list items, nested files included, and their columns."""
+        body, sql = self.get(reverse('project-published'), fields="title,main_image.file")
+        self.assertEqual(body["results"], [{"title": "Sparse Project", "main_image": {"file": "/media/uploads/2024/05/01/cover.jpg"}}])
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"tech_stack"', sql)
+
+        body, sql = self.get(reverse('service-published'), omit="description_rich_text,icon_svg,featured_image.description")
+        self.assertNotIn("icon_svg", body[0])
+        self.assertNotIn("description", body[0]["featured_image"])
+        self.assertIn("srcset", body[0]["featured_image"])
+        self.assertNotIn('"icon_svg"', sql)
+
+    def test_expand_collapses_relations_to_keys(self):
+        """Test that with ?expand= nested objects it does not name become primary keys and are not joined."""
+        body, sql = self.get(reverse('project-published'), expand="", fields="title,main_image")
+        self.assertEqual(body["results"], [{"title": "Sparse Project", "main_image": self.project.main_image_id}])
+        self.assertNotIn('"core_file"', sql)
+
+        body, sql = self.get(reverse('project-detail', args=[self.project.slug]), expand="main_image")
+        self.assertEqual(body["main_image"]["title"], "Cover")
+        self.assertEqual(body["gallery_images"], [self.project.main_image_id])
+        gallery_sql = sql[sql.index("core_project_gallery_images"):]
+        self.assertNotIn('"core_file"."title"', gallery_sql)
+        self.assertNotIn('"search_vector"', sql)
+
+        body, sql = self.get(reverse('project-by-slug'), slug=self.project.slug, omit="long_description_html")
+        self.assertNotIn("long_description_html", body)
+        self.assertNotIn('"long_description_html"', sql)
+        self.assertEqual(body["gallery_images"][0]["title"], "Cover")
+
+    def test_selections_are_cached_apart(self):
+        """Test that the response cache keys on the selection, an empty ?expand= included."""
+        url = reverse('project-published')
+        full = self.client.get(url).json()["results"][0]
+        self.assertEqual(self.client.get(url, {"fields": "title"}).json()["results"][0], {"title": "Sparse Project"})
+        collapsed = self.client.get(url, {"expand": ""}).json()["results"][0]
+        self.assertEqual(collapsed["main_image"], self.project.main_image_id)
+        self.assertEqual(self.client.get(url).json()["results"][0], full)
+
+    def test_rows_match_serializer_for_a_selection(self):
+        """Test that pruned list rows are still byte-identical to the pruned serializer."""
+        queryset = Project.objects.select_related("main_image")
+        for fieldset in [
+            Fieldset(fields=frozenset({("title",), ("main_image", "srcset")})),
+            Fieldset(omit=frozenset({("description",)}), expand=frozenset()),
+        ]:
+            context = {"fieldset": fieldset}
+            rows = RowSerializer.for_serializer(ProjectListSerializer, context)
+            self.assertEqual(
+                ORJSONRenderer().render(rows.data(rows.values(queryset))),
+                ORJSONRenderer().render(ProjectListSerializer(queryset, many=True, context=context).data),
+            )
+
+    def test_writes_ignore_selection(self):
+        """Test that a selection in the query string does not narrow what a write reads or returns."""
+        self.client.force_authenticate(User.objects.create_user(username="editor", password="password", is_staff=True))
+        response = self.client.patch(
+            reverse('project-detail', args=[self.project.slug]) + "?fields=title", {"title": "Renamed"}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["description"], "Summary")
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.title, self.project.long_description_html), ("Renamed", "<p>Body</p>"))
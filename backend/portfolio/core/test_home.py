@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import JournalEntry, Project, Service
+
+
+class HomeBundleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        for number in range(8):
+            Project.objects.create(title=f"Project {number}", status="published" if number != 3 else "draft", sort=8 - number)
+            JournalEntry.objects.create(title=f"Entry {number}", status="published" if number != 5 else "draft")
+        for number in range(3):
+            Service.objects.create(title=f"Service {number}", status="published", sort=number)
+        Service.objects.create(title="Hidden", status="draft")
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_sections_match_the_published_endpoints(self):
+        """Test that each section is the published list, ordered and cut to size."""
+        body = self.client.get(reverse('home')).json()
+        self.assertEqual(
+            [project["title"] for project in body["projects"]],
+            [f"Project {number}" for number in (7, 6, 5, 4, 2, 1)],
+        )
+        entries = self.client.get(reverse('journalentry-published')).json()["results"]
+        self.assertEqual(body["journal_entries"], entries[:3])
+        self.assertEqual(body["services"], self.client.get(reverse('service-published')).json())
+
+    def test_section_sizes(self):
+        """Test that sizes come from the query string, capped, and that bad ones are rejected."""
+        body = self.client.get(reverse('home'), {"projects": "2", "journal_entries": "0", "services": "1"}).json()
+        self.assertEqual([len(body[name]) for name in ("projects", "journal_entries", "services")], [2, 0, 1])
+        self.assertEqual(len(self.client.get(reverse('home'), {"journal_entries": "500"}).json()["journal_entries"]), 7)
+        self.assertEqual(self.client.get(reverse('home'), {"projects": "-1"}).status_code, 400)
+
+    def test_one_validator_and_cache_entry(self):
+        """Test the combined ETag and cache entry, and that editing any section changes them."""
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(reverse('home'))["X-Cache"], "HIT")
+        self.assertEqual(self.client.get(reverse('home'), headers={"If-None-Match": response["ETag"]}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Service.objects.filter(title="Service 0").first().save()
+        changed = self.client.get(reverse('home'), headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed["X-Cache"], "MISS")
+        self.assertNotEqual(changed["ETag"], response["ETag"])
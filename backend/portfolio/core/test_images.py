@@ -0,0 +1,128 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .images import generate_variants, process_file, variant_formats
+from .models import File
+from .serializers import FileSerializer
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload(name, size=(300, 150), format='JPEG', exif=None):
+    buffer = BytesIO()
+    image = Image.new('RGB', size, (200, 30, 30))
+    if exif is not None:
+        image.save(buffer, format, exif=exif)
+    else:
+        image.save(buffer, format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    IMAGE_PROCESSING_WORKERS=0,
+    IMAGE_VARIANT_WIDTHS=[100, 200],
+)
+class ImageVariantTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def upload(self, upload):
+        with self.captureOnCommitCallbacks(execute=True):
+            file = File.objects.create(title="Upload", file=upload)
+        file.refresh_from_db()
+        return file
+
+    def upload_as(self, upload, mime_type):
+        with self.captureOnCommitCallbacks(execute=True):
+            file = File.objects.create(title="Upload", file=upload, mime_type=mime_type)
+        file.refresh_from_db()
+        return file
+
+    def test_upload_records_metadata_and_variants(self):
+        """Test that an upload gets its dimensions and one variant per width and format."""
+        file = self.upload(image_upload("photo.jpg"))
+
+        self.assertEqual((file.width, file.height), (300, 150))
+        self.assertEqual(file.mime_type, "image/jpeg")
+        self.assertEqual(file.filesize, file.file.size)
+        self.assertEqual(set(file.variants) - {'source'}, set(variant_formats()))
+        self.assertEqual(sorted(file.variants['webp']), ["100", "200"])
+        with default_storage.open(file.variants['webp']['100']) as handle:
+            self.assertEqual(Image.open(handle).size, (100, 50))
+
+    def test_exif_is_applied_and_stripped(self):
+        """Test that the orientation is baked in and no EXIF reaches the variants."""
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees
+        exif[0x010F] = "Camera Maker"
+        file = self.upload(image_upload("rotated.jpg", exif=exif))
+
+        self.assertEqual((file.width, file.height), (150, 300))
+        with default_storage.open(file.variants['jpeg']['100']) as handle:
+            variant = Image.open(handle)
+            self.assertEqual(variant.size, (100, 200))
+            self.assertEqual(dict(variant.getexif()), {})
+
+    def test_small_images_keep_their_width(self):
+        """Test that images narrower than every width are not upscaled."""
+        file = self.upload(image_upload("icon.png", size=(64, 64), format='PNG'))
+        self.assertEqual(sorted(file.variants['jpeg']), ["64"])
+
+    def test_non_images_only_get_size_and_type(self):
+        """Test that documents are recorded without variants."""
+        file = self.upload(SimpleUploadedFile("notes.pdf", b"%PDF-1.4 not really"))
+        self.assertEqual(file.mime_type, "application/pdf")
+        self.assertEqual(file.variants, {'source': file.file.name})
+
+    def test_videos_are_not_read(self):
+        """Test that non-image uploads are sized from the storage without being opened."""
+        name = default_storage.save("uploads/clip.mp4", SimpleUploadedFile("clip.mp4", b"\x00" * 4096))
+        with mock.patch.object(default_storage, 'open', side_effect=AssertionError("opened")):
+            result = generate_variants(1, name)
+        self.assertEqual(result, {'filesize': 4096, 'variants': {'source': name}})
+
+    def test_sent_mime_type_is_kept_for_unidentified_files(self):
+        """Test that a type guessed from the name never replaces the one the client sent."""
+        file = self.upload_as(SimpleUploadedFile("dump.unknownext", b"data"), "application/x-dump")
+        self.assertEqual((file.mime_type, file.filesize), ("application/x-dump", 4))
+        image = self.upload_as(image_upload("photo.jpg"), "application/octet-stream")
+        self.assertEqual(image.mime_type, "image/jpeg")
+
+    @override_settings(IMAGE_PROCESSING_WORKERS=2)
+    def test_non_images_skip_the_pool_and_unchanged_rows(self):
+        """Test that documents are sized inline and re-processing an unchanged row writes nothing."""
+        with mock.patch("portfolio.core.images.get_executor", side_effect=AssertionError("pool used")):
+            file = self.upload(SimpleUploadedFile("notes.pdf", b"%PDF-1.4 not really"))
+        self.assertEqual(file.filesize, 19)
+        # One SELECT finds nothing to change: no UPDATE, snapshots or bump.
+        with self.assertNumQueries(1):
+            process_file(file.pk, file.file.name)
+
+    def test_serializer_exposes_srcset(self):
+        """Test that the serializer lists the variants per format, narrowest first."""
+        file = self.upload(image_upload("card.jpg"))
+        data = FileSerializer(file).data
+
+        self.assertNotIn('variants', data)
+        self.assertEqual(
+            data['srcset']['webp'],
+            f"/media/variants/{file.pk}/100.webp 100w, /media/variants/{file.pk}/200.webp 200w",
+        )
+
+    def test_delete_removes_variants(self):
+        """Test that deleting a file also deletes its variants."""
+        file = self.upload(image_upload("gone.jpg"))
+        name = file.variants['webp']['100']
+        with self.captureOnCommitCallbacks(execute=True):
+            file.delete()
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import File, Project
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING_WORKERS=0, MEDIA_ACCEL_REDIRECT=False)
+class MediaDeliveryTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.content = bytes(range(256)) * 40
+        with self.captureOnCommitCallbacks(execute=True):
+            self.file = File.objects.create(title="Reel", file=SimpleUploadedFile("reel.mp4", self.content))
+        self.url = reverse('media', args=[self.file.file.name])
+        self.project = Project.objects.create(title="Reel project", status="published", main_image=self.file)
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_published_file_is_streamed_with_cache_headers(self):
+        """Test that a published file is served whole with long-lived caching."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Content-Type'], "video/mp4")
+        self.assertEqual(response['Accept-Ranges'], "bytes")
+        self.assertTrue(response['Cache-Control'].startswith("public, max-age="))
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        """Test single byte ranges, suffix ranges and unsatisfiable ranges."""
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f"bytes 100-199/{len(self.content)}")
+        self.assertEqual(self.body(response), self.content[100:200])
+
+        response = self.client.get(reverse('file_content', args=[self.file.pk]), HTTP_RANGE="bytes=-10")
+        self.assertEqual(self.body(response), self.content[-10:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.content)}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_unpublished_files_are_staff_only(self):
+        """Test that files of drafts are hidden from everyone but staff."""
+        Project.objects.filter(pk=self.project.pk).update(status="draft")
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        User.objects.create_user(username="editor", password="password", is_staff=True)
+        self.client.login(username="editor", password="password")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], "private, no-cache")
+
+    @override_settings(MEDIA_ACCEL_REDIRECT=True)
+    def test_nginx_sends_the_file(self):
+        """Test that with X-Accel-Redirect Django only returns the internal location."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f"/protected-media/{self.file.file.name}")
+        self.assertEqual(response.content, b"")
+
+    def test_unknown_names_are_not_served(self):
+        """Test that only names of stored uploads and their variants are served."""
+        for name in ["missing.mp4", "../settings.py", f"variants/{self.file.pk}/100.webp"]:
+            self.assertEqual(self.client.get(f"/media/{name}").status_code, 404)
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import metrics
+from .models import Project
+
+
+class HistogramTest(TestCase):
+    def test_prometheus_exposition(self):
+        """Test that buckets are cumulative and labels are escaped."""
+        histogram = metrics.Histogram('test_seconds', 'Test.', (0.1, 1.0))
+        histogram.observe(0.05, 'View', 'list')
+        histogram.observe(0.5, 'View', 'list')
+        histogram.observe(5, 'View', 'list')
+
+        lines = histogram.collect()
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{view="View",action="list",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{view="View",action="list",le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{view="View",action="list",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{view="View",action="list"} 3', lines)
+
+
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset_metrics()
+        self.client = APIClient()
+        Project.objects.create(title="Metrics Project", status="published")
+
+    def tearDown(self):
+        metrics.reset_metrics()
+
+    def test_requests_are_recorded_per_view_and_action(self):
+        """Test that a request is recorded under its viewset and action."""
+        self.client.get(reverse('project-published'))
+
+        output = metrics.render_metrics()
+        labels = 'view="ProjectViewSet",action="published"'
+        self.assertIn(f'portfolio_request_duration_seconds_count{{{labels}}} 1', output)
+        self.assertIn(f'portfolio_request_sql_queries_count{{{labels}}} 1', output)
+        self.assertIn(f'portfolio_request_serialize_duration_seconds_count{{{labels}}} 1', output)
+        self.assertIn(f'portfolio_request_render_duration_seconds_count{{{labels}}} 1', output)
+        self.assertIn(f'portfolio_response_size_bytes_count{{{labels}}} 1', output)
+        self.assertIn('portfolio_response_cache_events_total{event="miss"}', output)
+
+    def test_metrics_endpoint_is_internal_only(self):
+        """Test that the endpoint answers INTERNAL_IPS and hides from everyone else."""
+        self.client.get(reverse('project-list'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'view="ProjectViewSet",action="list"', response.content)
+        self.assertNotIn(b'action="metrics"', response.content)
+
+        with override_settings(INTERNAL_IPS=['10.0.0.1']):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
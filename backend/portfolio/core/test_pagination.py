@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import JournalEntry, Project, Service
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        for i in range(7):
+            entry = JournalEntry.objects.create(title=f"Entry {i}", status="published")
+            # Ties on both ordering columns and some missing publication dates
+            # must still be walked exactly once.
+            JournalEntry.objects.filter(pk=entry.pk).update(
+                publication_date=None if i % 3 == 0 else now - timedelta(days=i // 2),
+                created_at=now,
+            )
+        JournalEntry.objects.create(title="Draft", status="draft")
+
+    def walk(self, url, params):
+        titles = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles.extend(item['title'] for item in response.data['results'])
+            if not response.data['next']:
+                return titles
+            response = self.client.get(response.data['next'])
+
+    def test_cursor_walk_visits_every_row_in_order(self):
+        """Test that following next cursors returns every row once, in order."""
+        expected = list(
+            JournalEntry.objects.filter(status="published")
+            .order_by(F('publication_date').desc(nulls_first=True), '-created_at', 'id')
+            .values_list('title', flat=True)
+        )
+        walked = self.walk(reverse('journalentry-published'), {'page_size': 2, 'cursor': ''})
+
+        self.assertEqual(len(expected), 7)
+        self.assertEqual(walked, expected)
+
+    def test_count_is_optional(self):
+        """Test that the count is only computed when asked for."""
+        url = reverse('journalentry-published')
+        response = self.client.get(url, {'cursor': ''})
+        self.assertNotIn('count', response.data)
+        self.assertNotIn('previous', response.data)
+
+        response = self.client.get(url, {'cursor': '', 'count': 'true'})
+        self.assertEqual(response.data['count'], 7)
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        """Test that later pages run the same queries as page 1, without COUNT."""
+        url = reverse('journalentry-published')
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(url, {'cursor': '', 'page_size': 2})
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(response.data['next'])
+
+        self.assertEqual(len(first), len(deep))
+        paginated = [query['sql'] for query in deep.captured_queries if 'LIMIT' in query['sql']]
+        self.assertTrue(paginated)
+        self.assertNotIn('OFFSET', paginated[-1])
+
+    def test_invalid_cursor(self):
+        """Test that malformed or foreign cursors are rejected."""
+        url = reverse('journalentry-published')
+        response = self.client.get(url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        next_url = self.client.get(url, {'cursor': '', 'page_size': 2}).data['next']
+        response = self.client.get(next_url + '&ordering=title')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_list_actions_support_cursors(self):
+        """Test that the project and service lists accept a cursor too."""
+        for i in range(3):
+            Project.objects.create(title=f"Project {i}", status="published")
+            Service.objects.create(title=f"Service {i}", sort=i % 2, status="published")
+
+        projects = self.walk(reverse('project-list'), {'page_size': 1, 'cursor': ''})
+        self.assertEqual(projects, ["Project 2", "Project 1", "Project 0"])
+
+        services = self.walk(reverse('service-list'), {'cursor': ''})
+        self.assertEqual(services, ["Service 0", "Service 2", "Service 1"])
@@ -0,0 +1,103 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import File, JournalEntry, Project, Service
+
+# Maximum number of SQL queries each endpoint may issue, whatever the number of
+# rows. Raising a budget needs a reason in the commit that does it.
+QUERY_BUDGETS = {
+    'project-list': 3,
+    'project-published': 3,
+    'project-detail': 3,
+    'project-by-slug': 3,
+    'journalentry-list': 3,
+    'journalentry-published': 3,
+    'journalentry-detail': 2,
+    'journalentry-by-slug': 2,
+    'service-list': 3,
+    'service-published': 2,
+    'service-detail': 2,
+    'service-by-slug': 2,
+    'file-list': 3,
+    # One validator aggregate and one list query per section.
+    'home': 6,
+}
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class QueryBudgetTest(TestCase):
+    """Pin the number of queries per endpoint so N+1 regressions fail loudly."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.counter = 0
+
+    def create_content(self, count):
+        """Create ``count`` published rows of each model, all with images."""
+        for _ in range(count):
+            self.counter += 1
+            image = File.objects.create(
+                title=f"Image {self.counter}",
+                file=SimpleUploadedFile(f"image_{self.counter}.jpg", b"image_content"),
+                mime_type="image/jpeg"
+            )
+            project = Project.objects.create(
+                title=f"Project {self.counter}", status="published", main_image=image
+            )
+            project.gallery_images.add(image)
+            JournalEntry.objects.create(
+                title=f"Entry {self.counter}", status="published", featured_image=image
+            )
+            Service.objects.create(
+                title=f"Service {self.counter}", status="published", featured_image=image
+            )
+
+    def endpoint_urls(self):
+        project = Project.objects.first()
+        entry = JournalEntry.objects.first()
+        service = Service.objects.first()
+        return {
+            'project-list': reverse('project-list'),
+            'project-published': reverse('project-published'),
+            'project-detail': reverse('project-detail', kwargs={'slug': project.slug}),
+            'project-by-slug': f"{reverse('project-by-slug')}?slug={project.slug}",
+            'journalentry-list': reverse('journalentry-list'),
+            'journalentry-published': reverse('journalentry-published'),
+            'journalentry-detail': reverse('journalentry-detail', kwargs={'slug': entry.slug}),
+            'journalentry-by-slug': f"{reverse('journalentry-by-slug')}?slug={entry.slug}",
+            'service-list': reverse('service-list'),
+            'service-published': reverse('service-published'),
+            'service-detail': reverse('service-detail', kwargs={'slug': service.slug}),
+            'service-by-slug': f"{reverse('service-by-slug')}?slug={service.slug}",
+            'file-list': reverse('file-list'),
+            'home': reverse('home'),
+        }
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(context.captured_queries)
+
+    def test_endpoints_stay_within_budget(self):
+        """Test that every endpoint issues at most its budgeted queries."""
+        self.create_content(3)
+        for name, url in self.endpoint_urls().items():
+            with self.subTest(endpoint=name):
+                queries = self.count_queries(url)
+                self.assertLessEqual(queries, QUERY_BUDGETS[name])
+
+    def test_query_count_does_not_grow_with_rows(self):
+        """Test that a full page costs the same as a page with a single row."""
+        self.create_content(1)
+        small = {name: self.count_queries(url) for name, url in self.endpoint_urls().items()}
+
+        self.create_content(11)
+        for name, url in self.endpoint_urls().items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(self.count_queries(url), small[name])
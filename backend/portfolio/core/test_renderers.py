@@ -0,0 +1,56 @@
+import datetime
+import decimal
+import io
+import uuid
+from zoneinfo import ZoneInfo
+
+from django.test import TestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(TestCase):
+    def assertSameOutput(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(ORJSONRenderer().render(data, accepted_media_type), expected)
+
+    def test_output_matches_drf(self):
+        """Test that values DRF formats itself render byte for byte the same."""
+        self.assertSameOutput(ReturnDict({
+            "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "local": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=ZoneInfo("Asia/Riyadh")),
+            "naive": datetime.datetime(2024, 5, 1, 12, 30),
+            "publication_date": datetime.date(2024, 5, 1),
+            "time": datetime.time(8, 15),
+            "price": decimal.Decimal("12.50"),
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "label": gettext_lazy("Draft"),
+            "tags": ["web", "تطوير", None, True, 1.5],
+            "nested": {1: {"deep": []}},
+            "text": "line\u2028break\u2029end </script>",
+        }, serializer=None))
+
+    def test_fallbacks(self):
+        """Test that indented output and oversized integers use the stdlib path."""
+        self.assertSameOutput({"big": 2 ** 70})
+        self.assertSameOutput({"a": [1, 2]}, "application/json; indent=4")
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class ORJSONParserTest(TestCase):
+    def parse(self, body, **context):
+        return ORJSONParser().parse(io.BytesIO(body), "application/json", context)
+
+    def test_parses_like_drf(self):
+        """Test that bodies parse to the same data and errors stay ParseErrors."""
+        body = '{"title": "مشروع", "tags": ["a"], "sort": 2, "ratio": 0.5}'.encode()
+        self.assertEqual(self.parse(body), {"title": "مشروع", "tags": ["a"], "sort": 2, "ratio": 0.5})
+        self.assertEqual(self.parse('{"title": "é"}'.encode("latin-1"), encoding="latin-1"), {"title": "é"})
+        for invalid in [b'{"title": ', b'{"ratio": NaN}']:
+            with self.assertRaises(ParseError):
+                self.parse(invalid)
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import Project
+from .replicas import PIN_COOKIE, lag_monitor
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], RESPONSE_CACHE_ENABLED=False)
+class ReplicaRoutingTest(TestCase):
+    """The ``replica`` test database stands in for a replica that has not caught up yet."""
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        lag_monitor.reset()
+        self.addCleanup(lag_monitor.reset)
+        Project.objects.using("replica").create(title="Replicated", slug="replicated", status="published")
+        Project.objects.create(title="Fresh", slug="fresh", status="published")
+        self.editor = User.objects.create_superuser(username="editor", password="password", email="editor@example.com")
+
+    def titles(self, client, url=None):
+        response = client.get(url or reverse('project-published'))
+        self.assertEqual(response.status_code, 200)
+        return [project["title"] for project in response.json()["results"]]
+
+    def test_public_reads_use_the_replica(self):
+        """Test that safe API reads go to the replica while other views stay on the primary."""
+        self.assertEqual(self.titles(APIClient()), ["Replicated"])
+        self.assertEqual(self.titles(APIClient(), reverse('async-project-published')), ["Replicated"])
+        self.client.force_login(self.editor)
+        response = self.client.get(reverse('admin:core_project_changelist'))
+        self.assertContains(response, "Fresh")
+        self.assertNotContains(response, "Replicated")
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        """Test that after a write the same client reads its change from the primary."""
+        client = APIClient()
+        client.force_authenticate(self.editor)
+        response = client.post(reverse('project-list'), {"title": "Written", "status": "published"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertIn("Written", self.titles(client))
+        self.assertFalse(Project.objects.using("replica").filter(title="Written").exists())
+        # Other clients keep reading the replica.
+        self.assertEqual(self.titles(APIClient()), ["Replicated"])
+
+    def test_lagging_replica_is_skipped(self):
+        """Test that a replica behind by more than REPLICA_MAX_LAG is not read from until it catches up."""
+        with mock.patch("portfolio.core.replicas.replica_lag", return_value=60.0):
+            self.assertEqual(sorted(self.titles(APIClient())), ["Fresh"])
+        with self.settings(REPLICA_LAG_CHECK_INTERVAL=0):
+            self.assertEqual(self.titles(APIClient()), ["Replicated"])
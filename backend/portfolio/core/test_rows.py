@@ -0,0 +1,90 @@
+import datetime
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .models import File, JournalEntry, Project, Service
+from .renderers import ORJSONRenderer
+from .rows import RowSerializer
+from .serializers import (
+    JournalEntryListSerializer, ProjectListSerializer, ProjectSerializer, ServiceListSerializer,
+)
+
+
+def make_file(number, **fields):
+    name = f"uploads/2024/05/01/image-{number}.jpg"
+    return File.objects.create(
+        title=f"Image {number}", file=name, mime_type="image/jpeg", width=1920, height=1080,
+        filesize=245_000, variants={
+            "source": name,
+            "webp": {"640": f"variants/{number}/640.webp", "1280": f"variants/{number}/1280.webp"},
+        },
+        **fields,
+    )
+
+
+class RowSerializerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        published = datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        for number in range(4):
+            Project.objects.create(
+                title=f"Project {number}", status="published", description="Line\u2028break",
+                main_image=make_file(number) if number % 2 else None,
+                tech_stack=["Django", "React"], tags=["web", "تطوير"], category="Web", year="2024",
+            )
+            JournalEntry.objects.create(
+                title=f"Entry {number}", title_ar=f"تدوينة {number}", status="published",
+                publication_date=published if number % 2 else None, tags_ar=["ملاحظات"],
+                featured_image=make_file(10 + number) if number else None,
+            )
+            Service.objects.create(
+                title=f"Service {number}", status="published", icon_svg="<svg/>",
+                featured_image=make_file(20 + number, description=None) if number != 2 else None,
+            )
+        File.objects.create(file="")
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_output_is_byte_identical(self):
+        """Test that rows render to exactly the bytes of the list serializers, with and without a request."""
+        request = APIRequestFactory().get("/api/projects/")
+        cases = [
+            (ProjectListSerializer, Project.objects.select_related("main_image").order_by("-created_at")),
+            (JournalEntryListSerializer, JournalEntry.objects.select_related("featured_image")),
+            (ServiceListSerializer, Service.objects.select_related("featured_image").order_by("sort", "title")),
+        ]
+        for serializer_class, queryset in cases:
+            for context in [{}, {"request": request}]:
+                with self.subTest(serializer=serializer_class.__name__, request=bool(context)):
+                    expected = ORJSONRenderer().render(serializer_class(queryset, many=True, context=context).data)
+                    rows = RowSerializer(serializer_class, context)
+                    self.assertEqual(ORJSONRenderer().render(rows.data(rows.values(queryset))), expected)
+
+    def test_endpoints_match_serializers(self):
+        """Test that published responses, cursor pages included, are the serializers' output."""
+        client = APIClient()
+        url = reverse('journalentry-published') + "?cursor=&page_size=2"
+        seen = []
+        while url:
+            body = client.get(url).json()
+            entries = JournalEntry.objects.select_related("featured_image").in_bulk([row["id"] for row in body["results"]])
+            expected = JournalEntryListSerializer([entries[row["id"]] for row in body["results"]], many=True).data
+            self.assertEqual(body["results"], json.loads(ORJSONRenderer().render(expected)))
+            seen += [row["id"] for row in body["results"]]
+            url = body["next"]
+        self.assertCountEqual(seen, JournalEntry.objects.values_list("id", flat=True))
+
+        response = client.get(reverse('service-published'))
+        services = Service.objects.select_related("featured_image").filter(status="published").order_by("sort", "title")
+        self.assertEqual(response.content, ORJSONRenderer().render(ServiceListSerializer(services, many=True).data))
+
+    def test_rejects_fields_it_cannot_express(self):
+        """Test that nested lists raise instead of rendering something different."""
+        with self.assertRaises(ImproperlyConfigured):
+            RowSerializer(ProjectSerializer)
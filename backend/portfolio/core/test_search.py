@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import JournalEntry, Project
+from .search import fts5_query, fts_table, search_queryset
+
+
+class FullTextSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.django_entry = JournalEntry.objects.create(
+            title="Scaling Django",
+            excerpt="Notes on caching",
+            content_rich_text="<p>Connection pooling and replicas.</p>",
+            title_ar="توسيع جانغو",
+            content_rich_text_ar="<p>التخزين المؤقت وقواعد البيانات</p>",
+            status="published",
+        )
+        self.body_entry = JournalEntry.objects.create(
+            title="Weekend notes",
+            content_rich_text="<p>A short mention of Django in the body.</p>",
+            status="published",
+        )
+        self.other_entry = JournalEntry.objects.create(
+            title="Gardening", content_rich_text="<p>Tomatoes</p>", status="published"
+        )
+
+    def search(self, query):
+        return list(search_queryset(JournalEntry.objects.all(), query).order_by('-search_rank'))
+
+    def test_english_and_arabic_fields_are_searchable(self):
+        """Test that both language columns are part of the document."""
+        self.assertEqual(self.search("pooling"), [self.django_entry])
+        self.assertEqual(self.search("التخزين"), [self.django_entry])
+
+    def test_title_matches_rank_above_body_matches(self):
+        """Test that results are ranked by field weight."""
+        self.assertEqual(self.search("django"), [self.django_entry, self.body_entry])
+
+    def test_index_follows_saves_and_deletes(self):
+        """Test that the index is updated incrementally."""
+        self.other_entry.title = "Gardening with Django"
+        self.other_entry.save()
+        self.assertIn(self.other_entry, self.search("django"))
+
+        self.other_entry.delete()
+        self.assertEqual(len(self.search("django")), 2)
+
+    def test_query_syntax_is_escaped(self):
+        """Test that user input cannot inject FTS5 operators."""
+        self.assertEqual(fts5_query('django OR "NEAR(" -x'), '"django" "OR" "NEAR" "x"')
+        self.assertEqual(self.search('"unterminated'), [])
+
+    def test_search_endpoint_is_ranked(self):
+        """Test that ?search= on the API returns ranked results."""
+        response = self.client.get(f"{reverse('journalentry-published')}?search=django")
+        titles = [entry['title'] for entry in response.json()['results']]
+        self.assertEqual(titles, ["Scaling Django", "Weekend notes"])
+
+    def test_rebuild_command(self):
+        """Test that the management command rebuilds the index from scratch."""
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {fts_table(JournalEntry)}')
+        Project.objects.create(title="Django portfolio", status="published")
+
+        call_command('rebuild_search_index', verbosity=0, stdout=open('/dev/null', 'w'))
+        self.assertEqual(len(self.search("django")), 2)
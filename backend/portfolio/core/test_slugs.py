@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from . import slugs
+from .models import JournalEntry, Project, Service
+
+
+class SlugAllocationTest(TestCase):
+    def test_duplicate_titles_are_numbered(self):
+        """Test that repeated titles keep the existing -1, -2 numbering."""
+        created = [Project.objects.create(title="Same Title") for _ in range(3)]
+        self.assertEqual([p.slug for p in created], ["same-title", "same-title-1", "same-title-2"])
+
+    def test_arabic_titles_are_transliterated(self):
+        """Test that Arabic titles get distinct readable slugs instead of empty ones."""
+        first = JournalEntry.objects.create(title="مرحبا بالعالم")
+        second = JournalEntry.objects.create(title="مَرْحَبًا بالعالم")
+        self.assertEqual(first.slug, "mrhba-balaalm")
+        self.assertEqual(second.slug, "mrhba-balaalm-1")
+
+    def test_untransliterable_titles_fall_back_to_a_title_hash(self):
+        """Test that titles with no Latin spelling get distinct bases derived from the title."""
+        first = Service.objects.create(title="网站")
+        second = Service.objects.create(title="设计")
+        again = Service.objects.create(title="网站")
+        self.assertRegex(first.slug, r"^service-[0-9a-f]{8}$")
+        self.assertRegex(second.slug, r"^service-[0-9a-f]{8}$")
+        self.assertNotEqual(first.slug, second.slug)
+        self.assertEqual(again.slug, f"{first.slug}-1")
+        self.assertEqual(slugs.base_slug(Service, ""), "service")
+
+    def test_allocation_is_a_single_query(self):
+        """Test that finding a free suffix does not probe each candidate."""
+        for _ in range(5):
+            Project.objects.create(title="Busy")
+        with self.assertNumQueries(1):
+            self.assertEqual(slugs.allocate_slug(Project, "Busy"), "busy-5")
+
+    def test_lost_race_is_retried(self):
+        """Test that a slug taken between allocation and insert is reallocated."""
+        Project.objects.create(title="Race")
+        real_allocate = slugs.allocate_slug
+        stale = iter(["race"])
+
+        def allocate(model, text, using):
+            return next(stale, None) or real_allocate(model, text, using=using)
+
+        with mock.patch.object(slugs, 'allocate_slug', side_effect=allocate):
+            project = Project.objects.create(title="Race")
+        self.assertEqual(project.slug, "race-1")
+
+    def test_bulk_allocation(self):
+        """Test that bulk allocation avoids existing and in-batch collisions."""
+        Service.objects.create(title="Consulting")
+        services = [Service(title="Consulting"), Service(title="Consulting"), Service(title="Design", slug="kept")]
+        with self.assertNumQueries(1):
+            slugs.allocate_slugs(Service, services)
+        self.assertEqual([s.slug for s in services], ["consulting-1", "consulting-2", "kept"])
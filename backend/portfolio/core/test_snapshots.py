@@ -0,0 +1,110 @@
+import json
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import File, JournalEntry, Project, Service
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class SnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.cover = File.objects.create(
+            title="Cover", file="uploads/2024/05/01/cover.jpg",
+            variants={"source": "uploads/2024/05/01/cover.jpg", "webp": {"640": "variants/1/640.webp"}},
+        )
+        self.detail = File.objects.create(title="Detail", file="uploads/2024/05/01/detail.png")
+        self.project = Project.objects.create(
+            title="Snapshot Project", status="published", description="Summary   line",
+            main_image=self.cover, tech_stack=["Django"], tags=["web"],
+        )
+        self.project.gallery_images.add(self.cover, self.detail)
+        Project.objects.create(title="Second Project", status="published")
+        Project.objects.create(title="Draft Project", status="draft")
+        self.entry = JournalEntry.objects.create(title="Snapshot Entry", status="published", featured_image=self.detail)
+        self.service = Service.objects.create(title="Snapshot Service", status="published", featured_image=self.cover)
+
+    def tearDown(self):
+        cache.clear()
+
+    def urls(self):
+        return [
+            (reverse('project-published'), {}),
+            (reverse('project-published'), {"cursor": "", "page_size": 1}),
+            (reverse('journalentry-published'), {}),
+            (reverse('service-published'), {}),
+            (reverse('project-by-slug'), {"slug": self.project.slug}),
+            (reverse('journalentry-by-slug'), {"slug": self.entry.slug}),
+            (reverse('service-by-slug'), {"slug": self.service.slug}),
+            (reverse('home'), {}),
+            (reverse('async-project-published'), {}),
+            (reverse('async-project-by-slug'), {"slug": self.project.slug}),
+        ]
+
+    def assertServedAsSerialized(self):
+        for url, params in self.urls():
+            with self.subTest(url=url, params=params):
+                stored = self.client.get(url, params)
+                with self.settings(SNAPSHOTS_ENABLED=False):
+                    serialized = self.client.get(url, params)
+                self.assertEqual(stored.status_code, 200)
+                self.assertEqual(stored.content, serialized.content)
+
+    def test_snapshots_match_serializers(self):
+        """Test that responses built from snapshots are byte-identical to the serialized ones."""
+        self.assertServedAsSerialized()
+
+    def test_published_list_reads_only_snapshots(self):
+        """Test that a published list served from snapshots joins no files."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('project-published'))
+        self.assertEqual(response.json()["results"][-1]["main_image"]["title"], "Cover")
+        sql = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertIn('"list_snapshot"', sql)
+        self.assertNotIn('"core_file"', sql)
+
+    def test_file_edits_refresh_snapshots(self):
+        """Test that editing or deleting a referenced file re-renders the rows embedding it."""
+        self.cover.title = "New Cover"
+        self.cover.save()
+        self.project.refresh_from_db()
+        self.assertEqual(json.loads(self.project.list_snapshot)["main_image"]["title"], "New Cover")
+        self.assertEqual(json.loads(self.project.detail_snapshot)["gallery_images"][0]["title"], "New Cover")
+        self.assertIn("New Cover", Service.objects.get(pk=self.service.pk).detail_snapshot)
+
+        self.detail.delete()
+        self.project.refresh_from_db()
+        self.assertEqual([image["title"] for image in json.loads(self.project.detail_snapshot)["gallery_images"]], ["New Cover"])
+        self.assertIsNone(json.loads(JournalEntry.objects.get(pk=self.entry.pk).list_snapshot)["featured_image"])
+        self.assertServedAsSerialized()
+
+    def test_gallery_changes_refresh_snapshots(self):
+        """Test that gallery edits from either side of the relation re-render the project."""
+        def gallery():
+            self.project.refresh_from_db()
+            return [image["id"] for image in json.loads(self.project.detail_snapshot)["gallery_images"]]
+
+        self.project.gallery_images.remove(self.cover)
+        self.assertEqual(gallery(), [self.detail.pk])
+        self.cover.project_gallery_images.add(self.project)
+        self.assertEqual(sorted(gallery()), sorted([self.cover.pk, self.detail.pk]))
+        self.detail.project_gallery_images.clear()
+        self.assertEqual(gallery(), [self.cover.pk])
+        self.assertServedAsSerialized()
+
+    def test_missing_snapshots_fall_back_to_serializers(self):
+        """Test that rows without snapshots are serialized, and that rebuild_snapshots fills them in."""
+        Project.objects.filter(pk=self.project.pk).update(list_snapshot=None, detail_snapshot=None)
+        self.assertServedAsSerialized()
+        call_command('rebuild_snapshots', stdout=StringIO())
+        self.project.refresh_from_db()
+        self.assertIsNotNone(self.project.list_snapshot)
+        self.assertServedAsSerialized()
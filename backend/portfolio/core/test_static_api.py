@@ -0,0 +1,213 @@
+import gzip
+import hashlib
+import io
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .cache import LOCK_KEY
+from .models import File, JournalEntry, Project, Service
+from .static_api import ExportQueue, Exporter, encode_query
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING_WORKERS=0)
+class StaticApiExportTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.client = APIClient()
+        for number in range(8):
+            Project.objects.create(
+                title=f"Project {number}", status="published", description="A project " * 40,
+                tech_stack=["Django", "C# & .NET"] if number % 2 else ["Vue"], tags=["web"],
+            )
+        self.project = Project.objects.get(title="Project 3")
+        JournalEntry.objects.create(title="Entry", status="published", tags=["notes"], tags_ar=["ملاحظات"])
+        Service.objects.create(title="Service", status="published")
+
+    def tearDown(self):
+        cache.clear()
+
+    def export(self, **kwargs):
+        return Exporter(root=self.root, base_url="http://localhost").export(**kwargs)
+
+    def assertExported(self, url, query):
+        name = f"{query or 'index'}.json"
+        path = self.root / url.strip("/") / name
+        self.assertTrue(path.exists(), path)
+        self.assertEqual(path.read_bytes(), self.client.get(f"{url}?{query}", HTTP_HOST="localhost").content)
+        return path
+
+    def test_exports_every_public_response(self):
+        """Test that pages per filter value, every slug, services and home are written as served."""
+        self.export()
+        published = reverse('project-published')
+        self.assertExported(published, "")
+        self.assertExported(published, "page=2")
+        self.assertFalse((self.root / published.strip("/") / "page=3.json").exists())
+        path = self.assertExported(published, encode_query([("page", 1), ("tech_stack", "C# & .NET")]))
+        self.assertEqual(path.name, "page=1&tech_stack=C%23%20%26%20.NET.json")
+        self.assertEqual(gzip.decompress(path.with_name(path.name + ".gz").read_bytes()), path.read_bytes())
+        self.assertExported(reverse('project-by-slug'), f"slug={self.project.slug}")
+        self.assertExported(reverse('journalentry-published'), encode_query([("page", 1), ("tag", "ملاحظات")]))
+        self.assertExported(reverse('service-published'), "")
+        self.assertExported(reverse('home'), "")
+
+    def test_rebuilds_only_rewrite_changed_files(self):
+        """Test that an unchanged rebuild writes nothing and that unpublished rows are removed."""
+        first = self.export()
+        self.assertEqual(self.export(), {"written": 0, "unchanged": first["written"], "removed": 0})
+
+        by_slug = self.root / reverse('project-by-slug').strip("/") / f"slug={self.project.slug}.json"
+        self.assertTrue(by_slug.exists())
+        self.project.status = "draft"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        stats = self.export(sections=["projects"])
+        self.assertFalse(by_slug.exists())
+        self.assertEqual(stats["removed"], 1)
+        self.assertGreater(stats["written"], 0)
+
+    def test_export_ignores_stale_cache_entries(self):
+        """Test that the export renders current rows while a public request holds the rebuild lock."""
+        published = reverse('project-published')
+        self.assertEqual(self.client.get(published, HTTP_HOST="localhost")["X-Cache"], "MISS")
+        self.project.title = "Renamed Project"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        cache.add(LOCK_KEY.format(namespace="project.published", digest=hashlib.sha1(b"localhost?").hexdigest()), 1)
+        stale = self.client.get(published, HTTP_HOST="localhost")
+        self.assertEqual(stale["X-Cache"], "STALE")
+        self.assertNotIn(b"Renamed Project", stale.content)
+
+        self.export(sections=["projects"])
+        self.assertIn(b"Renamed Project", (self.root / published.strip("/") / "index.json").read_bytes())
+
+    @override_settings(STATIC_API_EXPORT_ON_SAVE=True, STATIC_API_EXPORT_IN_BACKGROUND=False)
+    def test_export_on_save(self):
+        """Test that with STATIC_API_EXPORT_ON_SAVE a save re-exports its row after commit."""
+        with self.settings(STATIC_API_ROOT=self.root, STATIC_API_BASE_URL="http://localhost"):
+            with self.captureOnCommitCallbacks(execute=True):
+                Service.objects.create(title="Another Service", status="published")
+        self.assertIn(b"Another Service", (self.root / reverse('service-published').strip("/") / "index.json").read_bytes())
+        self.assertExported(reverse('home'), "")
+        self.assertFalse((self.root / reverse('project-published').strip("/")).exists())
+
+    def save_and_export(self, *instances):
+        """Save ``instances`` in one transaction with export on save; returns the rendered URLs."""
+        with mock.patch.object(Exporter, 'render', autospec=True, side_effect=Exporter.render) as render:
+            with self.settings(
+                STATIC_API_EXPORT_ON_SAVE=True, STATIC_API_EXPORT_IN_BACKGROUND=False,
+                STATIC_API_ROOT=self.root, STATIC_API_BASE_URL="http://localhost",
+            ):
+                with self.captureOnCommitCallbacks(execute=True):
+                    for instance in instances:
+                        instance.save()
+        return [f"{call.args[1]}?{call.args[2] if len(call.args) > 2 else ''}" for call in render.call_args_list]
+
+    def test_export_on_save_renders_only_what_the_row_touches(self):
+        """Test that a save re-renders its slug, the lists it appears on and home, and nothing else."""
+        self.export()
+        by_slug = reverse('project-by-slug')
+        self.project.title = "Renamed Project"
+        rendered = self.save_and_export(self.project)
+        self.assertEqual([url for url in rendered if url.startswith(by_slug)], [f"{by_slug}?slug={self.project.slug}"])
+        self.assertFalse([url for url in rendered if "Vue" in url or "journal" in url or "services" in url])
+        self.assertExported(by_slug, f"slug={self.project.slug}")
+        self.assertExported(reverse('project-published'), encode_query([("page", 1), ("tech_stack", "Django")]))
+        self.assertExported(reverse('home'), "")
+
+        old = self.root / by_slug.strip("/") / f"slug={self.project.slug}.json"
+        self.project.slug = "moved"
+        self.save_and_export(self.project)
+        self.assertFalse(old.exists())
+        self.assertExported(by_slug, "slug=moved")
+
+        self.project.status = "draft"
+        self.project.tech_stack = ["Vue"]
+        self.save_and_export(self.project)
+        self.assertFalse((self.root / by_slug.strip("/") / "slug=moved.json").exists())
+        # Its former filter pages are refreshed as well.
+        self.assertExported(reverse('project-published'), encode_query([("page", 1), ("tech_stack", "C# & .NET")]))
+
+        draft = Project(title="Never Published", status="draft")
+        self.assertEqual(self.save_and_export(draft), [])
+
+    def test_export_on_save_runs_once_per_transaction(self):
+        """Test that many saves in one transaction are exported together."""
+        projects = list(Project.objects.all())
+        for project in projects:
+            project.title += " (edited)"
+        with mock.patch.object(Exporter, 'export_rows', autospec=True) as export_rows:
+            self.save_and_export(*projects)
+        export_rows.assert_called_once()
+        self.assertEqual(export_rows.call_args.args[1], {Project: {project.pk for project in projects}})
+
+    def test_file_saves_export_only_their_dependents(self):
+        """Test that editing an unused file exports nothing and a used one only the rows showing it."""
+        unused = File.objects.create(title="Unused", file="uploads/unused.png")
+        cover = File.objects.create(title="Cover", file="uploads/cover.png")
+        self.project.main_image = cover
+        self.project.save()
+        self.export()
+
+        unused.title = "Still unused"
+        self.assertEqual(self.save_and_export(unused), [])
+        cover.title = "New cover"
+        rendered = self.save_and_export(cover)
+        by_slug = reverse('project-by-slug')
+        self.assertEqual([url for url in rendered if url.startswith(by_slug)], [f"{by_slug}?slug={self.project.slug}"])
+
+    def test_bulk_commands_export_once_at_the_end(self):
+        """Test that commands writing rows in bulk re-export everything after they finish."""
+        with self.settings(
+            STATIC_API_EXPORT_ON_SAVE=True, STATIC_API_ROOT=self.root, STATIC_API_BASE_URL="http://localhost",
+        ):
+            out = io.StringIO()
+            call_command('generate_dataset', files=0, services=0, projects=3, journal_entries=0, stdout=out)
+            self.assertIn("Static API: wrote", out.getvalue())
+            generated = Project.objects.exclude(pk__in=[self.project.pk]).filter(status="published").last()
+            self.assertExported(reverse('project-by-slug'), f"slug={generated.slug}")
+            self.assertExported(reverse('home'), "")
+
+            Project.objects.filter(pk=self.project.pk).update(detail_snapshot=None)
+            call_command('rebuild_snapshots', stdout=io.StringIO())
+            self.assertExported(reverse('project-by-slug'), f"slug={self.project.slug}")
+
+    def test_export_queue_merges_changes_during_an_export(self):
+        """Test that changes queued while the export thread works are exported together afterwards."""
+        started, release = threading.Event(), threading.Event()
+        exported = []
+
+        def export(changes):
+            exported.append(changes)
+            started.set()
+            release.wait(5)
+
+        queue = ExportQueue()
+        with mock.patch("portfolio.core.static_api.export_changes", side_effect=export):
+            queue.add({Project: [1]})
+            self.assertTrue(started.wait(5))
+            queue.add({Project: [2]})
+            queue.add({Project: [2], Service: [3]})
+            thread = queue._thread
+            release.set()
+            thread.join(5)
+        self.assertEqual(exported, [{Project: {1}}, {Project: {2}, Service: {3}}])
+        self.assertIsNone(queue._thread)
@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from .models import JournalEntry, JournalEntryTag, Project, ProjectTag, Tag
+from .tags import sync_tags
+
+
+class TagSyncTest(TestCase):
+    def test_links_follow_json_fields(self):
+        """Test that tag links are created, updated and removed on save."""
+        project = Project.objects.create(
+            title="Tagged", tags=["web", "web", " api "], tech_stack=["Django"]
+        )
+        self.assertEqual(
+            set(project.tag_links.values_list('tag__name', 'kind')),
+            {('web', 'tag'), ('api', 'tag'), ('Django', 'tech')},
+        )
+
+        project.tags = ["api"]
+        project.tech_stack = None
+        project.save()
+        self.assertEqual(set(project.tag_links.values_list('tag__name', 'kind')), {('api', 'tag')})
+
+    def test_tags_are_shared_between_models(self):
+        """Test that the same name maps to a single Tag row."""
+        Project.objects.create(title="Project", tags=["shared"])
+        JournalEntry.objects.create(title="Entry", tags=["shared"], tags_ar=["مشترك"])
+        self.assertEqual(Tag.objects.filter(name="shared").count(), 1)
+        self.assertEqual(JournalEntryTag.objects.filter(language='ar').count(), 1)
+
+    def test_bulk_sync_uses_constant_queries(self):
+        """Test that syncing many rows does not issue a query per row."""
+        projects = Project.objects.bulk_create(
+            [Project(title=f"Bulk {i}", slug=f"bulk-{i}", tags=[f"t{i}", "bulk"]) for i in range(20)]
+        )
+        with self.assertNumQueries(5):
+            sync_tags(Project, projects)
+        self.assertEqual(ProjectTag.objects.filter(tag__name="bulk").count(), 20)
+
+
+class TagFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Project.objects.create(
+            title="Django Site", status="published", tags=["web"], tech_stack=["Django"]
+        )
+        Project.objects.create(
+            title="React App", status="published", tags=["web", "spa"], tech_stack=["React"]
+        )
+        JournalEntry.objects.create(title="Arabic", status="published", tags_ar=["تقنية"])
+
+    def titles(self, url):
+        return sorted(item['title'] for item in self.client.get(url).json()['results'])
+
+    def test_tag_and_tech_stack_filters(self):
+        """Test that ?tag= and ?tech_stack= filter through the tag tables."""
+        url = reverse('project-published')
+        self.assertEqual(self.titles(f"{url}?tag=web"), ["Django Site", "React App"])
+        self.assertEqual(self.titles(f"{url}?tag=spa"), ["React App"])
+        self.assertEqual(self.titles(f"{url}?tech_stack=Django"), ["Django Site"])
+        self.assertEqual(self.titles(f"{url}?tag=Django"), [])
+
+    def test_journal_tag_filter_matches_arabic_tags(self):
+        """Test that journal entries can be filtered by their Arabic tags."""
+        url = reverse('journalentry-published')
+        self.assertEqual(self.titles(f"{url}?tag=تقنية"), ["Arabic"])
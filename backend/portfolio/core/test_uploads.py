@@ -0,0 +1,140 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .models import File, UploadSession
+from .uploads import UploadError, finalize_upload, temp_path
+
+UPLOAD_DIR = tempfile.mkdtemp()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(UPLOAD_SESSION_DIR=UPLOAD_DIR, MEDIA_ROOT=MEDIA_ROOT, IMAGE_PROCESSING_WORKERS=0)
+class ChunkedUploadTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(UPLOAD_DIR, ignore_errors=True)
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="uploader", password="password")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.content = os.urandom(25_000)
+
+    def initiate(self, **extra):
+        data = {"filename": "../clip.mp4", "size": len(self.content), "title": "Clip"}
+        data.update(extra)
+        response = self.client.post(reverse('upload-list'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def put_chunk(self, session_id, start, end, body=None):
+        return self.client.put(
+            reverse('upload-detail', args=[session_id]),
+            data=self.content[start:end + 1] if body is None else body,
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.content)}',
+        )
+
+    def test_chunks_are_assembled_on_finalize(self):
+        """Test the initiate, append, resume and finalize round trip."""
+        session_id = self.initiate(sha256=hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(self.put_chunk(session_id, 0, 9_999).data['offset'], 10_000)
+        self.assertEqual(self.put_chunk(session_id, 10_000, 19_999).data['offset'], 20_000)
+        self.assertFalse(File.objects.exists())
+
+        response = self.client.get(reverse('upload-detail', args=[session_id]))
+        self.assertEqual(response.data['offset'], 20_000)
+        self.put_chunk(session_id, 20_000, len(self.content) - 1)
+
+        response = self.client.post(reverse('upload-finalize', args=[session_id]))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        file = File.objects.get(pk=response.data['id'])
+        self.assertEqual(file.title, "Clip")
+        self.assertEqual(file.filesize, len(self.content))
+        self.assertTrue(file.file.name.endswith(".mp4"))
+        self.assertNotIn("..", file.file.name)
+        with file.file.open('rb') as handle:
+            self.assertEqual(handle.read(), self.content)
+        self.assertEqual(UploadSession.objects.get(pk=session_id).status, 'complete')
+
+    def test_out_of_order_chunk_is_rejected(self):
+        """Test that a chunk must start at the current offset."""
+        session_id = self.initiate()
+        response = self.put_chunk(session_id, 10_000, 19_999)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 0)
+
+    def test_interrupted_chunk_can_be_retried(self):
+        """Test that a short chunk is discarded and the offset stays put."""
+        session_id = self.initiate()
+        self.put_chunk(session_id, 0, 9_999)
+        response = self.put_chunk(session_id, 10_000, 19_999, body=self.content[10_000:15_000])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['offset'], 10_000)
+        self.assertEqual(os.path.getsize(temp_path(UploadSession.objects.get(pk=session_id))), 10_000)
+
+        self.assertEqual(self.put_chunk(session_id, 10_000, 19_999).data['offset'], 20_000)
+
+    def test_incomplete_or_corrupt_uploads_are_not_finalized(self):
+        """Test that finalize checks both the size and the checksum."""
+        session_id = self.initiate(sha256="0" * 64)
+        self.put_chunk(session_id, 0, 9_999)
+        response = self.client.post(reverse('upload-finalize', args=[session_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.put_chunk(session_id, 10_000, len(self.content) - 1)
+        response = self.client.post(reverse('upload-finalize', args=[session_id]))
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(File.objects.exists())
+
+    def test_losing_finalize_drops_its_copy(self):
+        """Test that a finalize racing a completed one stores nothing."""
+        session_id = self.initiate()
+        self.put_chunk(session_id, 0, len(self.content) - 1)
+        stale = UploadSession.objects.get(pk=session_id)
+        with self.captureOnCommitCallbacks(execute=False):
+            file = finalize_upload(UploadSession.objects.get(pk=session_id))
+        stored = sorted(os.listdir(os.path.dirname(file.file.path)))
+
+        with self.assertRaises(UploadError) as raised:
+            finalize_upload(stale)
+        self.assertEqual(raised.exception.status, 409)
+        self.assertEqual(File.objects.count(), 1)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(file.file.path))), stored)
+
+    def test_sessions_are_private(self):
+        """Test that uploads need a login and are only visible to their owner."""
+        session_id = self.initiate()
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username="other", password="password"))
+        response = other.get(reverse('upload-detail', args=[session_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = APIClient().post(reverse('upload-list'), {"filename": "a.jpg", "size": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cleanup_removes_expired_sessions(self):
+        """Test that abandoned sessions and their temp files are removed."""
+        session_id = self.initiate()
+        self.put_chunk(session_id, 0, 9_999)
+        path = temp_path(UploadSession.objects.get(pk=session_id))
+        UploadSession.objects.filter(pk=session_id).update(updated_at=timezone.now() - timedelta(days=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('cleanup_upload_sessions', stdout=StringIO())
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertFalse(os.path.exists(path))
@@ -0,0 +1,182 @@
+"""
+Resumable chunked uploads.
+
+The protocol has three steps, all under ``/api/uploads/``:
+
+1. ``POST`` with ``filename`` and ``size`` opens an ``UploadSession``.
+2. ``PUT /<id>/`` with ``Content-Range: bytes <start>-<end>/<size>`` appends
+   one chunk. Chunks must arrive in order; ``GET /<id>/`` returns the current
+   ``offset`` so an interrupted client knows where to resume.
+3. ``POST /<id>/finalize/`` checks the size and SHA-256, copies the temp file
+   into storage and creates the ``File`` row; the temp file is removed once
+   that commits.
+
+Chunks are streamed from the request to the temp file in small blocks, and
+the checksum is computed the same way, so memory use does not depend on the
+file size.
+"""
+
+import hashlib
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File as DjangoFile
+from django.db import transaction
+from django.utils import timezone
+
+BLOCK_SIZE = 64 * 1024
+
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(Exception):
+    """A chunk or finalize request that cannot be applied to the session."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def upload_dir():
+    return getattr(settings, 'UPLOAD_SESSION_DIR', os.path.join(settings.BASE_DIR, 'tmp', 'uploads'))
+
+
+def temp_path(session):
+    return os.path.join(upload_dir(), f'{session.pk}.part')
+
+
+def parse_content_range(header, size):
+    """Return ``(start, length)`` of a ``Content-Range`` header for a ``size`` byte upload."""
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise UploadError('Content-Range must look like "bytes <start>-<end>/<size>"')
+    start, end, total = (int(group) for group in match.groups())
+    if total != size or end < start or end >= size:
+        raise UploadError('Content-Range does not fit the upload', status=416)
+    return start, end - start + 1
+
+
+def append_chunk(session, stream, content_range):
+    """
+    Append one chunk read from ``stream`` to the session's temp file.
+
+    The session row is locked while writing so two requests can never append
+    at the same offset. A chunk that arrives short is discarded whole and the
+    client resumes from the unchanged offset.
+    """
+    from .models import UploadSession
+
+    start, length = parse_content_range(content_range, session.size)
+    if length > getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 16 * 1024 ** 2):
+        raise UploadError('Chunk is too large', status=413)
+
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session.pk)
+        if session.status != 'pending':
+            raise UploadError('Upload is already finalized', status=409)
+        if start != session.received:
+            raise UploadError(f'Expected a chunk starting at byte {session.received}', status=409)
+
+        path = temp_path(session)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if start and (not os.path.exists(path) or os.path.getsize(path) < start):
+            raise UploadError('Partial upload was lost; restart the upload', status=410)
+        with open(path, 'ab') as handle:
+            # Drop bytes of an earlier chunk that failed after writing.
+            handle.truncate(start)
+            remaining = length
+            while remaining:
+                block = stream.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                handle.write(block)
+                remaining -= len(block)
+            if remaining:
+                handle.truncate(start)
+                raise UploadError('Chunk ended before Content-Range')
+
+        session.received = start + length
+        session.save(update_fields=['received', 'updated_at'])
+    return session
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check_finalizable(session):
+    if session.status != 'pending':
+        raise UploadError('Upload is already finalized', status=409)
+    if session.received != session.size:
+        raise UploadError(f'Upload is incomplete: {session.received} of {session.size} bytes')
+
+
+def finalize_upload(session):
+    """
+    Verify the upload and turn it into a ``File``; returns the new row.
+
+    Hashing and copying read the whole file, so both happen before the
+    session row is locked: a complete upload accepts no more chunks, so its
+    temp file cannot change underneath. The lock only guards flipping the
+    status and creating the row; a finalize that loses the race drops its
+    copy again.
+    """
+    from .models import File, UploadSession
+
+    check_finalizable(session)
+    path = temp_path(session)
+    if session.sha256 and file_sha256(path) != session.sha256.lower():
+        raise UploadError('Checksum mismatch; restart the upload', status=422)
+
+    file = File(
+        title=session.title,
+        description=session.description,
+        filesize=session.size,
+        mime_type=session.content_type,
+    )
+    with open(path, 'rb') as handle:
+        file.file.save(session.filename, DjangoFile(handle), save=False)
+    file.filename_disk = os.path.basename(file.file.name)
+
+    try:
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+            check_finalizable(session)
+            file.save()
+            session.status = 'complete'
+            session.file = file
+            session.save(update_fields=['status', 'file', 'updated_at'])
+            transaction.on_commit(lambda: discard_temp_file(path))
+    except BaseException:
+        file.file.delete(save=False)
+        raise
+    return file
+
+
+def discard_temp_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def delete_session(session):
+    """Abort an upload: drop its temp file and its row."""
+    path = temp_path(session)
+    session.delete()
+    transaction.on_commit(lambda: discard_temp_file(path))
+
+
+def expired_sessions(now=None):
+    """Return the pending sessions idle for longer than the expiry."""
+    from .models import UploadSession
+
+    hours = getattr(settings, 'UPLOAD_SESSION_EXPIRY_HOURS', 24)
+    cutoff = (now or timezone.now()) - timedelta(hours=hours)
+    return UploadSession.objects.filter(status='pending', updated_at__lt=cutoff)
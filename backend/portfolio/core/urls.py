@@ -1,11 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import FileViewSet, ProjectViewSet, JournalEntryViewSet, ServiceViewSet
+from .views import (
+    FileViewSet, ProjectViewSet, JournalEntryViewSet, ServiceViewSet, UploadSessionViewSet,
+    HomeBundleView, cache_stats, metrics
+)
 from .auth_views import login, current_user
+from .media import serve_file
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
 router.register(r'files', FileViewSet)
+router.register(r'uploads', UploadSessionViewSet, basename='upload')
 router.register(r'projects', ProjectViewSet)
 router.register(r'journal-entries', JournalEntryViewSet)
 router.register(r'services', ServiceViewSet)
@@ -13,7 +18,14 @@ router.register(r'services', ServiceViewSet)
 # The API URLs are now determined automatically by the router
 urlpatterns = [
     path('', include(router.urls)),
+    # Homepage sections in one response
+    path('home/', HomeBundleView.as_view(), name='home'),
+    # Async (ASGI) read path for the public site, see async_views.py
+    path('async/', include('portfolio.core.async_views')),
+    path('files/<int:pk>/content', serve_file, name='file_content'),
     # Authentication endpoints that mimic Directus API
     path('auth/login', login, name='auth_login'),
     path('users/me', current_user, name='current_user'),
+    path('cache/stats', cache_stats, name='cache_stats'),
+    path('internal/metrics', metrics, name='metrics'),
 ]
@@ -1,39 +1,167 @@
-from rest_framework import viewsets, filters, pagination
-from rest_framework.decorators import action
+import copy
+from io import BytesIO
+
+from rest_framework import filters, mixins, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.conf import settings
+from django.http import Http404, HttpResponse, QueryDict
 from django.shortcuts import get_object_or_404
-from .models import File, Project, JournalEntry, Service
+from .cache import cached_response, response_cache
+from .conditional import ConditionalGetMixin, compute_combined_validators, conditional_get
+from .fieldsets import SparseFieldsViewMixin
+from .metrics import render_metrics
+from .pagination import KeysetPageNumberPagination
+from .renderers import RawJSON
+from .rows import RowSerializer
+from .search import FullTextSearchFilter
+from .snapshots import collect_snapshots, snapshot_values, snapshots_enabled
+from .tags import tagged_ids
+from .uploads import UploadError, append_chunk, delete_session, finalize_upload
+from .models import File, Project, JournalEntry, Service, UploadSession
 from .serializers import (
     FileSerializer, 
     ProjectSerializer, ProjectListSerializer,
     JournalEntrySerializer, JournalEntryListSerializer,
-    ServiceSerializer, ServiceListSerializer
+    ServiceSerializer, ServiceListSerializer,
+    UploadSessionSerializer
 )
 
-class JournalPagination(pagination.PageNumberPagination):
+class RowListMixin:
+    """Render list actions from `values()` rows instead of model instances (see `core/rows.py`)."""
+
+    # Actions whose columns come from `values()` rather than `shape_queryset`
+    row_actions = ('list', 'published')
+
+    def list_rows(self, queryset, serializer_class, context=None, paginate=True, snapshot=None):
+        """
+        Return the list response `serializer_class` would produce for `queryset`.
+
+        With `snapshot`, the name of a pre-rendered column (see `core/snapshots.py`),
+        the items are read from it when the context allows.
+        """
+        if snapshot and self.snapshots_apply(context or {}):
+            response = self.list_snapshots(queryset, snapshot, paginate)
+            if response is not None:
+                return response
+        rows = RowSerializer.for_serializer(serializer_class, context)
+        queryset = rows.values(queryset)
+        if paginate:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(rows.data(page))
+        return Response(rows.data(queryset))
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.list_rows(queryset, self.get_serializer_class(), self.get_serializer_context())
+
+    def snapshots_apply(self, context):
+        """Whether the snapshots hold the output for `context`: no request (relative file URLs), no selection."""
+        return snapshots_enabled() and 'request' not in context and context.get('fieldset') is None
+
+    def list_snapshots(self, queryset, column, paginate=True):
+        """Return the list response from the `column` snapshots, or None when a row has none yet."""
+        rows = snapshot_values(queryset, column)
+        page = self.paginate_queryset(rows) if paginate else None
+        data = collect_snapshots(rows if page is None else page, column)
+        if data is None:
+            return None
+        return Response(data) if page is None else self.get_paginated_response(data)
+
+    def get_snapshot(self, queryset, **lookup):
+        """Return the stored detail of the row matching `lookup`, or None to serialize it."""
+        if not self.snapshots_apply(self.get_fieldset_context()):
+            return None
+        snapshot = queryset.filter(**lookup).prefetch_related(None).values_list('detail_snapshot', flat=True).first()
+        return None if snapshot is None else RawJSON(snapshot)
+
+class JournalPagination(KeysetPageNumberPagination):
     """Custom pagination class for journal entries."""
     page_size = 6
     page_size_query_param = 'page_size'
     max_page_size = 12
 
-class FileViewSet(viewsets.ModelViewSet):
+class FileViewSet(ConditionalGetMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     """ViewSet for the File model."""
     queryset = File.objects.all()
     serializer_class = FileSerializer
+    conditional_models = (File,)
+    # Safe reads may be served by a replica (see `core/replicas.py`)
+    replica_reads = True
 
-class ProjectPagination(pagination.PageNumberPagination):
+    def get_queryset(self):
+        return self.shape_queryset(super().get_queryset())
+
+class UploadSessionViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Resumable chunked uploads that end in a File (see `core/uploads.py`).
+
+    POST opens a session, PUT appends a `Content-Range` chunk, GET reports the
+    offset to resume from, `finalize` creates the File and DELETE aborts.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Users only see their own uploads; staff see all of them."""
+        queryset = UploadSession.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+    def perform_destroy(self, instance):
+        delete_session(instance)
+
+    def update(self, request, pk=None):
+        """Append the chunk in the request body."""
+        session = self.get_object()
+        try:
+            session = append_chunk(
+                session, request.stream or BytesIO(), request.headers.get('Content-Range')
+            )
+        except UploadError as error:
+            session.refresh_from_db()
+            return Response({'error': str(error), 'offset': session.received}, status=error.status)
+        return Response(self.get_serializer(session).data)
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Verify the upload and create its File."""
+        session = self.get_object()
+        try:
+            file = finalize_upload(session)
+        except UploadError as error:
+            return Response({'error': str(error)}, status=error.status)
+        return Response(FileSerializer(file, context=self.get_serializer_context()).data, status=201)
+
+class ProjectPagination(KeysetPageNumberPagination):
     """Custom pagination class for projects."""
     page_size = 6
     page_size_query_param = 'page_size'
     max_page_size = 12
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(ConditionalGetMixin, SparseFieldsViewMixin, RowListMixin, viewsets.ModelViewSet):
     """ViewSet for the Project model."""
     queryset = Project.objects.all()
+    conditional_models = (Project, File)
+    # Safe reads may be served by a replica (see `core/replicas.py`)
+    replica_reads = True
     serializer_class = ProjectSerializer
     lookup_field = 'slug'
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description', 'category', 'tech_stack', 'tags']
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['created_at', 'updated_at', 'title', 'sort']
     ordering = ['-created_at']
     pagination_class = ProjectPagination
@@ -46,77 +174,81 @@ class ProjectViewSet(viewsets.ModelViewSet):
         tag = self.request.query_params.get('tag')
         category = self.request.query_params.get('category')
 
-        print("get_queryset called with status:", status, "tech_stack:", tech_stack, "tag:", tag, "category:", category)
-        print("Initial queryset count:", queryset.count())
-
         if status:
             queryset = queryset.filter(status=status)
-            print("After status filter, queryset count:", queryset.count())
 
         if tech_stack:
-            # Filter by tech_stack (JSONField contains)
-            queryset = queryset.filter(tech_stack__contains=[tech_stack])
-            print("After tech_stack filter, queryset count:", queryset.count())
+            # Filter by tech_stack through the indexed tag links
+            queryset = queryset.filter(pk__in=tagged_ids(Project, tech_stack, ['tech']))
 
         if tag:
-            # Filter by tag (JSONField contains)
-            queryset = queryset.filter(tags__contains=[tag])
-            print("After tag filter, queryset count:", queryset.count())
+            # Filter by tag through the indexed tag links
+            queryset = queryset.filter(pk__in=tagged_ids(Project, tag, ['tag']))
 
         if category:
             # Filter by category
             queryset = queryset.filter(category__icontains=category)
-            print("After category filter, queryset count:", queryset.count())
 
-        return queryset
+        return self.shape_queryset(queryset)
 
     def get_serializer_class(self):
         """Return appropriate serializer class based on action."""
-        if self.action == 'list':
+        if self.action in ('list', 'published'):
             return ProjectListSerializer
         return ProjectSerializer
 
-    @action(detail=False, methods=['get'])
-    def published(self, request):
-        """Return only published projects."""
-        print("Published action called with query params:", request.query_params)
-
+    def get_published_queryset(self):
+        """Return the queryset served by the `published` action."""
         # Get the queryset from get_queryset, which will apply any filters from query_params
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
 
         # Filter by status='published' if not already filtered by status
-        if 'status' not in request.query_params:
+        if 'status' not in self.request.query_params:
             queryset = queryset.filter(status='published')
+        return queryset
 
-        print("Queryset count:", queryset.count())
-
-        # Use pagination
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = ProjectListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    def get_conditional_queryset(self):
+        """Return the rows the current action serializes, for validator computation."""
+        if self.action == 'published':
+            return self.get_published_queryset()
+        if self.action == 'by_slug':
+            return Project.objects.filter(slug=self.request.query_params.get('slug'), status='published')
+        return super().get_conditional_queryset()
 
-        serializer = ProjectListSerializer(queryset, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=['get'])
+    @cached_response(Project, File)
+    @conditional_get
+    def published(self, request):
+        """Return only published projects."""
+        return self.list_rows(
+            self.get_published_queryset(), ProjectListSerializer, self.get_fieldset_context(), snapshot='list_snapshot',
+        )
 
     @action(detail=False, methods=['get'])
+    @conditional_get
     def by_slug(self, request):
         """Get a project by its slug."""
         slug = request.query_params.get('slug')
         if not slug:
             return Response({'error': 'Slug parameter is required'}, status=400)
 
-        project = get_object_or_404(Project, slug=slug, status='published')
-        serializer = ProjectSerializer(project)
+        snapshot = self.get_snapshot(self.get_queryset(), slug=slug, status='published')
+        if snapshot is not None:
+            return Response(snapshot)
+
+        project = get_object_or_404(self.get_queryset(), slug=slug, status='published')
+        serializer = ProjectSerializer(project, context=self.get_fieldset_context())
         return Response(serializer.data)
 
-class JournalEntryViewSet(viewsets.ModelViewSet):
+class JournalEntryViewSet(ConditionalGetMixin, SparseFieldsViewMixin, RowListMixin, viewsets.ModelViewSet):
     """ViewSet for the JournalEntry model."""
     queryset = JournalEntry.objects.all()
+    conditional_models = (JournalEntry, File)
+    # Safe reads may be served by a replica (see `core/replicas.py`)
+    replica_reads = True
     serializer_class = JournalEntrySerializer
     lookup_field = 'slug'
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'excerpt', 'content_rich_text', 'tags']
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['publication_date', 'created_at', 'updated_at', 'title', 'sort']
     ordering = ['-publication_date', '-created_at']
     pagination_class = JournalPagination
@@ -127,63 +259,70 @@ class JournalEntryViewSet(viewsets.ModelViewSet):
         status = self.request.query_params.get('status')
         tag = self.request.query_params.get('tag')
 
-        print("get_queryset called with status:", status, "and tag:", tag)
-        print("Initial queryset count:", queryset.count())
-
         if status:
             queryset = queryset.filter(status=status)
-            print("After status filter, queryset count:", queryset.count())
 
         if tag:
-            # Filter by tag (JSONField contains)
-            queryset = queryset.filter(tags__contains=[tag])
-            print("After tag filter, queryset count:", queryset.count())
+            # Filter by English or Arabic tag through the indexed tag links
+            queryset = queryset.filter(pk__in=tagged_ids(JournalEntry, tag))
 
-        return queryset
+        return self.shape_queryset(queryset)
 
     def get_serializer_class(self):
         """Return appropriate serializer class based on action."""
-        if self.action == 'list':
+        if self.action in ('list', 'published'):
             return JournalEntryListSerializer
         return JournalEntrySerializer
 
-    @action(detail=False, methods=['get'])
-    def published(self, request):
-        """Return only published journal entries."""
-        print("Published action called with query params:", request.query_params)
-
+    def get_published_queryset(self):
+        """Return the queryset served by the `published` action."""
         # Get the queryset from get_queryset, which will apply any filters from query_params
-        queryset = self.get_queryset()
+        queryset = self.filter_queryset(self.get_queryset())
 
         # Filter by status='published' if not already filtered by status
-        if 'status' not in request.query_params:
+        if 'status' not in self.request.query_params:
             queryset = queryset.filter(status='published')
+        return queryset
 
-        print("Queryset count:", queryset.count())
-
-        # Use pagination
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = JournalEntryListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+    def get_conditional_queryset(self):
+        """Return the rows the current action serializes, for validator computation."""
+        if self.action == 'published':
+            return self.get_published_queryset()
+        if self.action == 'by_slug':
+            return JournalEntry.objects.filter(slug=self.request.query_params.get('slug'), status='published')
+        return super().get_conditional_queryset()
 
-        serializer = JournalEntryListSerializer(queryset, many=True)
-        return Response(serializer.data)
+    @action(detail=False, methods=['get'])
+    @cached_response(JournalEntry, File)
+    @conditional_get
+    def published(self, request):
+        """Return only published journal entries."""
+        return self.list_rows(
+            self.get_published_queryset(), JournalEntryListSerializer, self.get_fieldset_context(), snapshot='list_snapshot',
+        )
 
     @action(detail=False, methods=['get'])
+    @conditional_get
     def by_slug(self, request):
         """Get a journal entry by its slug."""
         slug = request.query_params.get('slug')
         if not slug:
             return Response({'error': 'Slug parameter is required'}, status=400)
 
-        entry = get_object_or_404(JournalEntry, slug=slug, status='published')
-        serializer = JournalEntrySerializer(entry)
+        snapshot = self.get_snapshot(self.get_queryset(), slug=slug, status='published')
+        if snapshot is not None:
+            return Response(snapshot)
+
+        entry = get_object_or_404(self.get_queryset(), slug=slug, status='published')
+        serializer = JournalEntrySerializer(entry, context=self.get_fieldset_context())
         return Response(serializer.data)
 
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ConditionalGetMixin, SparseFieldsViewMixin, RowListMixin, viewsets.ModelViewSet):
     """ViewSet for the Service model."""
     queryset = Service.objects.all()
+    conditional_models = (Service, File)
+    # Safe reads may be served by a replica (see `core/replicas.py`)
+    replica_reads = True
     serializer_class = ServiceSerializer
     lookup_field = 'slug'
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -197,28 +336,136 @@ class ServiceViewSet(viewsets.ModelViewSet):
         status = self.request.query_params.get('status')
         if status:
             queryset = queryset.filter(status=status)
-        return queryset
+        return self.shape_queryset(queryset)
 
     def get_serializer_class(self):
         """Return appropriate serializer class based on action."""
-        if self.action == 'list':
+        if self.action in ('list', 'published'):
             return ServiceListSerializer
         return ServiceSerializer
 
+    def get_published_queryset(self):
+        """Return the queryset served by the `published` action."""
+        return self.get_queryset().filter(status='published')
+
+    def get_conditional_queryset(self):
+        """Return the rows the current action serializes, for validator computation."""
+        if self.action == 'published':
+            return self.get_published_queryset()
+        if self.action == 'by_slug':
+            return Service.objects.filter(slug=self.request.query_params.get('slug'), status='published')
+        return super().get_conditional_queryset()
+
     @action(detail=False, methods=['get'])
+    @conditional_get
     def published(self, request):
         """Return only published services."""
-        queryset = self.get_queryset().filter(status='published')
-        serializer = ServiceListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.list_rows(
+            self.get_published_queryset(), ServiceListSerializer, self.get_fieldset_context(),
+            paginate=False, snapshot='list_snapshot',
+        )
 
     @action(detail=False, methods=['get'])
+    @conditional_get
     def by_slug(self, request):
         """Get a service by its slug."""
         slug = request.query_params.get('slug')
         if not slug:
             return Response({'error': 'Slug parameter is required'}, status=400)
 
-        service = get_object_or_404(Service, slug=slug, status='published')
-        serializer = ServiceSerializer(service)
+        snapshot = self.get_snapshot(self.get_queryset(), slug=slug, status='published')
+        if snapshot is not None:
+            return Response(snapshot)
+
+        service = get_object_or_404(self.get_queryset(), slug=slug, status='published')
+        serializer = ServiceSerializer(service, context=self.get_fieldset_context())
         return Response(serializer.data)
+
+class HomeBundleView(APIView):
+    """
+    The homepage in one round trip: top projects by `sort`, the latest journal
+    entries and the services, all published.
+
+    `?projects=`, `?journal_entries=` and `?services=` set how many rows each
+    section holds (`0` leaves it empty). Sections are built from their
+    viewset's `published` queryset, so filtering rules stay in one place, and
+    the bundle has a single ETag and response cache entry.
+    """
+    # (name, viewset, serializer, ordering, default size; None is every row)
+    sections = (
+        ('projects', ProjectViewSet, ProjectListSerializer, ('sort', '-created_at'), 6),
+        ('journal_entries', JournalEntryViewSet, JournalEntryListSerializer, None, 3),
+        ('services', ServiceViewSet, ServiceListSerializer, None, None),
+    )
+    max_section_size = 24
+    conditional_models = (Project, JournalEntry, Service, File)
+    # Safe reads may be served by a replica (see `core/replicas.py`)
+    replica_reads = True
+    # Response cache namespace (see `cached_response`)
+    basename = 'home'
+    action = 'bundle'
+
+    def get_section_size(self, name, default):
+        value = self.request.query_params.get(name, '').strip()
+        if not value:
+            return default
+        if not value.isdigit():
+            raise ValidationError({name: 'Expected a whole number.'})
+        return min(int(value), self.max_section_size)
+
+    def get_section_viewset(self, viewset_class):
+        """Return `viewset_class` set up for `published`, without this request's query string."""
+        request = copy.copy(self.request._request)
+        request.GET = QueryDict()
+        viewset = viewset_class(action='published', args=(), kwargs={}, format_kwarg=None)
+        viewset.request = Request(request)
+        return viewset
+
+    def get_sections(self):
+        """Return `(name, serializer_class, queryset)` per section, querysets sliced to size."""
+        sections = []
+        for name, viewset_class, serializer_class, ordering, default in self.sections:
+            size = self.get_section_size(name, default)
+            queryset = self.get_section_viewset(viewset_class).get_published_queryset()
+            if ordering:
+                queryset = queryset.order_by(*ordering)
+            sections.append((name, serializer_class, queryset, size))
+        return sections
+
+    def get_validators(self, request):
+        querysets = [queryset[:size] for _, _, queryset, size in self.get_sections()]
+        return compute_combined_validators('home', querysets, request.query_params, self.conditional_models)
+
+    @cached_response(Project, JournalEntry, Service, File)
+    @conditional_get
+    def get(self, request):
+        data = {}
+        for name, serializer_class, queryset, size in self.get_sections():
+            if size == 0:
+                data[name] = []
+                continue
+            if snapshots_enabled():
+                data[name] = collect_snapshots(snapshot_values(queryset, 'list_snapshot')[:size], 'list_snapshot')
+                if data[name] is not None:
+                    continue
+            rows = RowSerializer.for_serializer(serializer_class)
+            data[name] = rows.data(rows.values(queryset)[:size])
+        return Response(data)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    """Return the response cache counters of the worker serving the request."""
+    return Response(response_cache.stats())
+
+
+def metrics(request):
+    """
+    Expose request metrics in Prometheus text format.
+
+    Only reachable from ``INTERNAL_IPS``; anything else gets a 404 so the
+    endpoint does not advertise itself.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
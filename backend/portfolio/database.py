@@ -0,0 +1,101 @@
+"""
+``DATABASES['default']`` for the three connection modes.
+
+``DATABASE_CONNECTIONS`` picks how workers hold PostgreSQL connections:
+
+* ``persistent`` (default): one connection per worker thread, kept for
+  ``DATABASE_CONN_MAX_AGE`` seconds and health-checked before each request
+  reuses it, so a Postgres restart costs one failed check, not a failed
+  request. Under ASGI every request runs in a new thread and gets a new
+  connection, which is what ``pool`` fixes.
+* ``pool``: a psycopg 3 connection pool per worker process (Django's native
+  pool support), ``DATABASE_POOL_MIN_SIZE``..``DATABASE_POOL_MAX_SIZE``
+  connections checked when taken from the pool. Requires ``psycopg[pool]``.
+* ``per-request``: connect and disconnect around every request (Django's
+  ``CONN_MAX_AGE=0``), the baseline ``benchmarks/db_connections.py`` compares
+  against.
+
+``DATABASE_PREPARE_THRESHOLD`` (psycopg 3 only) turns on server-side binding
+and prepares a query once it has run that many times on a connection, so hot
+queries such as the ``published`` pages skip planning. Prepared statements
+live on the connection, so they pay off with ``persistent`` and ``pool``.
+SQLite URLs (tests, local runs) ignore all of this.
+
+``DATABASE_REPLICA_URLS`` (comma-separated) adds read replicas as
+``replica_1``, ``replica_2``... with the same connection mode; see
+``core/replicas.py`` for what is routed to them.
+"""
+
+import os
+
+import dj_database_url
+import django
+from django.core.exceptions import ImproperlyConfigured
+
+CONNECTION_MODES = ('persistent', 'pool', 'per-request')
+
+
+def default_url():
+    return (
+        f"postgres://{os.getenv('POSTGRES_USER', 'postgres')}:"
+        f"{os.getenv('POSTGRES_PASSWORD', 'postgres')}@"
+        f"{os.getenv('POSTGRES_HOST', 'postgres')}:"
+        f"{os.getenv('POSTGRES_PORT', '5432')}/"
+        f"{os.getenv('POSTGRES_DB', 'portfolio')}"
+    )
+
+
+def pool_options():
+    """Keyword arguments for psycopg_pool's ``ConnectionPool``."""
+    if django.VERSION < (5, 1):
+        # Older versions hand the unknown ``pool`` option straight to psycopg.
+        raise ImproperlyConfigured('DATABASE_CONNECTIONS=pool requires Django 5.1 or later')
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        raise ImproperlyConfigured('DATABASE_CONNECTIONS=pool requires psycopg[pool] (psycopg 3)')
+    return {
+        'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '4')),
+        # Seconds a request waits for a free connection before failing.
+        'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+        # Idle connections above min_size are closed after this many seconds.
+        'max_idle': float(os.getenv('DATABASE_POOL_MAX_IDLE', '300')),
+        # Checked (a cheap round trip) every time a connection is taken.
+        'check': ConnectionPool.check_connection,
+    }
+
+
+def database_config(mode=None, url=None):
+    """Return the settings of the database at ``url`` (default ``DATABASE_URL``) for ``mode``."""
+    mode = mode or os.getenv('DATABASE_CONNECTIONS', 'persistent')
+    if mode not in CONNECTION_MODES:
+        raise ImproperlyConfigured(f'DATABASE_CONNECTIONS must be one of {", ".join(CONNECTION_MODES)}')
+    config = dj_database_url.parse(
+        url or os.getenv('DATABASE_URL') or default_url(),
+        conn_max_age=int(os.getenv('DATABASE_CONN_MAX_AGE', '600')) if mode == 'persistent' else 0,
+        conn_health_checks=mode == 'persistent',
+    )
+    if config['ENGINE'] != 'django.db.backends.postgresql':
+        return config
+
+    options = config.setdefault('OPTIONS', {})
+    if mode == 'pool':
+        options['pool'] = pool_options()
+    threshold = os.getenv('DATABASE_PREPARE_THRESHOLD')
+    if threshold:
+        options['server_side_binding'] = True
+        options['prepare_threshold'] = int(threshold)
+    return config
+
+
+def replica_databases(mode=None):
+    """Return ``{alias: settings}`` of the ``DATABASE_REPLICA_URLS`` replicas."""
+    urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    replicas = {}
+    for number, url in enumerate(urls, 1):
+        config = database_config(mode, url)
+        # Test runs read the test copy of the primary instead of creating one.
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica_{number}'] = config
+    return replicas
@@ -4,7 +4,7 @@ Django settings for portfolio project.
 
 import os
 from pathlib import Path
-import dj_database_url
+from portfolio.database import database_config, replica_databases
 from dotenv import load_dotenv
 from datetime import timedelta
 
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'portfolio.core.middleware.PerformanceMiddleware',
+    'portfolio.core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -50,8 +52,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'portfolio.core.replicas.ReplicaRoutingMiddleware',
 ]
 
+# WhiteNoise is sync-only middleware: under ASGI it would put every request
+# back on a thread, so ASGI deployments set DJANGO_SERVE_STATIC=False and
+# leave /static/ to nginx.
+SERVE_STATIC = os.getenv('DJANGO_SERVE_STATIC', 'True').lower() == 'true'
+if not SERVE_STATIC:
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
 ROOT_URLCONF = 'portfolio.urls'
 
 TEMPLATES = [
@@ -75,16 +85,80 @@ WSGI_APPLICATION = 'portfolio.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# DATABASE_CONNECTIONS selects persistent (default), pooled or per-request
+# connections; see portfolio/database.py for the pool and prepared statement
+# settings.
+REPLICA_DATABASES = replica_databases()
 DATABASES = {
-    'default': dj_database_url.config(
-        default=f"postgres://{os.getenv('POSTGRES_USER', 'postgres')}:"
-                f"{os.getenv('POSTGRES_PASSWORD', 'postgres')}@"
-                f"{os.getenv('POSTGRES_HOST', 'postgres')}:"
-                f"{os.getenv('POSTGRES_PORT', '5432')}/"
-                f"{os.getenv('POSTGRES_DB', 'portfolio')}",
-        conn_max_age=600,
-    )
+    'default': database_config(),
+    **REPLICA_DATABASES,
+    # A separate database standing in for a lagging replica in
+    # core/test_replicas.py. Nothing connects to it unless DATABASE_REPLICAS
+    # names it, and the test runner only creates its test copy for test
+    # classes that list it in ``databases``.
+    'replica': {**database_config(), 'TEST': {}},
 }
+if DATABASES['default']['ENGINE'] != 'django.db.backends.sqlite3':
+    DATABASES['replica']['TEST'] = {'NAME': f"test_{DATABASES['default']['NAME']}_replica"}
+
+# Read replicas (DATABASE_REPLICA_URLS) serve the safe reads of the public API;
+# clients are pinned to the primary for REPLICA_PIN_SECONDS after a write and
+# replicas lagging more than REPLICA_MAX_LAG seconds are skipped (see
+# core/replicas.py).
+DATABASE_REPLICAS = list(REPLICA_DATABASES)
+DATABASE_ROUTERS = ['portfolio.core.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '10'))
+REPLICA_MAX_LAG = int(os.getenv('REPLICA_MAX_LAG', '5'))
+REPLICA_LAG_CHECK_INTERVAL = int(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '5'))
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Redis is shared by every gunicorn worker, so a generation bump in one worker
+# invalidates cached responses in all of them. Without REDIS_URL (local runs,
+# tests) fall back to a per-process memory cache.
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'portfolio',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'portfolio',
+        }
+    }
+
+# Response cache for the public `published` endpoints (see core/cache.py).
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', '300'))
+RESPONSE_CACHE_STALE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_STALE_TIMEOUT', '30'))
+
+# Brotli (when installed) or gzip for JSON responses; cached responses store
+# their compressed bodies so hits are not recompressed.
+RESPONSE_COMPRESSION_ENABLED = os.getenv('RESPONSE_COMPRESSION_ENABLED', 'True').lower() == 'true'
+
+# Public reads served from the pre-rendered JSON columns (see core/snapshots.py).
+SNAPSHOTS_ENABLED = os.getenv('SNAPSHOTS_ENABLED', 'True').lower() == 'true'
+
+# Public responses exported to files nginx serves before asking Django (see
+# core/static_api.py); the base URL is the public origin pagination links use.
+# STATIC_API_EXPORT_IN_BACKGROUND=False exports saves inline after the commit.
+STATIC_API_ROOT = Path(os.getenv('STATIC_API_ROOT', str(BASE_DIR / 'static_api')))
+STATIC_API_BASE_URL = os.getenv('STATIC_API_BASE_URL', 'http://localhost')
+STATIC_API_EXPORT_ON_SAVE = os.getenv('STATIC_API_EXPORT_ON_SAVE', 'False').lower() == 'true'
+STATIC_API_EXPORT_IN_BACKGROUND = os.getenv('STATIC_API_EXPORT_IN_BACKGROUND', 'True').lower() == 'true'
+
+# Request metrics (see core/middleware.py); scraped from /api/internal/metrics,
+# which only answers requests coming from INTERNAL_IPS.
+PERFORMANCE_METRICS_ENABLED = os.getenv('PERFORMANCE_METRICS_ENABLED', 'True').lower() == 'true'
+INTERNAL_IPS = os.getenv('INTERNAL_IPS', '127.0.0.1').split(',')
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -123,6 +197,30 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media is served by core/media.py after a publication check. Behind nginx
+# set MEDIA_ACCEL_REDIRECT so nginx sends the file from the internal
+# MEDIA_ACCEL_PREFIX location; otherwise Django streams it (with Range).
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT', 'False').lower() == 'true'
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', str(30 * 24 * 3600)))
+
+# Responsive image variants generated on upload (see core/images.py). Widths
+# larger than the original are skipped; AVIF is used when Pillow supports it.
+# IMAGE_PROCESSING_WORKERS=0 processes uploads inline instead of in a pool.
+IMAGE_VARIANT_WIDTHS = [320, 640, 960, 1280, 1920]
+IMAGE_VARIANT_FORMATS = ['avif', 'webp', 'jpeg']
+IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', '80'))
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', '2'))
+
+# Resumable chunked uploads (see core/uploads.py). Partial uploads live in
+# UPLOAD_SESSION_DIR until finalized; `cleanup_upload_sessions` removes
+# sessions idle for longer than UPLOAD_SESSION_EXPIRY_HOURS.
+UPLOAD_SESSION_DIR = os.getenv('UPLOAD_SESSION_DIR', str(BASE_DIR / 'tmp' / 'uploads'))
+UPLOAD_SESSION_MAX_SIZE = int(os.getenv('UPLOAD_SESSION_MAX_SIZE', str(2 * 1024 ** 3)))
+UPLOAD_SESSION_EXPIRY_HOURS = int(os.getenv('UPLOAD_SESSION_EXPIRY_HOURS', '24'))
+UPLOAD_CHUNK_SIZE = 8 * 1024 ** 2
+UPLOAD_CHUNK_MAX_SIZE = 16 * 1024 ** 2
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -141,7 +239,17 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # orjson-backed drop-ins for DRF's JSON renderer and parser (same output).
+    'DEFAULT_RENDERER_CLASSES': [
+        'portfolio.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'portfolio.core.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'portfolio.core.pagination.KeysetPageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
@@ -5,13 +5,13 @@ URL configuration for portfolio project.
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from portfolio.core.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('portfolio.core.urls')),
+    # Media goes through a publication check; behind nginx the bytes are
+    # sent by nginx itself via X-Accel-Redirect (see core/media.py).
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:name>", serve_media, name='media'),
 ]
-
-# Serve media files in development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,36 @@
+#!/bin/sh
+
+# This script load-tests the backend API and fails on latency regressions.
+# Arguments are passed to backend/benchmarks/load_test.py, e.g.
+#   ./run-load-tests.sh --update-baseline   (record the baseline on this machine)
+#   ./run-load-tests.sh                     (compare against it)
+# A missing baseline fails the run (--require-baseline), so a regression
+# check can never pass without one.
+
+# A dedicated database, so load tests never touch development data
+export DATABASE_URL=${LOADTEST_DATABASE_URL:-sqlite:////tmp/portfolio-loadtest.sqlite3}
+export DJANGO_DEBUG=False
+
+# Function to check exit status
+check_status() {
+  if [ $? -eq 0 ]; then
+    echo "$1 succeeded!"
+  else
+    echo "$1 failed!"
+    exit 1
+  fi
+}
+
+cd "$(dirname "$0")/backend"
+
+echo "Preparing the load test database..."
+python manage.py migrate --noinput
+check_status "Migration"
+# The same seed every time, so runs are comparable with the baseline
+python manage.py generate_dataset --if-empty --seed 0 ${LOADTEST_DATASET_ARGS:---projects 200 --journal-entries 2000}
+check_status "Seeding"
+
+echo "Running load tests..."
+python benchmarks/load_test.py --require-baseline "$@"
+check_status "Load test"
+exit 0